@@ -0,0 +1,107 @@
+"""Benchmark: clean_location_name, sequential re.sub chain vs the merged/memoized version.
+
+Usage: python bench_locations.py [path/to/Game.log]
+
+With a log path the corpus is every Location[...] and cargo destination found in the
+file; without one a built-in sample of real Game.log location strings is used.
+The legacy column replays the original one-re.sub-per-rule chain, uncached.
+"""
+import contextlib
+import io
+import re
+import sys
+import time
+
+import hauling_web_tst as hw
+
+# Sample of location strings as they appear in Game.log
+SAMPLE_CORPUS = [
+    "Stanton1_Lorville", "Stanton1b_Aberdeen_Mining_Klescher", "Stanton2b_Outpost_Shubin_SAL-2",
+    "Stanton2_Orison", "Stanton3_Area18", "Stanton4_NewBabbage", "Stanton4a_Shelter_Calliope",
+    "Stanton1_DistCenter_HDPC-Cassillo", "Stanton1_DistCenter_Covalex_S1DC06",
+    "Stanton3_DistCenter_Sakura_Sun_Goldenrod", "Stanton2c_Farm_Deakins_Research",
+    "ObjectContainer_RR_HUR_LEO", "ObjectContainer_RR_MIC_LEO", "ObjectContainer_RR_ARC_LEO",
+    "ObjectContainer_RR_CRU_LEO", "OOC_Stanton_1_Hurston", "OOC_Stanton_2b_Daymar",
+    "Stanton1_L1_Station", "Stanton2_L4_Stn", "Stanton3_L2_Int", "Stanton4_L5_Svc",
+    "HUR-L1 Green Glade Station", "CRU-L5 Beautiful Glen Station", "ARC-L1 Wide Forest Station",
+    "MIC-L2 Long Forest Station", "Stanton1a_Scrap_Brio's_Breaker", "Stanton4c_Lab_Rayari_McGrath",
+    "Stanton3b_Proc_Shady_Glen", "Stanton1c_Plt_Hickes", "Stanton2a_Obs_Security_Post_Kareah",
+    "Stanton1d_Gnd_Humboldt_Mines", "Stanton4_Gate_Pyro", "Baijini", "Tressler", "Everus",
+    "Riker", "Port Tressler", "Everus Harbor", "Centro De Distribuição Covalex",
+    "Estação Seraphim", "Posto Avançado Shubin", "Abrigo Ita", "Mineração Aberdeen",
+    "Laboratório Rayari", "Depósito Brio", "Pavilhão Orison", "Observatório Kareah",
+    "Refinaria Hurston", "Stanton2_Pavilion_Orison", "Stanton1_Ind_Lorville", "Stanton3_Rsrch_Wala",
+]
+
+SCU_DEST_REGEX = re.compile(r'\bto\s+(.+?)\s*(?:<|\"|$)', re.IGNORECASE)
+
+
+def legacy_clean(raw_name):
+    """The original chain: one re.sub per table entry, then one per acronym"""
+    if not raw_name: return "Unknown"
+    name = re.sub(r'^(OOC_|ObjectContainer_)', '', raw_name, flags=re.IGNORECASE)
+    for pattern, repl in hw.LOCATION_BODY_MAP:
+        name = re.sub(pattern, repl, name, flags=re.IGNORECASE)
+    name = name.replace('_', ' ')
+    for pattern, repl in hw.LOCATION_REPLACEMENTS:
+        name = re.sub(pattern, repl, name, flags=re.IGNORECASE)
+    name = name.title()
+    for word in hw.LOCATION_ACRONYMS:
+        name = re.sub(r'\b' + word + r'\b', word.upper(), name, flags=re.IGNORECASE)
+    return name.strip()
+
+
+def corpus_from_log(path):
+    ps = hw.PATTERN_SET
+    names = []
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            m = ps.location_regex.search(line)
+            if m:
+                names.append(m.group(1))
+            if ps.notification_event in line:
+                t = ps.notif_text_regex.search(line)
+                if t:
+                    d = SCU_DEST_REGEX.search(t.group(1))
+                    if d:
+                        names.append(d.group(1))
+    return names
+
+
+def rate(fn, names, rounds=5):
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for n in names:
+            fn(n)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return len(names) / best if best else 0.0
+
+
+if __name__ == "__main__":
+    with contextlib.redirect_stdout(io.StringIO()):
+        hw.load_saved_config()
+    if len(sys.argv) > 1:
+        names = corpus_from_log(sys.argv[1])
+        print(f"Corpus: {len(names)} names, {len(set(names))} distinct ({sys.argv[1]})")
+    else:
+        names = SAMPLE_CORPUS * 200
+        print(f"Corpus: {len(names)} names, {len(set(names))} distinct (built-in sample)")
+    if not names:
+        sys.exit("No location strings found")
+
+    mismatches = [n for n in set(names) if legacy_clean(n) != hw.clean_location_name(n)]
+    for n in mismatches[:10]:
+        print(f"  ⚠ {n!r}: {legacy_clean(n)!r} != {hw.clean_location_name(n)!r}")
+
+    uncached = hw.clean_location_name.__wrapped__
+    legacy = rate(legacy_clean, names)
+    merged = rate(uncached, names)
+    hw.clean_location_name.cache_clear()
+    cached = rate(hw.clean_location_name, names)
+    print(f"Sequential re.sub chain: {legacy:,.0f} names/sec")
+    print(f"Merged tables (no cache): {merged:,.0f} names/sec ({merged / legacy:.2f}x)")
+    print(f"Merged + lru_cache:       {cached:,.0f} names/sec ({cached / legacy:.2f}x)")
+    print(f"Cache: {hw.clean_location_name.cache_info()}")
+    print(f"Equivalence: {'OK' if not mismatches else f'{len(mismatches)} mismatches'}")
@@ -0,0 +1,147 @@
+"""Benchmark: raw-string regex matching vs the compiled PatternSet.
+
+Usage: python bench_patterns.py [path/to/Game.log]
+
+Replays the last 10 MB of the log through
+the matching steps process_line performs on every line, first the legacy way
+(re.search with raw strings + repeated .lower()) and then with PATTERN_SET.
+"""
+import contextlib
+import io
+import re
+import sys
+import time
+
+import hauling_web_tst as hw
+
+BACKFILL_BYTES = 10 * 1024 * 1024
+
+
+def read_tail(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        f.seek(0, 2)
+        f.seek(max(0, f.tell() - BACKFILL_BYTES))
+        return f.readlines()
+
+
+def match_legacy(lines):
+    P = hw.PATTERNS
+    hits = 0
+    for line in lines:
+        line = line.strip()
+        if P["notification_event"] in line:
+            re.search(P["notif_id_regex"], line)
+            re.search(P["mission_id_regex"], line)
+            re.search(r'ObjectiveId:\s*\[(.*?)\]', line)
+            m = re.search(P["notif_text_regex"], line)
+            if m:
+                text = m.group(1)
+                if P["contract_accepted"].lower() in text.lower():
+                    hits += 1
+                elif any(P[k].lower() in text.lower() for k in ("contract_canceled", "contract_abandoned", "contract_failed")):
+                    hits += 1
+                elif P["contract_complete"].lower() in text.lower():
+                    hits += 1
+                elif P["new_objective"].lower() in text.lower() or P["objective_complete"].lower() in text.lower():
+                    if re.search(P["scu_regex"], text, re.IGNORECASE):
+                        hits += 1
+        if re.search(r"joined channel '(.+?) : (.+?)'", line):
+            hits += 1
+        if "<RequestLocationInventory>" in line and re.search(r"Location\[(.*?)\]", line):
+            hits += 1
+        if "<EndMission>" in line and re.search(r"CompletionType\[(.+?)\]", line):
+            hits += 1
+        if "aUEC" in line and re.search(P["reward_regex"], line):
+            hits += 1
+    return hits
+
+
+def match_compiled(lines):
+    ps = hw.PATTERN_SET
+    hits = 0
+    for line in lines:
+        line = line.strip()
+        if ps.notification_event in line:
+            ps.notif_id_regex.search(line)
+            ps.mission_id_regex.search(line)
+            ps.objective_id_regex.search(line)
+            m = ps.notif_text_regex.search(line)
+            if m:
+                text = m.group(1)
+                text_lc = text.lower()
+                if ps.contract_accepted_lc in text_lc:
+                    hits += 1
+                elif any(kw in text_lc for kw in ps.ended_keywords_lc):
+                    hits += 1
+                elif ps.contract_complete_lc in text_lc:
+                    hits += 1
+                elif ps.new_objective_lc in text_lc or ps.objective_complete_lc in text_lc:
+                    if ps.scu_regex.search(text):
+                        hits += 1
+        if ps.chat_channel_regex.search(line):
+            hits += 1
+        if "<RequestLocationInventory>" in line and ps.location_regex.search(line):
+            hits += 1
+        if "<EndMission>" in line and ps.completion_type_regex.search(line):
+            hits += 1
+        if "aUEC" in line and ps.reward_regex.search(line):
+            hits += 1
+    return hits
+
+
+def timed(fn, lines, rounds=3):
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(lines)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best if best else 0.0
+
+
+def parse_only(lines):
+    """Pure parse_line throughput (no state, no I/O)"""
+    ps = hw.PATTERN_SET
+    t0 = time.perf_counter()
+    events = 0
+    for line in lines:
+        events += len(hw.parse_line(line, ps, want_ship=False))
+    elapsed = time.perf_counter() - t0
+    return len(lines) / elapsed if elapsed else 0.0
+
+
+def replay(lines):
+    """Full process_line throughput with persistence stubbed out"""
+    hw.save_state = lambda: None
+    hw.append_finish = lambda entry: None
+    hw.update_finish_value = lambda mid, value: True
+    monitor = hw.HaulingMonitor()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for line in lines:
+            try:
+                monitor.process_line(line)
+            except Exception:
+                pass
+    elapsed = time.perf_counter() - t0
+    return len(lines) / elapsed if elapsed else 0.0
+
+
+if __name__ == "__main__":
+    with contextlib.redirect_stdout(io.StringIO()):
+        hw.load_saved_config()
+    path = sys.argv[1] if len(sys.argv) > 1 else hw.LOG_PATH
+    lines = read_tail(path)
+    print(f"Lines: {len(lines)} ({path})")
+
+    if hw.PATTERN_SET.report:
+        print("Pattern validation:")
+        for problem in hw.PATTERN_SET.report:
+            print(f"  ⚠ {problem}")
+
+    before = timed(match_legacy, lines)
+    after = timed(match_compiled, lines)
+    print(f"Matching (raw strings):  {before:,.0f} lines/sec")
+    print(f"Matching (PatternSet):   {after:,.0f} lines/sec ({after / before:.2f}x)" if before else "")
+    print(f"parse_line (pure):       {parse_only(lines):,.0f} lines/sec")
+    print(f"process_line (no I/O):   {replay(lines):,.0f} lines/sec")
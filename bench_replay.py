@@ -0,0 +1,213 @@
+"""Replay benchmark: feed a recorded Game.log through HaulingMonitor.process_line.
+
+Usage: python bench_replay.py path/to/Game.log [--persist] [--history json|sqlite] [--rounds N] [--json [out.json]]
+
+Three passes over the same lines, each from a fresh session:
+  1. plain       - lines/sec with nothing instrumented
+  2. profiled    - time per applier (event type / objective branch, inclusive),
+                   time in parse_header_line (the regex work) and in save_state
+  3. tracemalloc - net allocated bytes per line and peak traced memory
+
+By default persistence stays in memory (PERSIST_TO_DISK off); --persist writes the
+state and finish files for real, into a temporary folder. --json prints (or writes)
+the results as JSON so runs can be compared between releases.
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import hauling_web_tst as hw
+
+INITIAL_STORE = copy.deepcopy(hw.data_store)
+
+
+def read_lines(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.readlines()
+
+
+def fresh_monitor():
+    hw.data_store = copy.deepcopy(INITIAL_STORE)
+    hw.HISTORY.reset(())
+    if hw.PERSIST_TO_DISK:
+        hw.STATE_JOURNAL = hw.StateJournal()
+        if hw.HISTORY_DB is not None:
+            hw.HISTORY_DB.conn.close()
+            hw.HISTORY_DB = None
+        for path in (hw.STATE_FILE, hw.FINISH_FILE, hw.JOURNAL_FILE, hw.HISTORY_DB_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+    return hw.HaulingMonitor()
+
+
+def replay(monitor, lines):
+    errors = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for line in lines:
+            try:
+                monitor.process_line(line)
+            except Exception:
+                errors += 1
+    return errors
+
+
+def timer(stats, name, fn):
+    """Wrap fn so its calls and cumulative time are recorded in stats[name]"""
+    entry = stats.setdefault(name, {"calls": 0, "seconds": 0.0})
+    perf = time.perf_counter
+
+    def wrapped(*args, **kwargs):
+        t0 = perf()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            entry["seconds"] += perf() - t0
+            entry["calls"] += 1
+    return wrapped
+
+
+def plain_pass(lines, rounds):
+    best = None
+    errors = 0
+    for _ in range(rounds):
+        monitor = fresh_monitor()
+        t0 = time.perf_counter()
+        errors = replay(monitor, lines)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, errors
+
+
+def profiled_pass(lines):
+    appliers, other = {}, {}
+    originals = (hw.parse_header_line, hw.save_state, hw.append_finish, hw.update_finish_value)
+    hw.parse_header_line = timer(other, "parse_header_line", hw.parse_header_line)
+    hw.save_state = timer(other, "save_state", hw.save_state)
+    hw.append_finish = timer(other, "append_finish", hw.append_finish)
+    hw.update_finish_value = timer(other, "update_finish_value", hw.update_finish_value)
+    try:
+        monitor = fresh_monitor()
+        # Instance attributes shadow the methods, so nested calls (objective branches) are timed too
+        for name in dir(monitor):
+            if name.startswith("apply_") and name != "apply_all":
+                setattr(monitor, name, timer(appliers, name, getattr(monitor, name)))
+        monitor.appliers = {etype: getattr(monitor, fn.__name__) for etype, fn in monitor.appliers.items()}
+        t0 = time.perf_counter()
+        replay(monitor, lines)
+        elapsed = time.perf_counter() - t0
+    finally:
+        hw.parse_header_line, hw.save_state, hw.append_finish, hw.update_finish_value = originals
+    return elapsed, appliers, other
+
+
+def tracemalloc_pass(lines):
+    monitor = fresh_monitor()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    replay(monitor, lines)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    net_bytes = sum(s.size_diff for s in stats)
+    net_blocks = sum(s.count_diff for s in stats)
+    return {
+        "net_bytes_per_line": net_bytes / len(lines),
+        "net_blocks_per_line": net_blocks / len(lines),
+        "peak_bytes": peak,
+    }
+
+
+def summarize(stats, lines):
+    return {
+        name: {
+            "calls": s["calls"],
+            "seconds": round(s["seconds"], 6),
+            "us_per_call": round(s["seconds"] / s["calls"] * 1e6, 3) if s["calls"] else 0.0,
+            "us_per_line": round(s["seconds"] / len(lines) * 1e6, 3),
+        }
+        for name, s in sorted(stats.items(), key=lambda kv: -kv[1]["seconds"]) if s["calls"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Game.log through HaulingMonitor and time it")
+    parser.add_argument("log", nargs="?", help="Recorded Game.log (default: log_path from the config)")
+    parser.add_argument("--persist", action="store_true", help="Write state/finish files (to a temp folder)")
+    parser.add_argument("--history", choices=("json", "sqlite"), help="History backend (default: from the config)")
+    parser.add_argument("--rounds", type=int, default=3, help="Plain passes; the fastest is reported")
+    parser.add_argument("--json", nargs="?", const="-", metavar="OUT", help="Emit JSON (to OUT, or stdout)")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        hw.load_saved_config()
+        hw.load_language_data()
+    path = args.log or hw.LOG_PATH
+    lines = read_lines(path)
+    if not lines:
+        sys.exit(f"No lines in {path}")
+
+    tmp = tempfile.TemporaryDirectory()
+    hw.STATE_FILE = os.path.join(tmp.name, "hauling_state.json")
+    hw.FINISH_FILE = os.path.join(tmp.name, "hauling_finish.json")
+    hw.JOURNAL_FILE = os.path.join(tmp.name, "hauling_state.journal")
+    hw.HISTORY_DB_FILE = os.path.join(tmp.name, "hauling_history.db")
+    if args.history:
+        hw.HISTORY_BACKEND = args.history
+    hw.PERSIST_TO_DISK = args.persist
+
+    plain, errors = plain_pass(lines, max(1, args.rounds))
+    profiled, appliers, other = profiled_pass(lines)
+    alloc = tracemalloc_pass(lines)
+    if hw.HISTORY_DB is not None:
+        hw.HISTORY_DB.conn.close()
+    tmp.cleanup()
+
+    result = {
+        "log": os.path.abspath(path),
+        "bytes": os.path.getsize(path),
+        "lines": len(lines),
+        "persist": args.persist,
+        "history_backend": hw.HISTORY_BACKEND,
+        "python": platform.python_version(),
+        "errors": errors,
+        "seconds": round(plain, 6),
+        "lines_per_sec": round(len(lines) / plain, 1) if plain else 0.0,
+        "profiled_seconds": round(profiled, 6),
+        "parse": summarize({k: v for k, v in other.items() if k == "parse_header_line"}, lines),
+        "persistence": summarize({k: v for k, v in other.items() if k != "parse_header_line"}, lines),
+        "appliers": summarize(appliers, lines),
+        "alloc": alloc,
+    }
+
+    if args.json:
+        text = json.dumps(result, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        if args.json == "-":
+            return
+
+    print(f"Lines: {len(lines)} ({path}), persistence {'on disk' if args.persist else 'in memory'}, history {hw.HISTORY_BACKEND}")
+    print(f"process_line:     {result['lines_per_sec']:,.0f} lines/sec ({plain:.3f}s, {errors} errors)")
+    print(f"Profiled pass:    {profiled:.3f}s (timing wrappers included)")
+    for section in ("parse", "persistence", "appliers"):
+        print(f"{section.capitalize()}:")
+        for name, s in result[section].items():
+            print(f"  {name:<28} {s['calls']:>8} calls {s['seconds'] * 1000:>10.1f} ms {s['us_per_call']:>9.2f} us/call")
+    print(f"Allocations:      {alloc['net_bytes_per_line']:.1f} net bytes/line, "
+          f"{alloc['net_blocks_per_line']:.3f} net blocks/line, peak {alloc['peak_bytes'] / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
-import os, time, re, threading, json, sys, webbrowser, signal, hashlib, traceback
-from flask import Flask, render_template_string, request, jsonify, make_response
+import os, io, time, re, threading, json, sys, webbrowser, signal, hashlib, traceback, functools, contextlib, atexit, sqlite3, itertools, copy, types, gzip, queue, socket
+from flask import Flask, Response, render_template_string, request, jsonify, make_response
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler, make_server
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque, OrderedDict
+import multiprocessing
 try:
     import pystray
     from PIL import Image, ImageDraw
@@ -16,6 +20,12 @@ WEB_HOST = '0.0.0.0'
 REFRESH_INTERVAL_MS = 2000
 LANGUAGE = "en"
 LOG_LANGUAGE = "en" # Default log language
+BACKFILL_MAX_MB = 0 # History read at startup (0 = whole file; only the last 24h are processed)
+HISTORY_BACKEND = "json" # Mission history storage: "json" (hauling_finish.json) or "sqlite" (hauling_history.db)
+WEB_SERVER_MODE = "pool" # "pool" (fixed worker threads, keep-alive) or "dev" (Werkzeug's thread per request)
+WEB_THREADS = 32         # Worker threads of the pooled server
+WEB_QUEUE = 64           # Connections waiting for a worker; more get a 503
+WEB_KEEPALIVE_S = 5      # Idle keep-alive connections are closed after this
 
 # --- DEFAULT PATTERNS (Fallback) ---
 PATTERNS = {
@@ -48,6 +58,25 @@ PATTERNS = {
     "ui_notif_id_regex": r'Notification ".*?" \[(\d+)\]'
 }
 
+# Built-in copy used when a pattern from patterns_{LANG}.json fails validation
+DEFAULT_PATTERNS = dict(PATTERNS)
+
+# --- INTERNAL PATTERNS (Not configurable) ---
+# Fixed log fragments used by process_line that are not part of patterns_{LANG}.json
+INTERNAL_PATTERNS = {
+    "objective_id_regex": r'ObjectiveId:\s*\[(.*?)\]',
+    "notif_text_relaxed_regex": r'Added notification "(.*?)(?:"|$)',
+    "chat_channel_regex": r"joined channel '(.+?) : (.+?)'",
+    "location_regex": r"Location\[(.*?)\]",
+    "ship_fallback_regex": r"(ARGO_RAFT|CONSTELLATION|CATERPILLAR|C2_HERCULES|FREELANCER|HULL_[A-E]|DRAKE_CORSAIR)_\d+",
+    "end_mission_id_regex": r"MissionId\[([a-f0-9\-]+)\]",
+    "completion_type_regex": r"CompletionType\[(.+?)\]",
+    "mission_ended_id_regex": r"mission_id ([a-f0-9\-]+)",
+    "mission_state_regex": r"mission_state MISSION_STATE_([A-Z]+)",
+    "reward_notif_id_regex": r'\[(\d+)\]',
+    "line_header_regex": r'<([^>]+)>\s*(?:\[[^\]]*\]\s*)?<([^>]+)>',
+}
+
 if getattr(sys, 'frozen', False):
     # Running as compiled exe
     BASE_DIR = os.path.dirname(sys.executable)
@@ -59,6 +88,7 @@ CONFIG_FILE = os.path.join(BASE_DIR, 'hauling_config.json')
 
 STATE_FILE = os.path.join(BASE_DIR, 'hauling_state.json')
 FINISH_FILE = os.path.join(BASE_DIR, 'hauling_finish.json')
+HISTORY_DB_FILE = os.path.join(BASE_DIR, 'hauling_history.db')
 LANG_DATA = {}
 
 def load_language_data():
@@ -122,37 +152,513 @@ def json_serial(obj):
     """JSON serializer for objects not serializable by default json code"""
     if isinstance(obj, datetime):
         return obj.isoformat()
+    if isinstance(obj, DedupeRegistry):
+        return obj.to_json()
     if isinstance(obj, set):
         return list(obj)
     raise TypeError(f"Type {type(obj)} not serializable")
 
-def save_state():
-        """Save current data_store to disk"""
+# Cleared by import_log_backups: save_state() becomes a no-op and finish-history writes only
+# go to HISTORY (in memory), so a bulk import never rewrites the live files per mission
+PERSIST_TO_DISK = True
+
+# --- STATE PERSISTENCE ---
+# save_state() is called on every item update, accept and reward. Once the persister runs
+# it only marks the state dirty; the persister thread writes hauling_state.json at most once
+# per SAVE_INTERVAL_MS, to a temp file that replaces the old one (never a truncated file).
+SAVE_INTERVAL_MS = 500
+STATE_LOCK = threading.RLock()  # Held while data_store is serialized and while the reader applies a line
+
+# --- STATE STORE ---
+# data_store is written by the log reader (one line at a time, under STATE_LOCK) and by the
+# web routes (@state_writer, also under STATE_LOCK). Pages never iterate the live dicts:
+# they render from STATE.snapshot(), a private copy made once per version, so a dashboard
+# poll cannot hit "dictionary changed size during iteration" and never holds the lock
+# while building HTML.
+# A snapshot is never modified, so the next one shares what did not change with it: only
+# the missions marked since (mark_mission) are copied again, and the other keys only when
+# they no longer equal their copy.
+SNAPSHOT_SKIP_KEYS = ("processed_mission_ids", "ignored_signatures", "ingest_checkpoint", "finished_missions",
+                      "notif_mission_map", "ingest_notification_ids", "ingest_reward_ids")
+SNAPSHOT_DIRTY_MAX = 500  # More marked missions than this between two snapshots: copy them all
+
+class StateStore:
+    def __init__(self, lock):
+        self.lock = lock
+        self.version = 0        # Bumped after every change to data_store (never goes back)
+        self.cached = None      # (version, snapshot)
+        self.copies = 0
+        self.live = None        # The data_store["missions"] dict the cached copy was taken from
+        self.dirty = set()      # Missions marked since the cached copy
+        self.stale = True       # Next copy takes every mission again
+        self.missions_copied = 0
+        self.changed = threading.Condition()  # Wakes /events streams waiting for a new version
+
+    def touch(self):
+        """Record a change to data_store"""
+        with self.lock:
+            self.version += 1
+        self.notify()
+
+    @contextlib.contextmanager
+    def write(self):
+        """Exclusive access to data_store; the version moves on when the block ends"""
+        with self.lock:
+            try:
+                yield data_store
+            finally:
+                self.version += 1
+        self.notify()
+
+    def notify(self):
+        with self.changed:
+            self.changed.notify_all()
+
+    def wait(self, version, timeout, stop=None):
+        """Block until the version is no longer `version`, the `stop` event is set (followed by
+        notify()) or timeout. Returns the current version."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version or (stop is not None and stop.is_set()), timeout)
+        return self.version
+
+    def mark(self, mid):
+        """A mission was added, changed or removed (call under the state lock)"""
+        if self.stale:
+            return
+        self.dirty.add(mid)
+        if len(self.dirty) > SNAPSHOT_DIRTY_MAX:
+            self.stale = True
+            self.dirty = set()
+
+    def snapshot(self):
+        """Read-only copy of data_store for rendering (shared by readers of the same version)"""
+        return self.versioned_snapshot()[1]
+
+    def versioned_snapshot(self):
+        """(version, snapshot): the version the copy was taken at"""
+        cached = self.cached
+        if cached is not None and cached[0] == self.version:
+            return cached
+        with self.lock:
+            cached = self.cached  # The copy the marks were collected against (another reader may have taken one)
+            if cached is not None and cached[0] == self.version:
+                return cached
+            version = self.version
+            previous = cached[1] if cached is not None else {}
+            copied = {}
+            for key, value in data_store.items():
+                if key in SNAPSHOT_SKIP_KEYS:
+                    continue
+                if key == "missions":
+                    copied[key] = self.copy_missions(value, previous.get(key))
+                elif key in previous and previous[key] == value:
+                    copied[key] = previous[key]
+                else:
+                    copied[key] = copy.deepcopy(value)
+            if "missions" in copied:
+                SUMMARY.refresh(data_store["missions"], copied["missions"])  # Dashboard groups of this copy
+            self.cached = (version, types.MappingProxyType(copied))
+            self.copies += 1
+            return self.cached
+
+    def copy_missions(self, live, previous):
+        """Copy of data_store["missions"] sharing the unmarked missions with the previous copy"""
+        if self.stale or previous is None or live is not self.live:
+            shared = {}
+        else:
+            shared = {mid: previous[mid] for mid in live if mid in previous and mid not in self.dirty}
+        self.live, self.dirty, self.stale = live, set(), False
+        missions = {}
+        for mid, mission in live.items():
+            missions[mid] = shared[mid] if mid in shared else copy.deepcopy(mission)
+        self.missions_copied += len(missions) - len(shared)
+        return missions
+
+STATE = StateStore(STATE_LOCK)
+
+def mark_mission(mid):
+    """A mission was added, changed or removed (call under the state lock): the dashboard
+    summary (SUMMARY), the change log (CHANGES), the next snapshot (STATE) and the next state
+    write (STATE_JOURNAL) only look at marked missions again"""
+    SUMMARY.mark(mid)
+    CHANGES.mark(mid)
+    STATE.mark(mid)
+    STATE_JOURNAL.mark("missions", mid)
+
+def state_writer(route=None, reload=False):
+    """Route decorator: the handler changes data_store under the state lock (one writer at a time).
+    reload=True first picks up external edits of the state file (sync_state_file)."""
+    if route is None:
+        return functools.partial(state_writer, reload=reload)
+
+    @functools.wraps(route)
+    def locked(*args, **kwargs):
+        if reload:
+            sync_state_file()
+        with STATE.write():
+            return route(*args, **kwargs)
+    return locked
+
+# --- STATE JOURNAL ---
+# hauling_state.json is a snapshot. Changes made after it are appended to JOURNAL_FILE as
+# JSON lines, so a write costs the size of the change, not of the whole state:
+#   {"seq": 12, "op": "set", "key": "ship_name", "value": "..."}         whole value (small keys)
+#   {"seq": 13, "op": "del", "key": "last_completed_ts"}
+#   {"seq": 14, "op": "put", "key": "missions", "id": "<mid>", "value": {...}}   one dict entry
+#   {"seq": 15, "op": "drop", "key": "missions", "id": "<mid>"}
+#   {"seq": 16, "op": "extend", "key": "processed_mission_ids", "values": [...]}  keys added to a DedupeRegistry
+# When the journal passes JOURNAL_MAX_KB the next write is a new snapshot (it records the
+# last seq it contains as "journal_seq") and the journal starts over. load_state() reads
+# the snapshot and replays the newer journal lines.
+# Finding the changes costs the size of the change too: only the entries marked since the
+# last write (mark_mission, STATE_JOURNAL.mark) are serialized again. Other values are
+# compared as they are (scalars) or by identity (lists and dicts, marked when changed in place).
+JOURNAL_FILE = os.path.join(BASE_DIR, 'hauling_state.journal')
+JOURNAL_MAX_KB = 256
+JOURNAL_MAP_KEYS = ("missions", "notif_mission_map")                 # Diffed per entry
+JOURNAL_DIRTY_MAX = 2000  # More marked entries than this between two writes: diff the whole dict
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+class StateJournal:
+    """Turns successive data_store snapshots into journal ops (or a compacted snapshot)"""
+
+    def __init__(self):
+        self.base = None     # key -> what was last written (see fingerprint); None until the first snapshot
+        self.entries = {}    # JOURNAL_MAP_KEYS key -> {entry id: fingerprint of the entry}
+        self.live = {}       # JOURNAL_MAP_KEYS key -> the dict the entries were taken from
+        self.dirty = {}      # JOURNAL_MAP_KEYS key -> entry ids marked since the last write
+        self.stale = set()   # JOURNAL_MAP_KEYS keys to diff in full (too many marks)
+        self.marked = set()  # Other keys changed in place since the last write
+        self.seq = 0
+        self.size = 0        # Bytes in the journal since the last snapshot
+        self.snapshots = 0
+        self.appends = 0
+
+    def mark(self, key, entry=None):
+        """data_store[key], or its entry `entry` (JOURNAL_MAP_KEYS), was changed in place.
+        Call under the state lock."""
+        if self.base is None:
+            return  # The next write is a snapshot anyway
+        if entry is None:
+            self.marked.add(key)
+            return
+        if key in self.stale:
+            return
+        dirty = self.dirty.setdefault(key, set())
+        dirty.add(entry)
+        if len(dirty) > JOURNAL_DIRTY_MAX:
+            self.stale.add(key)
+            del self.dirty[key]
+
+    @staticmethod
+    def entry_fingerprint(value):
+        return value if isinstance(value, SCALAR_TYPES) else json.dumps(value, default=json_serial)
+
+    @staticmethod
+    def fingerprint(value):
+        """Comparable form of a value as it was written: scalars (and datetimes) by value, a
+        DedupeRegistry by its position, lists and dicts by identity"""
+        if isinstance(value, SCALAR_TYPES + (datetime,)):
+            return ("value", value)
+        if isinstance(value, DedupeRegistry):
+            # Same registry, nothing removed since: only the keys added after "added" are new
+            return (value, value.generation, value.added)
+        return ("object", id(value), value)
+
+    def rebase(self, state):
+        self.base, self.entries, self.live = {}, {}, {}
+        for key, value in state.items():
+            if key in JOURNAL_MAP_KEYS and isinstance(value, dict):
+                self.entries[key] = {k: self.entry_fingerprint(v) for k, v in value.items()}
+                self.live[key] = value
+            self.base[key] = self.fingerprint(value)
+        self.dirty, self.stale, self.marked = {}, set(), set()
+
+    def prepare(self, state):
+        """Called under STATE_LOCK. Returns ("snapshot" | "append", text to write)."""
+        if self.base is None or self.size >= JOURNAL_MAX_KB * 1024:
+            self.rebase(state)
+            snapshot = dict(state)
+            snapshot["journal_seq"] = self.seq
+            return "snapshot", json.dumps(snapshot, default=json_serial, indent=2)
+
+        ops = []
+        base = {}
+        for key, value in state.items():
+            fp = self.fingerprint(value)
+            base[key] = fp
+            old = self.base.get(key)
+            if key in JOURNAL_MAP_KEYS and isinstance(value, dict):
+                ops.extend(self.diff_entries(key, value))
+            elif isinstance(value, DedupeRegistry):
+                if isinstance(old, tuple) and old[0] is value and fp[1] == old[1]:
+                    if fp[2] > old[2]:
+                        ops.append({"op": "extend", "key": key, "values": value.tail(fp[2] - old[2])})
+                else:
+                    ops.append({"op": "set", "key": key, "value": value})
+            elif fp[0] == "object":
+                if old is None or old[0] != "object" or old[1] != fp[1] or key in self.marked:
+                    ops.append({"op": "set", "key": key, "value": value})
+            elif fp != old:
+                ops.append({"op": "set", "key": key, "value": value})
+        for key in self.base.keys() - base.keys():
+            ops.append({"op": "del", "key": key})
+            self.entries.pop(key, None)
+            self.live.pop(key, None)
+        self.base = base
+        self.dirty, self.stale, self.marked = {}, set(), set()
+
+        lines = []
+        for op in ops:
+            self.seq += 1
+            lines.append(json.dumps({"seq": self.seq, **op}, default=json_serial))
+        return "append", "".join(line + "\n" for line in lines)
+
+    def diff_entries(self, key, value):
+        """put/drop ops for the entries of a JOURNAL_MAP_KEYS dict: the marked ones, or all of
+        them when the dict was replaced or marked too often"""
+        old = self.entries.get(key, {})
+        if value is not self.live.get(key) or key in self.stale:
+            ids = value.keys() | old.keys()
+        else:
+            ids = self.dirty.get(key, ())
+        ops = []
+        for k in ids:
+            if k in value:
+                fp = self.entry_fingerprint(value[k])
+                if k not in old or old[k] != fp:
+                    old[k] = fp
+                    ops.append({"op": "put", "key": key, "id": str(k), "value": value[k]})
+            elif k in old:
+                del old[k]
+                ops.append({"op": "drop", "key": key, "id": str(k)})
+        self.entries[key] = old
+        self.live[key] = value
+        return ops
+
+    def commit(self, kind, text):
+        """Write what prepare() returned (outside the lock)"""
         try:
-            # Ensure processed_mission_ids is preserved
-            if "processed_mission_ids" not in data_store:
-                data_store["processed_mission_ids"] = []
+            if kind == "snapshot":
+                tmp_path = STATE_FILE + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, STATE_FILE)
+                # The snapshot holds everything up to its journal_seq: the journal can start over
+                open(JOURNAL_FILE, 'w', encoding='utf-8').close()
+                self.size = 0
+                self.snapshots += 1
+            elif text:
+                with open(JOURNAL_FILE, 'a', encoding='utf-8') as f:
+                    f.write(text)
+                self.size += len(text)
+                self.appends += 1
+        except Exception:
+            self.base = None  # Disk and memory may disagree now: next write is a full snapshot
+            raise
+
+    def replay(self, saved):
+        """Apply the journal lines newer than the snapshot to saved (in place). Returns the count."""
+        snapshot_seq = saved.pop("journal_seq", 0) or 0
+        self.seq = max(self.seq, snapshot_seq)
+        if not os.path.exists(JOURNAL_FILE):
+            return 0
+        applied = 0
+        with open(JOURNAL_FILE, 'r', encoding='utf-8') as f:
+            for raw in f:
+                try:
+                    op = json.loads(raw)
+                except ValueError:
+                    break  # Torn last line from a crash mid-append
+                if op.get("seq", 0) <= snapshot_seq:
+                    continue
+                apply_journal_op(saved, op)
+                self.seq = max(self.seq, op["seq"])
+                applied += 1
+        return applied
+
+def apply_journal_op(state, op):
+    kind, key = op.get("op"), op.get("key")
+    if kind == "set":
+        state[key] = op.get("value")
+    elif kind == "del":
+        state.pop(key, None)
+    elif kind == "put":
+        if not isinstance(state.get(key), dict):
+            state[key] = {}
+        state[key][op["id"]] = op.get("value")
+    elif kind == "drop":
+        if isinstance(state.get(key), dict):
+            state[key].pop(op["id"], None)
+    elif kind == "extend":
+        if not isinstance(state.get(key), (list, DedupeRegistry)):
+            state[key] = []
+        state[key].extend(op.get("values", []))
+
+STATE_JOURNAL = StateJournal()
+
+def write_state():
+    """Journal the changes since the last write (or write a snapshot)"""
+    # Every writer of data_store holds STATE_LOCK, so serializing under it sees a settled store
+    with STATE_LOCK:
+        # Ensure processed_mission_ids is preserved
+        if "processed_mission_ids" not in data_store:
+            data_store["processed_mission_ids"] = DedupeRegistry()
 
-            # Create a clean copy to save
-            to_save = data_store.copy()
-            
-            # DO NOT save the persistent history into the volatile state file
-            if "finished_fixed" in to_save:
-                del to_save["finished_fixed"]
-            
-            # DEPRECATED: finished_missions should not be used anymore
-            if "finished_missions" in to_save:
-                del to_save["finished_missions"]
+        # Create a clean copy to save
+        to_save = data_store.copy()
 
-            with open(STATE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(to_save, f, default=json_serial, indent=2)
-        except Exception as e:
-            print(f"⚠ Failed to save state: {e}")
+        # DO NOT save the persistent history into the volatile state file
+        if "finished_fixed" in to_save:
+            del to_save["finished_fixed"]
+
+        # DEPRECATED: finished_missions should not be used anymore
+        if "finished_missions" in to_save:
+            del to_save["finished_missions"]
+
+        kind, text = STATE_JOURNAL.prepare(to_save)
+
+    global STATE_STAMP
+    try:
+        with STATE_FILE_LOCK:
+            STATE_JOURNAL.commit(kind, text)
+            STATE_STAMP = state_stamp()
+    except Exception as e:
+        print(f"⚠ Failed to save state: {e}")
+
+# hauling_state.json + journal as last read/written by this process. Anything else means the
+# files were edited outside the app; otherwise data_store in memory is the newest state.
+STATE_STAMP = None
+STATE_FILE_LOCK = threading.Lock()  # A commit and its new stamp are seen together
+
+def state_stamp():
+    return (file_stamp(STATE_FILE), file_stamp(JOURNAL_FILE))
+
+def sync_state_file():
+    """Reload data_store only if the state files were changed by someone else. Returns True if reloaded."""
+    global STATE_STAMP
+    if not PERSIST_TO_DISK:
+        return False
+    with STATE_FILE_LOCK:
+        if state_stamp() == STATE_STAMP:
+            return False
+    print(f"📂 {T('state_changed', 'log', 'State file changed outside the app, reloading')}")
+    with STATE.write():
+        read_state_file()
+        STATE_JOURNAL.base = None  # The next write is a full snapshot of the merged state
+        STATE_STAMP = state_stamp()
+    return True
+
+class StatePersister:
+    """Write-behind saver: coalesces save_state() calls into one write per interval"""
+
+    def __init__(self):
+        self.wake = threading.Event()
+        self.write_lock = threading.Lock()  # The thread and flush() never write at the same time
+        self.dirty_since = None             # monotonic time of the first unsaved change
+        self.running = False
+        self.requests = 0
+        self.writes = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def start(self, interval_ms=None):
+        self.interval = (SAVE_INTERVAL_MS if interval_ms is None else interval_ms) / 1000
+        self.running = True
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def mark_dirty(self):
+        self.requests += 1
+        if self.dirty_since is None:
+            self.dirty_since = time.monotonic()
+            self.wake.set()
+
+    def run(self):
+        while True:
+            self.wake.wait()
+            # Let the rest of the burst (e.g. 20 objective updates) land before writing
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Write now if anything is pending (called by the thread, on shutdown and before load_state)"""
+        with self.write_lock:
+            self.wake.clear()
+            since, self.dirty_since = self.dirty_since, None
+            if since is None:
+                return
+            write_state()
+            self.writes += 1
+            self.last_latency = time.monotonic() - since
+            self.max_latency = max(self.max_latency, self.last_latency)
+            self.total_latency += self.last_latency
+
+    def stats(self):
+        return {
+            "interval_ms": round(self.interval * 1000) if self.running else 0,
+            "pending": self.dirty_since is not None,
+            "save_requests": self.requests,
+            "writes": self.writes,
+            "writes_saved": max(0, self.requests - self.writes),
+            "last_flush_latency_ms": round(self.last_latency * 1000, 1),
+            "max_flush_latency_ms": round(self.max_latency * 1000, 1),
+            "avg_flush_latency_ms": round(self.total_latency / self.writes * 1000, 1) if self.writes else 0.0,
+            "journal_kb": round(STATE_JOURNAL.size / 1024, 1),
+            "journal_appends": STATE_JOURNAL.appends,
+            "snapshots": STATE_JOURNAL.snapshots,
+            "state_version": STATE.version,
+            "render_snapshots": STATE.copies,
+            "snapshot_missions_copied": STATE.missions_copied,
+            "change_log": len(CHANGES.log),
+            "change_scans": CHANGES.scans,
+            "page_renders": RENDER_STATS["pages"],
+            "page_cache_hits": RENDER_STATS["page_hits"],
+            "card_renders": RENDER_STATS["cards"],
+            "card_cache_hits": RENDER_STATS["card_hits"],
+            "summary_refreshes": SUMMARY.refreshes,
+            "summary_rebuilds": SUMMARY.rebuilds,
+            "summary_missions_reindexed": SUMMARY.reindexed,
+        }
+
+STATE_PERSISTER = StatePersister()
+
+def save_state(touch=True):
+        """Save current data_store to disk (deferred to the persister once it is running).
+        touch=False saves without a new state version: for data the pages do not show (the
+        ingest checkpoint), so dashboards are not told about a change that is not there."""
+        if touch:
+            STATE.touch()
+        if not PERSIST_TO_DISK:
+            return
+        if STATE_PERSISTER.running:
+            STATE_PERSISTER.mark_dirty()
+        else:
+            write_state()
+
+def flush_state():
+    """Write any pending state now (shutdown/restart)"""
+    if STATE_PERSISTER.running:
+        STATE_PERSISTER.flush()
+
+def save_state_on_exit():
+    """Exit/restart/Ctrl+C: always persist, so the latest ingest checkpoint is kept even when
+    nothing else was pending, then write it before the process goes away"""
+    save_state(touch=False)
+    flush_state()
 
 def load_finishes():
+    """Mission history, newest first"""
+    if HISTORY_BACKEND == "sqlite":
+        return history_db().load()
+    return load_finishes_json()
+
+def load_finishes_json():
+    global FINISH_STAMP
     try:
         if os.path.exists(FINISH_FILE):
             with open(FINISH_FILE, 'r', encoding='utf-8') as f:
+                FINISH_STAMP = file_stamp(FINISH_FILE)
                 items = json.load(f)
                 
                 # DEDUPLICATION LOGIC
@@ -181,7 +687,7 @@ def load_finishes():
                 if len(unique_items) < len(items):
                     diff = len(items) - len(unique_items)
                     print(f"🧹 {T('dedup_log', 'log', 'Deduplicated History')}: {diff} {T('entries_removed', 'log', 'entries removed')}")
-                    save_finishes(unique_items)
+                    save_finishes_json(unique_items)
                     
                 return unique_items
     except Exception as e:
@@ -189,35 +695,335 @@ def load_finishes():
     return []
 
 def save_finishes(items):
+    """Replace the whole history (items newest first)"""
+    HISTORY.reset(items)
+    if HISTORY_BACKEND == "sqlite":
+        history_db().replace_all(items)
+        return
+    save_finishes_json(items)
+
+def save_finishes_json(items):
+    global FINISH_STAMP
     try:
         with open(FINISH_FILE, 'w', encoding='utf-8') as f:
             json.dump(items, f, indent=2)
+        FINISH_STAMP = file_stamp(FINISH_FILE)
     except Exception as e:
         print(f"⚠ Failed to save finish file: {e}")
 
+def file_stamp(path):
+    """(mtime, size) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+FINISH_STAMP = None  # hauling_finish.json as last read/written by this process
+
+def sync_finish_file():
+    """Reload HISTORY if hauling_finish.json was changed by someone else (e.g. --import-backups)
+    so the next rewrite does not drop their entries"""
+    if HISTORY_BACKEND == "json" and file_stamp(FINISH_FILE) != FINISH_STAMP:
+        HISTORY.reset(load_finishes_json())
+
 def append_finish(entry):
-    items = load_finishes()
-    existing_idx = next((i for i, it in enumerate(items) if it.get("id") == entry.get("id")), None)
-    if existing_idx is not None:
-        items.pop(existing_idx)
-    items.insert(0, entry)
-    save_finishes(items)
+    """Put an entry at the top of the history (replacing one with the same id)"""
+    if PERSIST_TO_DISK:
+        sync_finish_file()
+    HISTORY.add(entry)
+    if not PERSIST_TO_DISK:
+        return
+    if HISTORY_BACKEND == "sqlite":
+        history_db().append(entry)
+    else:
+        save_finishes_json(HISTORY.items())
 
 def update_finish_value(mid, new_value):
-    items = load_finishes()
-    updated = False
-    for it in items:
-        if it.get("id") == mid:
-            it["value"] = new_value
-            updated = True
-            break
-    if updated:
-        save_finishes(items)
+    if PERSIST_TO_DISK:
+        sync_finish_file()
+    updated = HISTORY.set_value(mid, new_value)
+    if updated and PERSIST_TO_DISK:
+        if HISTORY_BACKEND == "sqlite":
+            history_db().update_value(mid, new_value)
+        else:
+            save_finishes_json(HISTORY.items())
     return updated
 
+def delete_finish(mid):
+    """Remove one history entry by id"""
+    sync_finish_file()
+    HISTORY.remove(mid)
+    if HISTORY_BACKEND == "sqlite":
+        history_db().delete(mid)
+    else:
+        save_finishes_json(HISTORY.items())
+
+# --- HISTORY STORE ---
+def mission_seconds(entry):
+    """Duration of a finished mission from its "started"/"time" clock strings (0 if unknown)"""
+    start_str = entry.get("started", "?")
+    end_str = entry.get("time", "?")
+    if start_str == "?" or end_str == "?":
+        return 0
+    try:
+        t_start = datetime.strptime(start_str, "%H:%M:%S")
+        t_end = datetime.strptime(end_str, "%H:%M:%S")
+    except (TypeError, ValueError):
+        return 0
+    # Handle crossing midnight
+    if t_end < t_start:
+        t_end += timedelta(days=1)
+    return (t_end - t_start).total_seconds()
+
+def finish_totals(entry):
+    """(earnings, mission seconds) an entry adds to the dashboard totals"""
+    # Only count actual completed missions (not cancelled/failed)
+    # Default to COMPLETED for backward compatibility
+    if entry.get("status", "COMPLETED") != "COMPLETED":
+        return 0, 0
+    return entry.get("value", 0) or 0, mission_seconds(entry)
+
+class HistoryStore:
+    """The mission history in memory, shared by the log reader and the web routes.
+
+    entries keeps id -> entry in recency order (newest last) and unvalued the ids still
+    waiting for a reward, so "is this mission finished?" and reward matching no longer
+    scan the history. The finish file / database is only written, never re-read.
+    earnings / mission_seconds are running totals: each entry's share is added when it
+    comes in and taken back when it is replaced, re-valued or removed.
+    touched collects the ids changed since the change log last looked (see ChangeLog);
+    resets counts wholesale replacements, after which clients need a full snapshot.
+    """
+
+    def __init__(self, items=()):
+        self.lock = threading.RLock()
+        self.touched = set()
+        self.resets = 0
+        self.reset(items)
+
+    def reset(self, items):
+        """Replace the contents (items newest first, as load_finishes() returns them)"""
+        with self.lock:
+            self.entries = OrderedDict()
+            self.unvalued = OrderedDict()
+            self.shares = {}          # id -> (earnings, seconds) counted in the totals
+            self.earnings = 0
+            self.mission_seconds = 0
+            for entry in reversed(list(items)):
+                self.add(entry)
+            self.touched = set()
+            self.resets += 1
+
+    def add(self, entry):
+        """Insert at the top; an entry with the same id is replaced"""
+        mid = entry.get("id")
+        with self.lock:
+            self.entries.pop(mid, None)
+            self.unvalued.pop(mid, None)
+            self.entries[mid] = entry
+            if not entry.get("value"):
+                self.unvalued[mid] = None
+            self.count(mid, finish_totals(entry))
+            self.mark(mid)
+
+    def set_value(self, mid, value):
+        with self.lock:
+            entry = self.entries.get(mid)
+            if entry is None:
+                return False
+            entry["value"] = value
+            if value:
+                self.unvalued.pop(mid, None)
+            else:
+                self.unvalued[mid] = None
+            self.count(mid, finish_totals(entry))
+            self.mark(mid)
+            return True
+
+    def remove(self, mid):
+        with self.lock:
+            self.unvalued.pop(mid, None)
+            self.count(mid, None)
+            self.mark(mid)
+            return self.entries.pop(mid, None)
+
+    def mark(self, mid):
+        """Note a changed id for the change log. Past CHANGE_LOG_MAX ids nobody has collected,
+        the list is dropped and counted as a reset (clients resync from a full snapshot)."""
+        if len(self.touched) >= CHANGE_LOG_MAX:
+            self.touched = set()
+            self.resets += 1
+        self.touched.add(mid)
+
+    def drain(self):
+        """(resets, ids changed since the last drain)"""
+        with self.lock:
+            touched, self.touched = self.touched, set()
+            return self.resets, touched
+
+    def count(self, mid, share):
+        """Replace mid's share of the totals (None = no longer counted)"""
+        old = self.shares.pop(mid, None)
+        if old is not None:
+            self.earnings -= old[0]
+            self.mission_seconds -= old[1]
+        if share is not None:
+            self.shares[mid] = share
+            self.earnings += share[0]
+            self.mission_seconds += share[1]
+
+    def totals(self):
+        """(total earnings, total mission seconds) of the completed missions"""
+        with self.lock:
+            return self.earnings, self.mission_seconds
+
+    def get(self, mid):
+        return self.entries.get(mid)
+
+    def __contains__(self, mid):
+        return mid in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def recent(self, n):
+        """The n newest entries, newest first"""
+        with self.lock:
+            return list(itertools.islice(reversed(self.entries.values()), n))
+
+    def is_recent(self, mid, n):
+        """True if mid is among the n newest entries"""
+        with self.lock:
+            return mid in self.entries and mid in itertools.islice(reversed(self.entries), n)
+
+    def has_unvalued(self):
+        return bool(self.unvalued)
+
+    def newest(self):
+        with self.lock:
+            return next(reversed(self.entries.values()), None)
+
+    def at(self, index):
+        """Entry at a position of the newest-first list (as shown in the UI), or None"""
+        if index < 0:
+            return None
+        recent = self.recent(index + 1)
+        return recent[index] if index < len(recent) else None
+
+    def newest_first(self):
+        """Lazy newest-first view (single-threaded use; do not add/remove while iterating)"""
+        return reversed(self.entries.values())
+
+    def items(self):
+        """All entries, newest first (the order of hauling_finish.json)"""
+        with self.lock:
+            return list(reversed(self.entries.values()))
+
+HISTORY = HistoryStore()
+
+# --- SQLITE HISTORY ---
+# history_backend = "sqlite": one row per finished mission, so appending a finish or
+# setting its reward is a single indexed statement instead of a rewrite of the JSON file.
+# "seq" keeps the list order of the JSON file (higher = newer; re-appending moves to the top).
+# Keys outside the fixed columns (e.g. "date" of imported entries) are kept in "extra".
+HISTORY_COLUMNS = ("title", "status", "started", "time", "value", "source")
+
+class HistoryDB:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS finishes (
+                id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                title TEXT, status TEXT, started TEXT, time TEXT, value INTEGER, source TEXT,
+                items TEXT, extra TEXT)""")
+            for column in ("seq", "status", "started", "time", "value", "source"):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS finishes_{column} ON finishes({column})")
+        self.migrate()
+
+    def migrate(self):
+        """One-time import of hauling_finish.json (the JSON file is left in place as a backup)"""
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return
+        items = load_finishes_json()
+        if items and not self.conn.execute("SELECT 1 FROM finishes LIMIT 1").fetchone():
+            self.replace_all(items)
+            print(f"🗄️ {T('history_migrated', 'log', 'History migrated to SQLite')}: {len(items)} ({self.path})")
+        with self.conn:
+            self.conn.execute("PRAGMA user_version = 1")
+
+    @staticmethod
+    def to_row(entry, seq):
+        extra = {k: v for k, v in entry.items() if k not in HISTORY_COLUMNS and k not in ("id", "items")}
+        return (entry.get("id"), seq, *(entry.get(c) for c in HISTORY_COLUMNS),
+                json.dumps(entry["items"]) if "items" in entry else None,
+                json.dumps(extra) if extra else None)
+
+    @staticmethod
+    def from_row(row):
+        entry = {"id": row[0]}
+        for column, value in zip(HISTORY_COLUMNS, row[1:7]):
+            if value is not None:
+                entry[column] = value
+        if row[7] is not None:
+            entry["items"] = json.loads(row[7])
+        if row[8]:
+            entry.update(json.loads(row[8]))
+        return entry
+
+    def load(self):
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, {', '.join(HISTORY_COLUMNS)}, items, extra FROM finishes ORDER BY seq DESC").fetchall()
+        return [self.from_row(row) for row in rows]
+
+    def append(self, entry):
+        with self.lock, self.conn:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM finishes").fetchone()[0]
+            self.conn.execute("INSERT OR REPLACE INTO finishes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.to_row(entry, seq))
+
+    def update_value(self, mid, value):
+        with self.lock, self.conn:
+            return self.conn.execute("UPDATE finishes SET value = ? WHERE id = ?", (value, mid)).rowcount > 0
+
+    def delete(self, mid):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM finishes WHERE id = ?", (mid,))
+
+    def replace_all(self, items):
+        rows = [self.to_row(entry, len(items) - i) for i, entry in enumerate(items)]
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM finishes")
+            self.conn.executemany("INSERT OR REPLACE INTO finishes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+HISTORY_DB = None
+
+def history_db():
+    """The open history database (opened, and migrated from JSON, on first use)"""
+    global HISTORY_DB
+    if HISTORY_DB is None or HISTORY_DB.path != HISTORY_DB_FILE:
+        HISTORY_DB = HistoryDB(HISTORY_DB_FILE)
+    return HISTORY_DB
+
 def load_state():
     """Load data_store from disk"""
-    global data_store
+    # A deferred write must land first, or the reload would bring back older state
+    flush_state()
+    global STATE_STAMP
+    # Merged under the state lock, between two log lines (never in the middle of one)
+    with STATE.write():
+        read_state_file()
+        STATE_STAMP = state_stamp()
+    # Always refresh fixed finishes in memory
+    HISTORY.reset(load_finishes())
+
+def read_state_file():
+    """Merge hauling_state.json (plus its journal) into data_store"""
     if os.path.exists(STATE_FILE):
         try:
             # Check if file is empty
@@ -232,6 +1038,19 @@ def load_state():
                 if not isinstance(saved, dict):
                     print(f"⚠ Invalid state format in {STATE_FILE} (expected dict, got {type(saved).__name__}). Starting fresh.")
                     return
+
+                # Registries come back as DedupeRegistry (older files have plain lists), so
+                # journal "extend" ops land in them; a "set" op brings the compact form back
+                for key in DEDUPE_KEYS + tuple(k for k in INGEST_ID_KEYS if k in saved):
+                    saved[key] = DedupeRegistry.from_json(saved.get(key))
+
+                # Changes written after the snapshot
+                replayed = STATE_JOURNAL.replay(saved)
+                if replayed:
+                    print(f"📜 {T('journal_replayed', 'log', 'State journal replayed')}: {replayed} {T('changes', 'log', 'changes')}")
+
+                for key in DEDUPE_KEYS + tuple(k for k in INGEST_ID_KEYS if k in saved):
+                    saved[key] = DedupeRegistry.from_json(saved.get(key))
                 
                 # Restore datetime objects
                 if 'session_start' in saved:
@@ -243,8 +1062,7 @@ def load_state():
                             print(f"♻️ Old session found ({saved_start.strftime('%Y-%m-%d')}). Starting fresh.")
                             
                             # CRITICAL: Preserve processed_mission_ids even on new day to prevent history duplication
-                            if "processed_mission_ids" in saved:
-                                data_store["processed_mission_ids"] = saved["processed_mission_ids"]
+                            data_store["processed_mission_ids"] = saved["processed_mission_ids"]
                             
                             # Preserve Hangar (Manual Inventory)
                             if "hangar" in saved:
@@ -271,7 +1089,7 @@ def load_state():
 
                 # Ensure processed_mission_ids exists (Prevent History Duplicates)
                 if "processed_mission_ids" not in data_store:
-                    data_store["processed_mission_ids"] = []
+                    data_store["processed_mission_ids"] = DedupeRegistry()
                 
                 # CLEANUP: Remove deprecated finished_missions if accidentally loaded
                 if "finished_missions" in data_store:
@@ -280,12 +1098,146 @@ def load_state():
                 print(f"✓ State loaded from {STATE_FILE} (Session: {saved['session_start'].strftime('%H:%M')})")
         except Exception as e:
             print(f"⚠ Failed to load state: {e}")
-    # Always refresh fixed finishes in memory
-    data_store["finished_fixed"] = load_finishes()
+
+# --- DEDUPE REGISTRIES ---
+# "Already handled" sets (processed mission ids, ignored item signatures, notification ids).
+# Keys are grouped by game session (one Game.log). A mission id or notification can only
+# reappear while its log is being read, so old sessions are dropped once they are both
+# more than keep_sessions launches and more than keep_days days old.
+# On disk a registry is one string per session instead of one JSON line per key:
+#   {"session": 7, "groups": {"6": [1718000000, "id1\nid2"], "7": [1718100000, "id3"]}}
+DEDUPE_KEYS = ("processed_mission_ids", "ignored_signatures")
+INGEST_ID_KEYS = ("ingest_notification_ids", "ingest_reward_ids")  # Saved with the ingest checkpoint
+DEDUPE_KEEP_SESSIONS = 5
+DEDUPE_KEEP_DAYS = 14
+NOTIFICATION_IDS_MAX = 5000   # Per-session notification/reward ids kept by HaulingMonitor
+NOTIF_MAP_MAX = 1000          # notif_mission_map entries (oldest dropped first)
+
+class DedupeRegistry:
+    """Insertion-ordered set of keys, each tagged with the session it was last seen in"""
+
+    def __init__(self, items=(), keep_sessions=DEDUPE_KEEP_SESSIONS, keep_days=DEDUPE_KEEP_DAYS, max_items=None):
+        self.keep_sessions = keep_sessions
+        self.keep_days = keep_days
+        self.max_items = max_items
+        self.seen = OrderedDict()     # key -> session (oldest first)
+        self.sessions = OrderedDict() # session -> start time (epoch seconds)
+        self.session = 1
+        self.sessions[self.session] = int(time.time())
+        self.generation = 0           # Bumped when keys are removed (the journal rewrites the value)
+        self.added = 0                # Keys added in this generation (the journal appends only those)
+        self.update(items)
+
+    def add(self, key):
+        session = self.seen.get(key)
+        if session == self.session:
+            return
+        if session is not None:
+            del self.seen[key]  # Seen again in a later session: moves to the newest group
+        self.seen[key] = self.session
+        self.added += 1
+        if self.max_items is not None and len(self.seen) > self.max_items:
+            self.seen.popitem(last=False)
+            self.generation += 1
+
+    append = add  # Call sites written for the old list form
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    extend = update
+
+    def discard(self, key):
+        if self.seen.pop(key, None) is not None:
+            self.generation += 1
+
+    def clear(self):
+        self.seen.clear()
+        self.generation += 1
+
+    def __contains__(self, key):
+        return key in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+    def __iter__(self):
+        return iter(self.seen)
+
+    def tail(self, n):
+        """The n most recently added keys, oldest first"""
+        return list(itertools.islice(reversed(self.seen), n))[::-1] if n > 0 else []
+
+    def new_session(self, now=None):
+        """Start a new game session and drop the sessions that are out of retention"""
+        now = int(time.time() if now is None else now)
+        self.session += 1
+        self.sessions[self.session] = now
+        self.generation += 1
+        keep_from = self.session - self.keep_sessions + 1
+        max_age = self.keep_days * 86400
+        expired = {s for s, started in self.sessions.items() if s < keep_from and now - started > max_age}
+        for s in expired:
+            del self.sessions[s]
+        # Keys are in session order: the expired ones are all at the front
+        while self.seen:
+            key, session = next(iter(self.seen.items()))
+            if session in self.sessions:
+                break
+            del self.seen[key]
+        return len(expired)
+
+    def to_json(self):
+        groups = OrderedDict((str(s), [started, []]) for s, started in self.sessions.items())
+        for key, session in self.seen.items():
+            groups[str(session)][1].append(key)
+        return {"session": self.session, "groups": {s: [started, "\n".join(keys)] for s, (started, keys) in groups.items() if keys or s == str(self.session)}}
+
+    @classmethod
+    def from_json(cls, data, **kwargs):
+        """Accepts the compact form, a plain list (older state files) or a registry"""
+        if isinstance(data, cls):
+            return data
+        registry = cls(**kwargs)
+        if isinstance(data, dict):
+            groups = data.get("groups") or {}
+            registry.sessions.clear()
+            for s, (started, keys) in sorted(((int(s), g) for s, g in groups.items()), key=lambda g: g[0]):
+                registry.sessions[s] = started
+                for key in keys.split("\n") if keys else ():
+                    registry.seen[key] = s
+            registry.session = max(int(data.get("session") or 1), max(registry.sessions, default=1))
+            registry.sessions.setdefault(registry.session, int(time.time()))
+        elif isinstance(data, (list, tuple, set)):
+            registry.update(data)
+        registry.added = 0
+        return registry
+
+def start_dedupe_session():
+    """A new Game.log is being read: start a session in the registries and forget the
+    notification -> mission map (notification ids restart with every game launch)"""
+    with STATE_LOCK:
+        dropped = 0
+        for key in DEDUPE_KEYS:
+            registry = data_store.get(key)
+            if isinstance(registry, DedupeRegistry):
+                before = len(registry)
+                registry.new_session()
+                dropped += before - len(registry)
+        data_store["notif_mission_map"] = {}
+        for key in INGEST_ID_KEYS:
+            data_store.pop(key, None)  # Ids of the previous log
+    if dropped:
+        print(f"🧹 {T('dedupe_pruned', 'log', 'Expired processed IDs removed')}: {dropped}")
+    save_state()
+
+def mission_processed(mission_id):
+    """True if the mission is finished or was deleted (the log must not bring it back)"""
+    return mission_id in data_store.get("processed_mission_ids", ()) or mission_id in HISTORY
 
 data_store = {
     "missions": {}, 
-    "finished_fixed": [],
     "hangar": [],
     "player_name": "Waiting for Login...", 
     "ship_name": "Waiting for Ship...",
@@ -295,6 +1247,8 @@ data_store = {
     "mission_status": "READY",
     "session_start": datetime.now(),
     "notif_mission_map": {},
+    "processed_mission_ids": DedupeRegistry(),
+    "ignored_signatures": DedupeRegistry(),
     "last_completed_mission_id": None,
     "last_completed_ts": None
 }
@@ -323,117 +1277,265 @@ def get_item_signature(item_data):
     """Generate a unique signature for an item to track deletions."""
     return f"{item_data.get('mat', '').upper().strip()}|{item_data.get('dest', '').strip()}|{item_data.get('vol', 0)}|{item_data.get('type', 'DELIVERY')}"
 
+# --- LOCATION NAMES ---
+# Ordered (pattern, replacement) tables for clean_location_name. Each table is merged into
+# a single alternation (see compile_substitutions), so a name costs a handful of regex passes.
+
+# Map Internal System Names to Real Names (Stanton System)
+# This preserves the location context (e.g. "Stanton2b_Outpost" becomes "Daymar_Outpost")
+LOCATION_BODY_MAP = [
+    # Hurston & Moons
+    (r'Stanton_?1a\b', "Ariel"), (r'Stanton_?1b\b', "Aberdeen"),
+    (r'Stanton_?1c\b', "Magda"), (r'Stanton_?1d\b', "Ita"),
+    (r'Stanton_?1\b', "Hurston"),
+
+    # Crusader & Moons
+    (r'Stanton_?2a\b', "Cellin"), (r'Stanton_?2b\b', "Daymar"), (r'Stanton_?2c\b', "Yela"),
+    (r'Stanton_?2\b', "Crusader"),
+
+    # ArcCorp & Moons
+    (r'Stanton_?3a\b', "Lyria"), (r'Stanton_?3b\b', "Wala"),
+    (r'Stanton_?3\b', "ArcCorp"),
+
+    # MicroTech & Moons
+    (r'Stanton_?4a\b', "Calliope"), (r'Stanton_?4b\b', "Clio"), (r'Stanton_?4c\b', "Euterpe"),
+    (r'Stanton_?4\b', "MicroTech"),
+]
+
+# Expand Abbreviations & Fix Common Terms
+LOCATION_REPLACEMENTS = [
+    # Specific Station Mappings (Internal Codes -> Real Names)
+    (r'\bRr\s*Hur\s*Leo\b', 'Everus Harbor'),
+    (r'\bRr\s*Mic\s*Leo\b', 'Port Tressler'),
+    (r'\bRr\s*Arc\s*Leo\b', 'Baijini Point'),
+    (r'\bRr\s*Cru\s*Leo\b', 'Seraphim Station'),
+
+    (r'\bDistCenter\b', 'Distribution Center'),
+    (r'\bCentro\s+De\s+Distribui[çc][ãa]o\b', 'Distribution Center'),
+    (r'\bInt\b', 'Interchange'),
+    (r'\bStn\b', 'Station'),
+    (r'\bEsta[çc][ãa]o\b', 'Station'),
+    (r'\bSvc\b', 'Services'),
+    (r'\bInd\b', 'Industrial'),
+    (r'\bOutpost\b', 'Outpost'),
+    (r'\bPosto\s+Avan[çc]ado\b', 'Outpost'),
+    (r'\bShelter\b', 'Aid Shelter'),
+    (r'\bAbrigo\b', 'Aid Shelter'),
+    (r'\bMining\b', 'Mining Area'),
+    (r'\bMinera[çc][ãa]o\b', 'Mining Area'),
+    (r'\bProc\b', 'Processing'),
+    (r'\bProcessamento\b', 'Processing'),
+    (r'\bRsrch\b', 'Research'),
+    (r'\bPesquisa\b', 'Research'),
+    (r'\bPlt\b', 'Plant'),
+    (r'\bPlanta\b', 'Plant'),
+    (r'\bFarm\b', 'Farms'),
+    (r'\bFazenda\b', 'Farms'),
+    (r'\bScrap\b', 'Scrapyard'),
+    (r'\bSucata\b', 'Scrapyard'),
+    (r'\bDepot\b', 'Depot'),
+    (r'\bDep[óo]sito\b', 'Depot'),
+    (r'\bLab\b', 'Labs'),
+    (r'\bLaborat[óo]rio\b', 'Labs'),
+    (r'\bPavilion\b', 'Pavilion'),
+    (r'\bPavilh[ãa]o\b', 'Pavilion'),
+    (r'\bObs\b', 'Observatory'),
+    (r'\bObservat[óo]rio\b', 'Observatory'),
+    (r'\bGnd\b', 'Ground'),
+    (r'\bGate\b', 'Gateway'),
+    (r'\bPortal\b', 'Gateway'),
+    (r'\bRefinaria\b', 'Refinery'),
+
+    # Orbital Markers & Lagrange Points
+    (r'\bOm\b', 'OM'),
+    (r'\bL(\d+)\b', r'L\1'),
+
+    # Stations
+    (r'\bHur\b', 'HUR'), (r'\bCru\b', 'CRU'), (r'\bArc\b', 'ARC'), (r'\bMic\b', 'MIC'),
+    (r'\bHdpc\b', 'HDPC'), (r'\bBaijini\b(?!\s*Point)', 'Baijini Point'), (r'(?<!Port\s)\bTressler\b', 'Port Tressler'),
+    (r'\bEverus\b(?!\s*Harbor)', 'Everus Harbor'), (r'\bRiker\b(?!\s*Memorial)', 'Riker Memorial'),
+
+    # Cargo/Units
+    (r'\bScu\b', 'SCU'),
+]
+
+# Fix casing for specific acronyms after title()
+LOCATION_ACRONYMS = ["Om", "L1", "L2", "L3", "L4", "L5", "Hur", "Cru", "Arc", "Mic", "Hdpc", "Scu"]
+
+def compile_substitutions(table, flags=re.IGNORECASE):
+    """Merge an ordered [(pattern, replacement)] table into one regex pass.
+
+    Each entry becomes a named alternative in table order, so at any position the first
+    entry that matches wins, like the sequential re.sub calls it replaces. This is only
+    equivalent when no replacement produces text a later entry would match, which holds
+    for the location tables (bench_locations.py checks it against the sequential form).
+    """
+    parts = []
+    repls = {}
+    for i, (pattern, repl) in enumerate(table):
+        name = f"s{i}"
+        parts.append(f"(?P<{name}>{pattern})")
+        if "\\" in repl:
+            # Template with group references: expand it with the entry's own regex
+            single = re.compile(pattern, flags)
+            repls[name] = lambda m, single=single, repl=repl, name=name: single.sub(repl, m.group(name), count=1)
+        else:
+            repls[name] = repl
+    merged = re.compile("|".join(parts), flags)
+
+    def replace(m):
+        repl = repls[m.lastgroup]
+        return repl if isinstance(repl, str) else repl(m)
+
+    return lambda text: merged.sub(replace, text)
+
+LOCATION_PREFIX_RX = re.compile(r'^(OOC_|ObjectContainer_)', re.IGNORECASE)
+substitute_location_bodies = compile_substitutions(LOCATION_BODY_MAP)
+substitute_location_terms = compile_substitutions(LOCATION_REPLACEMENTS)
+LOCATION_ACRONYM_RX = re.compile(r'\b(?:' + "|".join(LOCATION_ACRONYMS) + r')\b', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=2048)
 def clean_location_name(raw_name):
-    """Convert log location names to readable format - Enhanced approach"""
+    """Convert log location names to readable format - Enhanced approach.
+    Memoized: the same few dozen locations repeat throughout a session."""
     if not raw_name: return "Unknown"
-    
-    name = raw_name
-    
+
     # 1. Remove technical prefixes
-    name = re.sub(r'^(OOC_|ObjectContainer_)', '', name, flags=re.IGNORECASE)
-    
+    name = LOCATION_PREFIX_RX.sub('', raw_name)
+
     # 2. Map Internal System Names to Real Names (Stanton System)
-    # This preserves the location context (e.g. "Stanton2b_Outpost" becomes "Daymar_Outpost")
-    body_map = {
-        # Hurston & Moons
-        r'Stanton_?1a\b': "Ariel", r'Stanton_?1b\b': "Aberdeen", 
-        r'Stanton_?1c\b': "Magda", r'Stanton_?1d\b': "Ita",
-        r'Stanton_?1\b': "Hurston",
-        
-        # Crusader & Moons
-        r'Stanton_?2a\b': "Cellin", r'Stanton_?2b\b': "Daymar", r'Stanton_?2c\b': "Yela",
-        r'Stanton_?2\b': "Crusader",
-        
-        # ArcCorp & Moons
-        r'Stanton_?3a\b': "Lyria", r'Stanton_?3b\b': "Wala",
-        r'Stanton_?3\b': "ArcCorp",
-        
-        # MicroTech & Moons
-        r'Stanton_?4a\b': "Calliope", r'Stanton_?4b\b': "Clio", r'Stanton_?4c\b': "Euterpe",
-        r'Stanton_?4\b': "MicroTech",
-    }
-    
-    for pattern, real_name in body_map.items():
-        name = re.sub(pattern, real_name, name, flags=re.IGNORECASE)
+    name = substitute_location_bodies(name)
 
     # 3. Basic cleanup
     name = name.replace('_', ' ')
-    
+
     # 4. Expand Abbreviations & Fix Common Terms
-    replacements = [
-        # Specific Station Mappings (Internal Codes -> Real Names)
-        (r'\bRr\s*Hur\s*Leo\b', 'Everus Harbor'),
-        (r'\bRr\s*Mic\s*Leo\b', 'Port Tressler'),
-        (r'\bRr\s*Arc\s*Leo\b', 'Baijini Point'),
-        (r'\bRr\s*Cru\s*Leo\b', 'Seraphim Station'),
-        
-        (r'\bDistCenter\b', 'Distribution Center'),
-        (r'\bCentro\s+De\s+Distribui[çc][ãa]o\b', 'Distribution Center'),
-        (r'\bInt\b', 'Interchange'),
-        (r'\bStn\b', 'Station'),
-        (r'\bEsta[çc][ãa]o\b', 'Station'),
-        (r'\bSvc\b', 'Services'),
-        (r'\bInd\b', 'Industrial'),
-        (r'\bOutpost\b', 'Outpost'),
-        (r'\bPosto\s+Avan[çc]ado\b', 'Outpost'),
-        (r'\bShelter\b', 'Aid Shelter'),
-        (r'\bAbrigo\b', 'Aid Shelter'),
-        (r'\bMining\b', 'Mining Area'),
-        (r'\bMinera[çc][ãa]o\b', 'Mining Area'),
-        (r'\bProc\b', 'Processing'),
-        (r'\bProcessamento\b', 'Processing'),
-        (r'\bRsrch\b', 'Research'),
-        (r'\bPesquisa\b', 'Research'),
-        (r'\bPlt\b', 'Plant'),
-        (r'\bPlanta\b', 'Plant'),
-        (r'\bFarm\b', 'Farms'),
-        (r'\bFazenda\b', 'Farms'),
-        (r'\bScrap\b', 'Scrapyard'),
-        (r'\bSucata\b', 'Scrapyard'),
-        (r'\bDepot\b', 'Depot'),
-        (r'\bDep[óo]sito\b', 'Depot'),
-        (r'\bLab\b', 'Labs'),
-        (r'\bLaborat[óo]rio\b', 'Labs'),
-        (r'\bPavilion\b', 'Pavilion'),
-        (r'\bPavilh[ãa]o\b', 'Pavilion'),
-        (r'\bObs\b', 'Observatory'),
-        (r'\bObservat[óo]rio\b', 'Observatory'),
-        (r'\bGnd\b', 'Ground'),
-        (r'\bGate\b', 'Gateway'),
-        (r'\bPortal\b', 'Gateway'),
-        (r'\bRefinaria\b', 'Refinery'),
-        
-        # Orbital Markers & Lagrange Points
-        (r'\bOm\b', 'OM'),
-        (r'\bL(\d+)\b', r'L\1'),
-        
-        # Stations
-        (r'\bHur\b', 'HUR'), (r'\bCru\b', 'CRU'), (r'\bArc\b', 'ARC'), (r'\bMic\b', 'MIC'),
-        (r'\bHdpc\b', 'HDPC'), (r'\bBaijini\b(?!\s*Point)', 'Baijini Point'), (r'(?<!Port\s)\bTressler\b', 'Port Tressler'),
-        (r'\bEverus\b(?!\s*Harbor)', 'Everus Harbor'), (r'\bRiker\b(?!\s*Memorial)', 'Riker Memorial'),
-        
-        # Cargo/Units
-        (r'\bScu\b', 'SCU'),
-    ]
-    
-    for pattern, repl in replacements:
-        name = re.sub(pattern, repl, name, flags=re.IGNORECASE)
+    name = substitute_location_terms(name)
 
     # 5. Final Formatting
     name = name.title()
-    
-    # Fix casing for specific acronyms after title()
-    uppercase_words = ["Om", "L1", "L2", "L3", "L4", "L5", "Hur", "Cru", "Arc", "Mic", "Hdpc", "Scu"]
-    for word in uppercase_words:
-        # Use regex to match whole words only to avoid replacing inside other words
-        name = re.sub(r'\b' + word + r'\b', word.upper(), name, flags=re.IGNORECASE)
+    name = LOCATION_ACRONYM_RX.sub(lambda m: m.group(0).upper(), name)
 
     return name.strip()
 
 
+# Regex keys used by process_line and the number of capture groups each one must provide
+PATTERN_GROUPS = {
+    "notif_id_regex": 1,
+    "mission_id_regex": 1,
+    "notif_text_regex": 1,
+    "contract_accepted_regex": 1,
+    "contract_complete_regex": 1,
+    "contract_ended_regex": 1,
+    "reward_regex": 1,
+    "scu_regex": 5,
+    "generic_regex": 3,
+    "marker_mission_id_regex": 1,
+    "marker_contract_regex": 1,
+    "inventory_count_regex": 1,
+    "ui_notif_id_regex": 1,
+    "objective_id_regex": 1,
+    "notif_text_relaxed_regex": 1,
+    "chat_channel_regex": 2,
+    "location_regex": 1,
+    "ship_fallback_regex": 1,
+    "end_mission_id_regex": 1,
+    "completion_type_regex": 1,
+    "mission_ended_id_regex": 1,
+    "mission_state_regex": 1,
+    "reward_notif_id_regex": 1,
+    "line_header_regex": 2,
+}
+
+# Regexes that are always matched case-insensitively
+PATTERN_IGNORECASE = ("scu_regex", "ship_fallback_regex")
+
+# Literal markers matched verbatim against the raw line
+PATTERN_TAGS = (
+    "notification_event", "mission_id_tag", "marker_event", "marker_contract_tag",
+    "inventory_event", "ui_notif_event", "ui_notif_tag",
+)
+
+# Notification keywords (also kept pre-lowered for case-insensitive tests)
+PATTERN_KEYWORDS = (
+    "contract_accepted", "contract_canceled", "contract_abandoned", "contract_failed",
+    "new_objective", "objective_complete", "contract_complete",
+)
+
+
+class PatternSet:
+    """Immutable, pre-compiled view of PATTERNS used by process_line.
+
+    Regex keys become compiled patterns, literal keys keep their raw value and
+    notification keywords also get a pre-lowered `<key>_lc` twin.
+    `report` lists every entry that failed validation and fell back to the built-in default.
+    """
+    __slots__ = (
+        tuple(PATTERN_GROUPS) + PATTERN_TAGS + PATTERN_KEYWORDS
+        + tuple(f"{k}_lc" for k in PATTERN_KEYWORDS)
+        + ("ended_keywords_lc", "objective_keywords", "report")
+    )
+
+    def __init__(self, values, report):
+        for key, value in values.items():
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, "report", tuple(report))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("PatternSet is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("PatternSet is immutable")
+
+
+def compile_patterns(patterns):
+    """Validate and compile a PATTERNS-style dict into a PatternSet"""
+    report = []
+    values = {}
+    source = dict(INTERNAL_PATTERNS)
+    source.update(patterns)
+
+    for key, groups in PATTERN_GROUPS.items():
+        flags = re.IGNORECASE if key in PATTERN_IGNORECASE else 0
+        raw = source.get(key)
+        try:
+            compiled = re.compile(raw, flags)
+            if compiled.groups < groups:
+                raise ValueError(f"expected {groups} capture group(s), got {compiled.groups}")
+        except (re.error, TypeError, ValueError) as e:
+            fallback = DEFAULT_PATTERNS.get(key, INTERNAL_PATTERNS.get(key))
+            report.append(f"{key}: {e} - using built-in default")
+            compiled = re.compile(fallback, flags)
+        values[key] = compiled
+
+    for key in PATTERN_TAGS + PATTERN_KEYWORDS:
+        raw = source.get(key)
+        if not isinstance(raw, str) or not raw:
+            report.append(f"{key}: expected a non-empty string - using built-in default")
+            raw = DEFAULT_PATTERNS[key]
+        values[key] = raw
+        if key in PATTERN_KEYWORDS:
+            values[f"{key}_lc"] = raw.lower()
+
+    for key in patterns:
+        if key not in values:
+            report.append(f"{key}: unknown pattern key (ignored)")
+
+    values["ended_keywords_lc"] = (values["contract_canceled_lc"], values["contract_abandoned_lc"], values["contract_failed_lc"])
+    values["objective_keywords"] = (
+        values["new_objective"], values["objective_complete"],
+        "Novo Objetivo", "Novo objetivo", "Objetivo Completo", "Objetivo completo",
+    )
+    return PatternSet(values, report)
+
+
+PATTERN_SET = compile_patterns(PATTERNS)
+
+
 def load_saved_config():
     """Load saved config (if any) from disk and merge into globals."""
-    global LOG_PATH, WEB_PORT, WEB_HOST, REFRESH_INTERVAL_MS, PATTERNS, LANGUAGE, LOG_LANGUAGE
+    global LOG_PATH, WEB_PORT, WEB_HOST, REFRESH_INTERVAL_MS, PATTERNS, LANGUAGE, LOG_LANGUAGE, PATTERN_SET, BACKFILL_MAX_MB, SAVE_INTERVAL_MS, HISTORY_BACKEND
+    global WEB_SERVER_MODE, WEB_THREADS, WEB_QUEUE, WEB_KEEPALIVE_S
     try:
         if os.path.exists(CONFIG_FILE):
             with open(CONFIG_FILE, 'r', encoding='utf-8') as fh:
@@ -444,6 +1546,13 @@ def load_saved_config():
                 if 'refresh_interval_ms' in cfg: REFRESH_INTERVAL_MS = int(cfg.get('refresh_interval_ms', 2000))
                 if 'language' in cfg: LANGUAGE = cfg.get('language', 'en')
                 if 'log_language' in cfg: LOG_LANGUAGE = cfg.get('log_language', 'en')
+                if 'backfill_max_mb' in cfg: BACKFILL_MAX_MB = float(cfg.get('backfill_max_mb', 0) or 0)
+                if 'save_interval_ms' in cfg: SAVE_INTERVAL_MS = int(cfg.get('save_interval_ms', 500))
+                if 'history_backend' in cfg: HISTORY_BACKEND = "sqlite" if str(cfg.get('history_backend')).lower() == "sqlite" else "json"
+                if 'web_server' in cfg: WEB_SERVER_MODE = "dev" if str(cfg.get('web_server')).lower() == "dev" else "pool"
+                if 'web_threads' in cfg: WEB_THREADS = max(2, int(cfg.get('web_threads', 32)))
+                if 'web_queue' in cfg: WEB_QUEUE = max(1, int(cfg.get('web_queue', 64)))
+                if 'web_keepalive_s' in cfg: WEB_KEEPALIVE_S = float(cfg.get('web_keepalive_s', 5))
 
                 # Load external patterns based on log_language
                 pattern_file = os.path.join(BASE_DIR, f"patterns_{LOG_LANGUAGE}.json")
@@ -460,7 +1569,12 @@ def load_saved_config():
                 if 'patterns' in cfg:
                     PATTERNS.update(cfg['patterns'])
                     print("✓ Loaded custom patterns from config (Legacy)")
-                    
+
+                # Compile once; process_line only uses PATTERN_SET
+                PATTERN_SET = compile_patterns(PATTERNS)
+                for problem in PATTERN_SET.report:
+                    print(f"⚠ Pattern {problem}")
+
                 return True
     except Exception as e:
         print(f"⚠ Failed to load config: {e}")
@@ -490,11 +1604,422 @@ def save_config(log_path=None):
 
 
 
+# --- LOG EVENTS ---
+# parse_line() turns one Game.log line into the events it carries. It only reads the line
+# and the compiled patterns (no data_store, no printing), so it can be benchmarked, batched
+# or run in worker processes. HaulingMonitor.apply() owns every change to the state.
+
+class Event:
+    """Base of the parsed log events. The fields of each event are its __slots__."""
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self.__slots__):
+            raise TypeError(f"{type(self).__name__} takes {len(self.__slots__)} fields")
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+        for name in self.__slots__[len(args):]:
+            setattr(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__}: unknown fields {sorted(kwargs)}")
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class NotificationSeen(Event):
+    """SHUD notification id (the UI fallback skips ids already seen)"""
+    __slots__ = ("notif_id",)
+
+class UiNotificationSeen(Event):
+    """UpdateNotificationItem StartFade; an id seen before ends the line"""
+    __slots__ = ("notif_id",)
+
+class ContractAccepted(Event):
+    """origin: "native" (SHUD + MissionId), "ui" (UpdateNotificationItem) or "fallback" (other lines with a MissionId)"""
+    __slots__ = ("origin", "mission_id", "title")
+
+class ContractEnded(Event):
+    """Contract canceled / abandoned / failed notification"""
+    __slots__ = ("mission_id", "title")
+
+class SalvageCompleted(Event):
+    """Contract complete notification for salvage contracts"""
+    __slots__ = ("mission_id", "title")
+
+class ObjectiveUpdate(Event):
+    """New Objective / Objective Complete. action is None when the SCU details did not parse."""
+    __slots__ = ("origin", "mission_id", "objective_id", "action", "current", "total",
+                 "material", "location", "item_type", "complete", "text")
+
+class InventoryCount(Event):
+    """Cargo elevator grid count (-1 when unreadable)"""
+    __slots__ = ("count",)
+
+class NotificationMapped(Event):
+    """Notification id -> mission id, used to attribute rewards"""
+    __slots__ = ("notif_id", "mission_id")
+
+class RewardAwarded(Event):
+    """'Awarded N aUEC'. amount is None when only the notification id was readable."""
+    __slots__ = ("notif_id", "amount", "ui_notif_id", "line_hash")
+
+class MissionEnded(Event):
+    """EndMission / MissionEnded with the completion normalized (SUCCESS, ABANDON, FAIL, ...)"""
+    __slots__ = ("mission_id", "completion")
+
+class LocationChanged(Event):
+    __slots__ = ("location",)
+
+class IdentityDetected(Event):
+    __slots__ = ("ship", "player")
+
+class ShipDetected(Event):
+    __slots__ = ("ship",)
+
+NO_EVENTS = ()
+
+# Action verbs treated as pickups (SHUD notifications vs UI / fallback lines, as before)
+PICKUP_ACTIONS_NATIVE = ('COLLECT', 'PICKUP', 'RETRIEVE', 'COLETAR', 'PEGAR', 'TRANSPORTAR', 'PEGUE', 'COLETE')
+PICKUP_ACTIONS_UI = ('COLLECT', 'PICKUP', 'RETRIEVE', 'COLETAR', 'PEGAR', 'ENTREGAR', 'DEIXAR', 'TRANSPORTAR')
+SALVAGE_KEYWORDS = ("Salvage Rights", "Recycling", "Claim", "Unverified")
+
+def parse_cargo(obj_match, pickup_actions):
+    """(action, current, total, material, location, item_type) from a scu_regex match"""
+    action = obj_match.group(1).upper()
+    val1 = int(obj_match.group(2))
+    val2 = obj_match.group(3)
+    if val2:
+        current, total = val1, int(val2)
+    else:
+        current, total = 0, val1
+    material = obj_match.group(4).strip().upper()
+    location = clean_location_name(obj_match.group(5))
+    item_type = "PICKUP" if action in pickup_actions else "DELIVERY"
+    return action, current, total, material, location, item_type
+
+def parse_reward(line, ps):
+    """RewardAwarded for lines mentioning aUEC, else None"""
+    if "aUEC" not in line:
+        return None
+    nid_match = ps.reward_notif_id_regex.search(line)
+    reward_match = ps.reward_regex.search(line)
+    if not nid_match and not reward_match:
+        return None
+    try:
+        amount = int(reward_match.group(1)) if reward_match else None
+    except ValueError:
+        amount = None
+    ui_notif_id = None
+    if ps.ui_notif_event in line:
+        ui_match = ps.ui_notif_id_regex.search(line)
+        ui_notif_id = ui_match.group(1) if ui_match else None
+    # Deterministic id for orphan rewards (same line -> same id across restarts)
+    line_hash = hashlib.md5(line.encode('utf-8', 'ignore')).hexdigest()[:10]
+    return RewardAwarded(nid_match.group(1) if nid_match else None, amount, ui_notif_id, line_hash)
+
+def parse_ship(line, ps):
+    """ShipDetected from the ship fallback regex, else None"""
+    ship_fallback = ps.ship_fallback_regex.search(line)
+    if ship_fallback:
+        return ShipDetected(ship_fallback.group(1).replace('_', ' ').upper())
+    return None
+
+def parse_identity(line, ps, want_ship):
+    """Chat channel identity and, while the ship is unknown, the ship fallback"""
+    events = []
+    chat_match = ps.chat_channel_regex.search(line)
+    if chat_match:
+        events.append(IdentityDetected(chat_match.group(1).strip().upper(), chat_match.group(2).strip()))
+    if want_ship:
+        ship = parse_ship(line, ps)
+        if ship:
+            events.append(ship)
+    return events
+
+def parse_native_fallback(line, ps):
+    """Contract / objective text with a MissionId outside SHUD notifications"""
+    if ps.notification_event in line or ps.mission_id_tag not in line:
+        return []
+    events = []
+    if ps.contract_accepted in line:
+        id_match = ps.mission_id_regex.search(line)
+        if id_match:
+            title_match = ps.contract_accepted_regex.search(line)
+            events.append(ContractAccepted("fallback", id_match.group(1), title_match.group(1).strip() if title_match else None))
+    if any(kw in line for kw in ps.objective_keywords):
+        id_match = ps.mission_id_regex.search(line)
+        obj_match = ps.scu_regex.search(line)
+        if id_match and obj_match:
+            events.append(ObjectiveUpdate("fallback", id_match.group(1), None,
+                                          *parse_cargo(obj_match, PICKUP_ACTIONS_UI),
+                                          ps.objective_complete in line, None))
+    return events
+
+def parse_mission_end(line, ps):
+    """MissionEnded from <EndMission> or the <MissionEnded> push message, else None"""
+    if not (("<EndMission>" in line and "MissionId" in line) or ("<MissionEnded>" in line and "mission_id" in line)):
+        return None
+    # Pattern A: <EndMission>
+    id_match_a = ps.end_mission_id_regex.search(line)
+    # Pattern B: <MissionEnded> push message
+    id_match_b = ps.mission_ended_id_regex.search(line)
+    if id_match_a:
+        type_match_a = ps.completion_type_regex.search(line)
+        m_id = id_match_a.group(1)
+        comp_type = type_match_a.group(1).upper() if type_match_a else "UNKNOWN"
+    elif id_match_b:
+        state_match_b = ps.mission_state_regex.search(line)
+        m_id = id_match_b.group(1)
+        raw_state = state_match_b.group(1) if state_match_b else "UNKNOWN"
+        comp_type = {"COMPLETED": "SUCCESS", "ABANDONED": "ABANDON", "FAILED": "FAIL"}.get(raw_state, raw_state)
+    else:
+        return None
+    if not m_id:
+        return None
+    # Normalizar SUCCESS/COMPLETE
+    if comp_type in ["COMPLETE", "COMPLETED"]:
+        comp_type = "SUCCESS"
+    return MissionEnded(m_id, comp_type)
+
+def parse_shud_notification(line, ps, want_ship=True):
+    """<SHUDEvent_OnNotification>: the notification with the real backend MissionId"""
+    events = []
+    nid_match = ps.notif_id_regex.search(line)
+    if nid_match:
+        events.append(NotificationSeen(nid_match.group(1)))
+
+    mid_match = ps.mission_id_regex.search(line)
+    mission_id = mid_match.group(1) if mid_match else None
+    # Objective ID (for uniqueness of identical items)
+    obj_id_match = ps.objective_id_regex.search(line)
+    objective_id = obj_id_match.group(1) if obj_id_match else None
+
+    # Standard regex first, then the relaxed one (no closing quote required)
+    text_match = ps.notif_text_regex.search(line) or ps.notif_text_relaxed_regex.search(line)
+    if text_match:
+        text = text_match.group(1)
+        text_lc = text.lower()
+
+        if ps.contract_accepted_lc in text_lc:
+            if mission_id:
+                title_match = ps.contract_accepted_regex.search(text)
+                events.append(ContractAccepted("native", mission_id, title_match.group(1).strip() if title_match else "Unknown Contract"))
+
+        elif any(kw in text_lc for kw in ps.ended_keywords_lc):
+            title_match = ps.contract_ended_regex.search(text)
+            events.append(ContractEnded(mission_id, title_match.group(1).strip() if title_match else None))
+
+        elif ps.contract_complete_lc in text_lc:
+            title_match = ps.contract_complete_regex.search(text)
+            title = title_match.group(1).strip() if title_match else "Unknown Contract"
+            # Only salvage contracts (Salvage Rights, Recycling, Claim, Unverified) are handled here
+            if any(k in title for k in SALVAGE_KEYWORDS):
+                events.append(SalvageCompleted(mission_id, title))
+
+        elif ps.new_objective_lc in text_lc or ps.objective_complete_lc in text_lc:
+            obj_match = ps.scu_regex.search(text)
+            cargo = parse_cargo(obj_match, PICKUP_ACTIONS_NATIVE) if obj_match else (None,) * 6
+            events.append(ObjectiveUpdate("native", mission_id, objective_id, *cargo,
+                                          ps.objective_complete_lc in text_lc, text))
+
+    # Inventory / elevator activity
+    if ps.inventory_event in line:
+        count_match = ps.inventory_count_regex.search(line)
+        if count_match:
+            try:
+                count = int(count_match.group(1))
+            except ValueError:
+                count = -1
+            events.append(InventoryCount(count))
+
+    if nid_match and mid_match:
+        events.append(NotificationMapped(nid_match.group(1), mid_match.group(1)))
+
+    reward = parse_reward(line, ps)
+    if reward:
+        events.append(reward)
+    return events
+
+def parse_ui_notification(line, ps, want_ship=True):
+    """<UpdateNotificationItem>: UI fallback when the backend MissionId is missing"""
+    events = []
+    if ps.ui_notif_tag in line:
+        # Only "Action: StartFade" is processed: the log registers each notification 3x
+        # (Added, StartFade, Remove) and StartFade is the most reliable point.
+        if "Action: StartFade" not in line:
+            return NO_EVENTS
+
+        notif_id_match = ps.ui_notif_id_regex.search(line)
+        if notif_id_match:
+            events.append(UiNotificationSeen(notif_id_match.group(1)))
+
+        if ps.contract_accepted in line:
+            if not notif_id_match:
+                # The mission id is derived from the notification id
+                return events
+            title_match = ps.contract_accepted_regex.search(line)
+            title = title_match.group(1).strip() if title_match else "Unknown Contract"
+            events.append(ContractAccepted("ui", f"ui_{notif_id_match.group(1)}", title))
+
+        elif ps.new_objective in line or ps.objective_complete in line:
+            obj_match = ps.scu_regex.search(line)
+            if obj_match:
+                events.append(ObjectiveUpdate("ui", None, None, *parse_cargo(obj_match, PICKUP_ACTIONS_UI),
+                                              ps.objective_complete in line, None))
+
+    events.extend(parse_native_fallback(line, ps))
+    reward = parse_reward(line, ps)
+    if reward:
+        events.append(reward)
+    return events
+
+def parse_location_inventory(line, ps, want_ship=True):
+    """<RequestLocationInventory> Player[...] requested inventory for Location[Stanton1_...]"""
+    if "<RequestLocationInventory>" in line and "Location[" in line:
+        loc_match = ps.location_regex.search(line)
+        if loc_match:
+            return [LocationChanged(clean_location_name(loc_match.group(1)))]
+    return NO_EVENTS
+
+def parse_mission_end_line(line, ps, want_ship=True):
+    event = parse_mission_end(line, ps)
+    return [event] if event else NO_EVENTS
+
+def parse_other(line, ps, want_ship=True):
+    """Event tags without a parser: only identity / ship detection can apply"""
+    if "joined channel" in line:
+        return parse_identity(line, ps, want_ship)
+    if want_ship:
+        ship = parse_ship(line, ps)
+        if ship:
+            return [ship]
+    return NO_EVENTS
+
+def parse_untagged(line, ps, want_ship=True):
+    """Lines without a header (e.g. wrapped notification text): run every check"""
+    if ps.notification_event in line:
+        return parse_shud_notification(line, ps)
+    if ps.ui_notif_event in line:
+        return parse_ui_notification(line, ps)
+    events = parse_identity(line, ps, want_ship)
+    events.extend(parse_native_fallback(line, ps))
+    if "<EndMission>" in line or "<MissionEnded>" in line:
+        ended = parse_mission_end(line, ps)
+        if ended:
+            events.append(ended)
+    reward = parse_reward(line, ps)
+    if reward:
+        events.append(reward)
+    return events
+
+line_parsers = (None, {})  # (PatternSet, {event tag: parser}) rebuilt when PATTERN_SET changes
+
+def parsers_for(ps):
+    """Map log event tags to their parser for this PatternSet"""
+    global line_parsers
+    if line_parsers[0] is not ps:
+        line_parsers = (ps, {
+            ps.notification_event.strip("<>"): parse_shud_notification,
+            ps.ui_notif_event.strip("<>"): parse_ui_notification,
+            "RequestLocationInventory": parse_location_inventory,
+            "EndMission": parse_mission_end_line,
+            "MissionEnded": parse_mission_end_line,
+        })
+    return line_parsers[1]
+
+def parse_header_line(line, header, ps, want_ship=True):
+    """parse_line for a stripped line whose header match is already known"""
+    if not header:
+        return parse_untagged(line, ps, want_ship)
+    parser = parsers_for(ps).get(header.group(2))
+    if parser is None:
+        return parse_other(line, ps, want_ship)
+    return parser(line, ps, want_ship)
+
+def parse_line(line, ps=None, want_ship=True):
+    """Events carried by one log line, in the order they must be applied (empty when none).
+
+    Pure: reads only the line and the PatternSet. want_ship=False skips the costly ship
+    fallback search once the ship is known (the applier re-checks it anyway).
+    """
+    ps = ps or PATTERN_SET
+    line = line.strip()
+    return parse_header_line(line, ps.line_header_regex.match(line), ps, want_ship)
+
+
 class HaulingMonitor:
     def __init__(self):
         self.processed_ids = set()
-        self.processed_notification_ids = set()
-        self.processed_reward_ids = set()
+        # Notification ids restart with every game launch: only the current log's are kept (bounded)
+        self.processed_notification_ids = DedupeRegistry(max_items=NOTIFICATION_IDS_MAX)
+        self.processed_reward_ids = DedupeRegistry(max_items=NOTIFICATION_IDS_MAX)
+        self.last_notification_mission_id = None
+        self.last_log_ts = None
+        self.log_clock = False  # Stamp new missions with the log's time instead of now (archive import)
+        # Event type -> applier. An applier returning True skips the rest of the line's events.
+        self.appliers = {
+            NotificationSeen: self.apply_notification_seen,
+            UiNotificationSeen: self.apply_ui_notification_seen,
+            ContractAccepted: self.apply_contract_accepted,
+            ContractEnded: self.apply_contract_ended,
+            SalvageCompleted: self.apply_salvage_completed,
+            ObjectiveUpdate: self.apply_objective_update,
+            InventoryCount: self.apply_inventory_count,
+            NotificationMapped: self.apply_notification_mapped,
+            RewardAwarded: self.apply_reward,
+            MissionEnded: self.apply_mission_ended,
+            LocationChanged: self.apply_location,
+            IdentityDetected: self.apply_identity,
+            ShipDetected: self.apply_ship,
+        }
+
+    # Notification/reward ids kept in the checkpoint: a SHUD line and its UI update can
+    # straddle the checkpoint, and the UI path must still know the id was handled.
+    CHECKPOINT_IDS = 500
+
+    def clock(self):
+        """"started" stamp for a new mission"""
+        if self.log_clock:
+            local = log_local_time(self.last_log_ts)
+            if local is not None:
+                return local.strftime("%H:%M:%S")
+        return time.strftime("%H:%M:%S")
+
+    def checkpoint(self, path, offset, header_hash):
+        """Record the ingest position in data_store (saved with the state). The position is a
+        few scalars; the newest notification/reward ids go to registries (INGEST_ID_KEYS) that
+        the journal only extends, started over every CHECKPOINT_IDS new ids."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = offset
+        data_store["ingest_checkpoint"] = {
+            "path": path,
+            "offset": offset,
+            "size": size,
+            "header_hash": header_hash,
+            "last_ts": self.last_log_ts,
+            "last_notification_mission_id": self.last_notification_mission_id
+        }
+        for key, ids in zip(INGEST_ID_KEYS, (self.processed_notification_ids, self.processed_reward_ids)):
+            saved = data_store.get(key)
+            if not isinstance(saved, DedupeRegistry) or len(saved) > 2 * self.CHECKPOINT_IDS:
+                saved = data_store[key] = DedupeRegistry()
+            saved.update(ids.tail(self.CHECKPOINT_IDS))
+
+    def restore_checkpoint(self, checkpoint):
+        """Restore the in-memory dedupe state saved with the checkpoint"""
+        # Older checkpoints kept the ids inline
+        self.processed_notification_ids.update(checkpoint.get("notification_ids") or data_store.get(INGEST_ID_KEYS[0]) or [])
+        self.processed_reward_ids.update(checkpoint.get("reward_ids") or data_store.get(INGEST_ID_KEYS[1]) or [])
+        self.last_notification_mission_id = checkpoint.get("last_notification_mission_id")
+        self.last_log_ts = checkpoint.get("last_ts")
+
+    def new_log(self):
+        """The game was relaunched (new Game.log): its notification ids start over"""
+        self.processed_notification_ids.clear()
+        self.processed_reward_ids.clear()
         self.last_notification_mission_id = None
 
     def archive_specific_mission(self, stale_id, new_mission_id=None):
@@ -508,6 +2033,7 @@ class HaulingMonitor:
         
         # --- SMART MERGE ---
         if new_mission_id and new_mission_id in data_store["missions"]:
+            mark_mission(new_mission_id)
             old_items = data_store["missions"][stale_id]["items"]
             new_items = data_store["missions"][new_mission_id]["items"]
             
@@ -548,11 +2074,12 @@ class HaulingMonitor:
         
         # CRITICAL: Add to processed_mission_ids IMMEDIATELY to prevent Log Reader from re-adding it
         if "processed_mission_ids" not in data_store:
-            data_store["processed_mission_ids"] = []
+            data_store["processed_mission_ids"] = DedupeRegistry()
         if stale_id not in data_store["processed_mission_ids"]:
             data_store["processed_mission_ids"].append(stale_id)
             
         del data_store["missions"][stale_id]
+        mark_mission(stale_id)
         save_state()
 
     def archive_stale_mission(self, title, new_mission_id=None):
@@ -600,914 +2127,1121 @@ class HaulingMonitor:
             self.archive_specific_mission(duplicate_found_id, new_mission_id=current_mission_id)
 
     def process_line(self, line):
+        """Parse one log line and apply its events in order"""
         line = line.strip()
+        ps = PATTERN_SET
+        header = ps.line_header_regex.match(line)
+        if header:
+            self.last_log_ts = header.group(1)
+        want_ship = data_store["ship_name"] == "Waiting for Ship..."
+        self.apply_all(parse_header_line(line, header, ps, want_ship))
+
+    def apply_all(self, events):
+        """Apply the events of one line; an applier returning True skips the rest of the line"""
+        if events:
+            STATE.touch()
+        for event in events:
+            if self.appliers[type(event)](event):
+                break
+
+    def apply(self, event):
+        """Apply a single event to data_store. Returns True when the line must not be processed further"""
+        return self.appliers[type(event)](event)
+
+    def apply_notification_seen(self, ev):
+        # Prevents the UI fallback from processing the same notification again
+        self.processed_notification_ids.add(ev.notif_id)
+
+    def apply_ui_notification_seen(self, ev):
+        # StartFade, Remove, etc. repeat the id
+        if ev.notif_id in self.processed_notification_ids:
+            return True # Already processed this notification event
+        self.processed_notification_ids.add(ev.notif_id)
+
+    def apply_contract_accepted(self, ev):
+        mission_id = ev.mission_id
+        if ev.origin == "native":
+            # IDEMPOTENCY CHECK
+            # Check against history to allow re-adding "deleted" active missions
+            if mission_id in HISTORY:
+                # print(f"♻️ {T('source_log_native', 'ui')}: Ignored known finished mission {mission_id}")
+                return
+            if mission_id in data_store["missions"]:
+                return
+            title = ev.title
+            # The duplication seen when reading old history is handled by the smart merge below
+            data_store["missions"][mission_id] = {
+                "id": mission_id,
+                "title": title,
+                "items": {},
+                "started": self.clock(),
+                "source": "LOG (Native)",
+                "status": "ACTIVE",
+                "explicitly_accepted": True
+            }
+            mark_mission(mission_id)
+
+            # AUTO-CLEANUP: Smart Merge v1
+            # If we have a MANUAL/UI mission with the SAME TITLE, we assume the LOG (Native)
+            # is the correct one (it has the valid ID) and we merge/replace the manual one.
+            to_remove = []
+
+            # CRITICAL FIX: Iterate over a COPY of items to prevent "dictionary changed size during iteration"
+            # This was causing the log reader to crash silently when multiple missions existed.
+            for existing_id, existing_mission in list(data_store["missions"].items()):
+                if existing_mission["title"] == title and existing_mission.get("source") in ["MANUAL", "UI", "LOG (UI)"]:
+                    to_remove.append(existing_id)
+
+            for rem_id in to_remove:
+                if rem_id in data_store["missions"]: # Double check
+                    del data_store["missions"][rem_id]
+                    mark_mission(rem_id)
+                    print(f"🔄 {T('smart_merge', 'log', 'Smart Merge')}: {T('replaced_manual', 'log', 'Replaced Manual/UI entry with Log entry')} ({rem_id} -> {mission_id})")
+
+            print(f"✅ LOG (Native): Mission Accepted - {title} (ID: {mission_id})")
+            data_store["mission_status"] = "ACTIVE"
+            save_state()
 
-        # --- NEW: SHUDEvent Notification with MissionID (PRIORITY) ---
-        # Handles events that contain the real Backend Mission ID
-        # MODIFIED: Allow processing even if MissionId is missing (Split Log Support)
-        if PATTERNS["notification_event"] in line:
-            # Extract Notification ID to prevent duplicates in fallback logic
-            notif_id_match = re.search(PATTERNS["notif_id_regex"], line)
-            if notif_id_match:
-                self.processed_notification_ids.add(notif_id_match.group(1))
-
-            # Extract Mission ID
-            mid_match = re.search(PATTERNS["mission_id_regex"], line)
-            mission_id = mid_match.group(1) if mid_match else None
-            
-            # Extract Objective ID (for uniqueness of identical items)
-            obj_id_match = re.search(r'ObjectiveId:\s*\[(.*?)\]', line)
-            objective_id = obj_id_match.group(1) if obj_id_match else None
-
-            # Extract Notification Text (Relaxed regex)
-            # Try standard regex first
-            text_match = re.search(PATTERNS["notif_text_regex"], line)
-            if not text_match:
-                # Try relaxed regex (no closing quote required)
-                text_match = re.search(r'Added notification "(.*?)(?:"|$)', line)
-
-            if text_match:
-                notification_text = text_match.group(1)
-                
-                # 1. Contract Accepted
-                is_contract_accepted = PATTERNS["contract_accepted"].lower() in notification_text.lower()
+        elif ev.origin == "ui":
+            # Deterministic ID based on Notification ID (to allow persistence/deletion)
+            self.last_notification_mission_id = mission_id
 
-                if is_contract_accepted:
-                    if mission_id:
-                        title_match = re.search(PATTERNS["contract_accepted_regex"], notification_text)
-                        title = title_match.group(1).strip() if title_match else "Unknown Contract"
-                        
-                        # IDEMPOTENCY CHECK
-                        # Check against history (finished_fixed) to allow re-adding "deleted" active missions
-                        is_finished = False
-                        if "finished_fixed" in data_store:
-                            for fh in data_store["finished_fixed"]:
-                                if fh.get("id") == mission_id:
-                                    is_finished = True
-                                    break
-                        
-                        if is_finished:
-                             # print(f"♻️ {T('source_log_native', 'ui')}: Ignored known finished mission {mission_id}")
-                             pass 
-                        elif mission_id not in data_store["missions"]:
-                            # --- TIMESTAMP CHECK ---
-                            # If log line has timestamp, ignore if too old (e.g. > 6 hours from now)
-                            # But wait, we are reading history. We compare against session_start? 
-                            # Or just ignore if > 12h old absolute?
-                            # Better: If we have multiple missions with same title, keep only the NEWEST one.
-                            
-                            # For now, let's just add it. The duplication is likely due to reading old history without a clear "End" event.
-                            
-                            data_store["missions"][mission_id] = {
-                                "id": mission_id,
-                                "title": title,
-                                "items": {},
-                                "started": time.strftime("%H:%M:%S"),
-                                "source": "LOG (Native)",
-                                "status": "ACTIVE",
-                                "explicitly_accepted": True
-                            }
-                            
-                            # AUTO-CLEANUP: Smart Merge v1
-                            # If we have a MANUAL/UI mission with the SAME TITLE, we assume the LOG (Native)
-                            # is the correct one (it has the valid ID) and we merge/replace the manual one.
-                            to_remove = []
-                            
-                            # CRITICAL FIX: Iterate over a COPY of items to prevent "dictionary changed size during iteration"
-                            # This was causing the log reader to crash silently when multiple missions existed.
-                            for existing_id, existing_mission in list(data_store["missions"].items()):
-                                if existing_mission["title"] == title and existing_mission.get("source") in ["MANUAL", "UI", "LOG (UI)"]:
-                                    to_remove.append(existing_id)
-                            
-                            for rem_id in to_remove:
-                                if rem_id in data_store["missions"]: # Double check
-                                    del data_store["missions"][rem_id]
-                                    print(f"🔄 {T('smart_merge', 'log', 'Smart Merge')}: {T('replaced_manual', 'log', 'Replaced Manual/UI entry with Log entry')} ({rem_id} -> {mission_id})")
-
-                            print(f"✅ LOG (Native): Mission Accepted - {title} (ID: {mission_id})")
-                            data_store["mission_status"] = "ACTIVE"
-                            save_state()
-                        
-                # 1.5 Contract Canceled / Abandoned / Failed
-                elif any(PATTERNS.get(key, "").lower() in notification_text.lower() for key in ["contract_canceled", "contract_abandoned", "contract_failed"]):
-                    # Extract title
-                    title_match = re.search(PATTERNS["contract_ended_regex"], notification_text)
-                    title = title_match.group(1).strip() if title_match else None
-                    
-                    if title:
-                        print(f"🛑 Mission Ended: {title}")
-                        self.archive_stale_mission(title)
-                    elif mission_id and mission_id in data_store["missions"]:
-                        print(f"🛑 Mission Ended (ID Match): {mission_id}")
-                        self.archive_specific_mission(mission_id)
-                    save_state()
+            # IDEMPOTENCY CHECK
+            if mission_processed(mission_id):
+                return True
 
-                # 1.6 Contract Complete (Specific Handling for Salvage/Special Missions)
-                elif PATTERNS["contract_complete"].lower() in notification_text.lower():
-                    title_match = re.search(PATTERNS["contract_complete_regex"], notification_text)
-                    title = title_match.group(1).strip() if title_match else "Unknown Contract"
-                    
-                    # SALVAGE MISSION DETECTION
-                    # Keywords: Salvage Rights, Recycling, Claim, Unverified
-                    if any(k in title for k in ["Salvage Rights", "Recycling", "Claim", "Unverified"]):
-                        print(f"♻️ Salvage Mission Complete: {title}")
-                        
-                        # 1. Add to Hangar (Always, as requested by user)
-                        if "hangar" not in data_store: data_store["hangar"] = []
-                        data_store["hangar"].append({
-                            "loc": T('unknown_location', 'ui', 'Unknown Location (Edit)'),
-                            "mat": T('salvage_material', 'ui', 'Salvage Material (Edit)'),
-                            "qty": 0,
-                            "added": time.strftime("%H:%M:%S")
-                        })
-                        print(f"🏭 Added Salvage to Hangar: {title}")
-                        
-                        # 2. Handle History
-                        # Check if we have an active mission with this title or ID
-                        found_active = False
-                        if mission_id and mission_id in data_store["missions"]:
-                             found_active = True
-                             self.archive_specific_mission(mission_id)
-                        else:
-                             # Try title match
-                             for mid, mdata in list(data_store["missions"].items()):
-                                 if mdata["title"] == title:
-                                     found_active = True
-                                     self.archive_specific_mission(mid)
-                                     break
-                        
-                        if not found_active:
-                            # Create synthetic history entry if not found active
-                             hist_id = mission_id if mission_id else f"SALVAGE_{int(time.time())}"
-                             
-                             # Idempotency Check
-                             if hist_id not in data_store.get("processed_mission_ids", []):
-                                 hist_entry = {
-                                    "id": hist_id,
-                                    "title": title,
-                                    "items": { "1": { "mat": "Salvage", "dest": "Hangar", "vol": 0, "status": "COMPLETED", "type": "SALVAGE" } },
-                                    "started": time.strftime("%H:%M:%S"),
-                                    "time": time.strftime("%H:%M:%S"),
-                                    "status": "COMPLETED",
-                                    "value": 0 # Unknown value until user inputs
-                                 }
-                                 if "finished_missions" not in data_store: data_store["finished_missions"] = []
-                                 data_store["finished_missions"].insert(0, hist_entry)
-                                 append_finish(hist_entry)
-                                 
-                                 if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = []
-                                 data_store["processed_mission_ids"].append(hist_id)
-                                 save_state()
-
-                # 2. New Objective / Objective Complete
-                elif (
-                    PATTERNS["new_objective"].lower() in notification_text.lower() or 
-                    PATTERNS["objective_complete"].lower() in notification_text.lower()
-                ):
-                    
-                    # IDEMPOTENCY CHECK: Ignore updates for known finished missions
-                    is_finished = False
-                    if mission_id and "finished_fixed" in data_store:
-                         for fh in data_store["finished_fixed"]:
-                             if fh.get("id") == mission_id:
-                                 is_finished = True
-                                 break
-                    
-                    if is_finished:
-                         return 
-
-                    # If we have a mission_id, ensure it exists
-                    if mission_id and mission_id not in data_store["missions"]:
-                         data_store["missions"][mission_id] = {
-                            "id": mission_id,
-                            "title": "Unknown Mission (Native)",
-                            "items": {},
-                            "started": time.strftime("%H:%M:%S"),
-                            "source": "LOG (Native)",
-                            "status": "ACTIVE"
-                        }
-                    
-                    # Parse Objective
-                    obj_match = re.search(
-                        PATTERNS["scu_regex"], 
-                        notification_text, re.IGNORECASE
-                    )
-                    
-                    if obj_match:
-                        action = obj_match.group(1).upper()
-                        val1 = int(obj_match.group(2))
-                        val2 = obj_match.group(3)
-                        
-                        if val2:
-                            current = val1
-                            total = int(val2)
-                        else:
-                            current = 0 
-                            total = val1
-
-                        material = obj_match.group(4).strip().upper()
-                        location = clean_location_name(obj_match.group(5))
-                        
-                        is_pickup = action in ['COLLECT', 'PICKUP', 'RETRIEVE', 'COLETAR', 'PEGAR', 'TRANSPORTAR', 'PEGUE', 'COLETE']
-                        type_str = "PICKUP" if is_pickup else "DELIVERY"
-                        
-                        # Include total in key to distinguish different quantities to same destination (e.g. 29 SCU vs 31 SCU)
-                        # Use Objective ID if available for absolute uniqueness
-                        if objective_id:
-                             item_key = f"{material}_{location}_{type_str}_{total}_{objective_id}"
-                        else:
-                             item_key = f"{material}_{location}_{type_str}_{total}"
-                        
-                        is_complete_event = PATTERNS["objective_complete"].lower() in notification_text.lower()
-                        status_val = "COMPLETED" if (is_complete_event or (current >= total and total > 0)) else "PENDING"
-                        
-                        # GLOBAL SEARCH FALLBACK (Smart Match)
-                        # If Mission ID is missing (Split Log), find matching item in ANY active mission
-                        target_mission_id = mission_id
-                        
-                        # Helper for fuzzy matching location
-                        def is_loc_match(loc1, loc2):
-                            l1, l2 = loc1.lower(), loc2.lower()
-                            return l1 == l2 or l1 in l2 or l2 in l1
-
-                        if not target_mission_id:
-                            # 1. Search for EXACT match
-                            for m_id, m_data in data_store["missions"].items():
-                                if item_key in m_data["items"]:
-                                    target_mission_id = m_id
-                                    print(f"🔍 Smart Match (Exact): Found item in mission {m_id}")
-                                    break
-                            
-                            # 2. Search for FUZZY match if not found
-                            if not target_mission_id:
-                                # First pass: Look for PENDING items (Prioritize uncompleted items)
-                                for m_id, m_data in data_store["missions"].items():
-                                    for k, v in m_data["items"].items():
-                                        # Check volume match to avoid merging distinct items (e.g. 29 vs 31 SCU)
-                                        if v["mat"] == material and is_loc_match(v["dest"], location) and v.get("status") != "COMPLETED" and v.get("vol") == total:
-                                            if objective_id and objective_id not in k: continue
-                                            target_mission_id = m_id
-                                            item_key = k # ADOPT EXISTING KEY
-                                            print(f"🔍 Smart Match (Fuzzy - Pending): Found item {k} in {m_id}")
-                                            break
-                                    if target_mission_id: break
-                                
-                                # Second pass: Look for ANY items (Fallback if all are completed)
-                                if not target_mission_id:
-                                    for m_id, m_data in data_store["missions"].items():
-                                        for k, v in m_data["items"].items():
-                                            if v["mat"] == material and is_loc_match(v["dest"], location) and v.get("vol") == total:
-                                                if objective_id and objective_id not in k: continue
-                                                target_mission_id = m_id
-                                                item_key = k 
-                                                print(f"🔍 Smart Match (Fuzzy - Any): Found item {k} in {m_id}")
-                                                break
-                                        if target_mission_id: break
-                        
-                        if target_mission_id:
-                            # Check if we need to resolve item_key locally (if mission was known but key mismatch)
-                            # e.g. "Everus Harbor" vs "Everus Harbor Harbor"
-                            if item_key not in data_store["missions"][target_mission_id]["items"]:
-                                for k, v in data_store["missions"][target_mission_id]["items"].items():
-                                    if v["mat"] == material and is_loc_match(v["dest"], location) and v.get("vol") == total:
-                                        # NEW: If we have a specific Objective ID, ensure the existing key matches it
-                                        # This prevents merging distinct items (e.g. 0/4 Waste #1 vs 0/4 Waste #2)
-                                        if objective_id and objective_id not in k:
-                                             continue 
-                                        
-                                        print(f"♻️ Key Correction: {item_key} -> {k}")
-                                        item_key = k # Adopt existing key to update it
-                                        break
-
-                            # Update existing mission
-                            # Check for MANUAL_ADD duplicates - DISABLED to prevent deleting user's manual fixes
-                            # keys_to_remove = []
-                            # for k, v in data_store["missions"][target_mission_id]["items"].items():
-                            #     if v.get("action") == "MANUAL_ADD" and v.get("mat") == material and is_loc_match(v.get("dest"), location):
-                            #         keys_to_remove.append(k)
-                            # 
-                            # for k in keys_to_remove:
-                            #     del data_store["missions"][target_mission_id]["items"][k]
-                            #     print(f"♻️ LOG Replaced Manual Item: {material} -> {location}")
-
-                            # Check Blacklist (Native)
-                            should_process = True
-                            temp_sig_item = { "mat": material, "dest": location, "vol": total, "type": type_str }
-                            sig = get_item_signature(temp_sig_item)
-                            
-                            if "ignored_signatures" in data_store and sig in data_store["ignored_signatures"]:
-                                if item_key not in data_store["missions"][target_mission_id]["items"]:
-                                    print(f"🚫 Ignored Deleted Item (Native): {material} -> {location}")
-                                    should_process = False
-                            
-                            if should_process:
-                                data_store["missions"][target_mission_id]["items"][item_key] = {
-                                    "mat": material,
-                                    "dest": location,
-                                    "vol": total,
-                                    "delivered": current,
-                                    "status": status_val,
-                                    "type": type_str,
-                                    "action": action
-                                }
-                                print(f"📦 LOG (Native): Item {action} {current}/{total} {material} -> {location} [{status_val}]")
-                                save_state()
-                                
-                                # Check for duplicates via item match
-                                # Only check for duplicates if the mission was NOT explicitly accepted (i.e. it's likely a restored mission)
-                                if not data_store["missions"][target_mission_id].get("explicitly_accepted", False):
-                                    self.detect_and_merge_duplicate(target_mission_id, data_store["missions"][target_mission_id]["items"][item_key])
-
-                        else:
-                            # No Mission ID and No Smart Match -> Fallback to UI Logic (likely handled by UpdateNotificationItem later)
-                            # Or create Unknown Mission here?
-                            # Better to let the UI Fallback logic handle it if it comes later, 
-                            # OR create a temporary bucket here to be safe.
-                            print(f"⚠️ LOG (Native): Orphan Objective (No ID): {material} -> {location}")
-                            pass 
-
-                    else:
-                        # 2. Try Generic/Non-SCU Regex
-                        # (Keep existing logic for generic regex, but also add Smart Match support if needed)
-                        # For brevity, leaving as is for now unless requested.
-                        print(f"⚠️ LOG (Native): Failed to parse Objective details: {notification_text}")
-                        pass
-
-            # --- DEBUG: MISSING INFO FROM NOTIFICATIONS ---
-            # Fallback to CLocalMissionPhaseMarker if notifications fail to provide details
-            # Log Example: Creating objective marker: ... contract [HaulCargo_AToB_NonMetal_Silicon_Stanton1_SmallGrade1]
-            if PATTERNS["marker_event"] in line and PATTERNS["marker_contract_tag"] in line:
-                mission_id_match = re.search(PATTERNS["marker_mission_id_regex"], line)
-                contract_match = re.search(PATTERNS["marker_contract_regex"], line)
-                
-                if mission_id_match and contract_match:
-                    mission_id = mission_id_match.group(1)
-                    contract_str = contract_match.group(1)
-                    
-                    # Parse contract string for details (HaulCargo_AToB_NonMetal_Silicon_Stanton1_SmallGrade1)
-                    # Format seems to be: HaulCargo_AToB_Category_Material_Location_Grade
-                    parts = contract_str.split('_')
-                    if len(parts) >= 5:
-                        material = parts[4] # Silicon
-                        # location_hint = parts[5] # Stanton1 (Generic)
-                        
-                        # IDEMPOTENCY CHECK
-                        if mission_id in data_store.get("processed_mission_ids", []):
-                            pass
-                        elif mission_id not in data_store["missions"]:
-                             data_store["missions"][mission_id] = {
-                                "id": mission_id,
-                                "title": f"Contract: {material} Haul",
-                                "items": {},
-                                "started": time.strftime("%H:%M:%S"),
-                                "source": "LOG (Marker)",
-                                "status": "ACTIVE"
-                            }
-                        
-                        # Add placeholder item if empty
-                        if not data_store["missions"][mission_id]["items"]:
-                            item_key = f"{material}_Unknown_DELIVERY"
-                            data_store["missions"][mission_id]["items"][item_key] = {
-                                "mat": material,
-                                "dest": "See Objective",
-                                "vol": 0, # Unknown quantity from this log
-                                "delivered": 0,
-                                "status": "PENDING",
-                                "type": "DELIVERY",
-                                "action": "HAUL"
-                            }
-                            print(f"📍 LOG (Marker): Found Mission Info via Marker: {material}")
-
-            # --- INVENTORY / ELEVATOR ACTIVITY (Debug/Status) ---
-            if PATTERNS["inventory_event"] in line:
-                count_match = re.search(PATTERNS["inventory_count_regex"], line)
-                if count_match:
-                    count = count_match.group(1)
-                    print(f"🏗️ LOG (Native): Cargo Elevator detected {count} items on grid.")
-                    try:
-                        cnt = int(count)
-                    except:
-                        cnt = -1
-                    if cnt == 0:
-                        cur_loc = data_store.get("current_location", "")
-                        def is_loc_match(loc1, loc2):
-                            l1, l2 = loc1.lower(), loc2.lower()
-                            return l1 == l2 or l1 in l2 or l2 in l1
-                        changed = False
-                        for m_id, m_data in list(data_store["missions"].items()):
-                            for k, v in m_data.get("items", {}).items():
-                                if v.get("type") != "PICKUP" and v.get("status") != "COMPLETED":
-                                    if cur_loc and is_loc_match(v.get("dest",""), cur_loc):
-                                        v["delivered"] = v.get("vol", 0)
-                                        v["status"] = "COMPLETED"
-                                        changed = True
-                        if changed:
-                            save_state()
-
-
-        # --- NOTIFICATION BASED PARSING (UI Logs - Fallback) ---
-        # Handle "Contract Accepted" and "New Objective" from UI notifications (when backend MissionId is missing)
-        # Format: <UpdateNotificationItem> Notification "Text..." [ID], Action: ...
-        if PATTERNS["ui_notif_event"] in line and PATTERNS["ui_notif_tag"] in line:
-            # USER REQUEST: Only process "Action: StartFade" events to ensure stability and avoid 3x duplication
-            # The log registers 3x (Added, StartFade, Remove). StartFade is the most reliable "fix" point.
-            if "Action: StartFade" not in line:
-                return
+            if mission_id not in data_store["missions"]:
+                data_store["missions"][mission_id] = {
+                    "id": mission_id,
+                    "title": ev.title,
+                    "items": {},
+                    "started": self.clock(),
+                    "source": "LOG (UI)",
+                    "status": "ACTIVE"
+                }
+                mark_mission(mission_id)
+                # self.archive_stale_mission(title, new_mission_id=m_id)
+                print(f"✅ {T('source_log_ui', 'ui')}: {T('mission_accepted', 'log')} - {ev.title} (ID: {mission_id})")
+                data_store["mission_status"] = "ACTIVE"
+                save_state()
 
-            # Extract Notification ID to avoid duplicates (StartFade, Remove, etc.)
-            notif_id_match = re.search(PATTERNS["ui_notif_id_regex"], line)
-            if notif_id_match:
-                notif_id = notif_id_match.group(1)
-                if notif_id in self.processed_notification_ids:
-                    return # Already processed this notification event
-                self.processed_notification_ids.add(notif_id)
-            
-            # A. Contract Accepted (Notification)
-            if PATTERNS["contract_accepted"] in line:
-                title_match = re.search(PATTERNS["contract_accepted_regex"], line)
-                title = title_match.group(1).strip() if title_match else "Unknown Contract"
-                
-                # Generate a deterministic ID based on Notification ID (to allow persistence/deletion)
-                m_id = f"ui_{notif_id}"
-                self.last_notification_mission_id = m_id
-                
-                # IDEMPOTENCY CHECK
-                if m_id in data_store.get("processed_mission_ids", []):
-                    return
+        else:
+            title = ev.title if ev.title is not None else T('unknown_contract', 'ui', 'Unknown Contract')
 
-                if m_id not in data_store["missions"]:
-                    data_store["missions"][m_id] = {
-                        "id": m_id,
-                        "title": title,
-                        "items": {},
-                        "started": time.strftime("%H:%M:%S"),
-                        "source": "LOG (UI)",
-                        "status": "ACTIVE"
-                    }
-                    # self.archive_stale_mission(title, new_mission_id=m_id)
-                    print(f"✅ {T('source_log_ui', 'ui')}: {T('mission_accepted', 'log')} - {title} (ID: {m_id})")
-                    data_store["mission_status"] = "ACTIVE"
-                    save_state()
-            
-            # B. New Objective (Notification)
-            elif PATTERNS["new_objective"] in line or PATTERNS["objective_complete"] in line:
-                # Regex for cargo details (English)
-                obj_match = re.search(
-                    PATTERNS["scu_regex"], 
-                    line, re.IGNORECASE
-                )
-                
-                if obj_match:
-                    # Use the last accepted mission ID, or create a catch-all if none exists
-                    m_id = self.last_notification_mission_id
-                    if not m_id:
-                        m_id = "ui_unknown_mission"
-                        self.last_notification_mission_id = m_id
-                        
-                    # IDEMPOTENCY CHECK
-                    if m_id in data_store.get("processed_mission_ids", []):
-                        return
-
-                    if m_id not in data_store["missions"]:
-                         data_store["missions"][m_id] = {
-                            "id": m_id,
-                            "title": T('unknown_mission_ui', 'ui', 'Unknown Mission (UI)'),
-                            "items": {},
-                            "started": time.strftime("%H:%M:%S"),
-                            "source": "LOG (UI)",
-                            "status": "ACTIVE"
-                        }
+            # IDEMPOTENCY CHECK: If mission is already in history/deleted, ignore it.
+            if mission_processed(mission_id):
+                # print(f"♻️ {T('source_log_native', 'ui')}: Ignored known finished mission {m_id}")
+                return True
 
-                    action = obj_match.group(1).upper()
-                    val1 = int(obj_match.group(2))
-                    val2 = obj_match.group(3)
-                    
-                    if val2:
-                        current = val1
-                        total = int(val2)
-                    else:
-                        current = 0 
-                        total = val1
-
-                    material = obj_match.group(4).strip().upper()
-                    location = clean_location_name(obj_match.group(5))
-                    
-                    is_pickup = action in ['COLLECT', 'PICKUP', 'RETRIEVE', 'COLETAR', 'PEGAR', 'ENTREGAR', 'DEIXAR', 'TRANSPORTAR']
-                    type_str = "PICKUP" if is_pickup else "DELIVERY"
-                    
-                    item_key = f"{material}_{location}_{type_str}"
-                    
-                    # Check for MANUAL_ADD duplicates - DISABLED
-                    # keys_to_remove = []
-                    # if m_id in data_store["missions"]:
-                    #     for k, v in data_store["missions"][m_id]["items"].items():
-                    #         if v.get("action") == "MANUAL_ADD" and v.get("mat") == material and v.get("dest") == location:
-                    #             keys_to_remove.append(k)
-                    #     
-                    #     for k in keys_to_remove:
-                    #         del data_store["missions"][m_id]["items"][k]
-                    #         print(f"♻️ {T('log_replaced', 'log')}: {material} -> {location}")
-                    
-                    is_complete_event = PATTERNS["objective_complete"] in line
-                    
-                    # Logic: If it is "Objective Complete", FORCE status=COMPLETED
-                    status_val = "COMPLETED" if (is_complete_event or (current >= total and total > 0)) else "PENDING"
-
-                    # Check Blacklist (UI)
-                    should_process = True
-                    temp_sig_item = { "mat": material, "dest": location, "vol": total, "type": type_str }
-                    sig = get_item_signature(temp_sig_item)
-                    if "ignored_signatures" in data_store and sig in data_store["ignored_signatures"]:
-                        if item_key not in data_store["missions"][m_id]["items"]:
-                            print(f"🚫 Ignored Deleted Item (UI): {material} -> {location}")
-                            should_process = False
-
-                    if should_process:
-                        data_store["missions"][m_id]["items"][item_key] = {
-                            "mat": material,
-                            "dest": location,
-                            "vol": total,
-                            "delivered": current,
-                            "status": status_val,
-                            "type": type_str,
-                            "action": action
-                        }
-                        print(f"📦 {T('source_log_ui', 'ui')}: {T('item_log', 'log')} {action} {current}/{total} {material} -> {location} [{status_val}]")
-                        save_state()
+            if mission_id not in data_store["missions"]:
+                data_store["missions"][mission_id] = {
+                    "id": mission_id,
+                    "title": title,
+                    "items": {},
+                    "started": self.clock(),
+                    "source": "LOG (Native)",
+                    "status": "ACTIVE"
+                }
+                mark_mission(mission_id)
+                print(f"✅ {T('source_log_native', 'ui')}: {T('mission_accepted', 'log')} - {title} (ID: {mission_id})")
+                data_store["mission_status"] = "ACTIVE"
+                save_state()
 
-                        # Check for duplicates via item match
-                        if m_id in data_store["missions"] and item_key in data_store["missions"][m_id]["items"]:
-                            # Only check for duplicates if the mission was NOT explicitly accepted (i.e. it's likely a restored mission)
-                            if not data_store["missions"][m_id].get("explicitly_accepted", False):
-                                self.detect_and_merge_duplicate(m_id, data_store["missions"][m_id]["items"][item_key])
+    def apply_contract_ended(self, ev):
+        # Contract Canceled / Abandoned / Failed
+        if ev.title:
+            print(f"🛑 Mission Ended: {ev.title}")
+            self.archive_stale_mission(ev.title)
+        elif ev.mission_id and ev.mission_id in data_store["missions"]:
+            print(f"🛑 Mission Ended (ID Match): {ev.mission_id}")
+            self.archive_specific_mission(ev.mission_id)
+        save_state()
 
-        # 1. IDENTITY DETECTION
-        chat_match = re.search(r"joined channel '(.+?) : (.+?)'", line)
-        if chat_match:
-            ship = chat_match.group(1).strip().upper()
-            player = chat_match.group(2).strip()
-            if data_store["ship_name"] != ship or data_store["player_name"] != player:
-                data_store["ship_name"] = ship
-                data_store["player_name"] = player
-                print(f"✓ {T('identity', 'log')}: {player} on {ship}")
+    def apply_salvage_completed(self, ev):
+        # Contract Complete (Specific Handling for Salvage/Special Missions)
+        mission_id, title = ev.mission_id, ev.title
+        print(f"♻️ Salvage Mission Complete: {title}")
 
-        # 1A. LOCATION DETECTION (Inventory Request)
-        # <RequestLocationInventory> Player[...] requested inventory for Location[Stanton1_DistributionCentre_SakuraSun_Magnolia]
-        if "<RequestLocationInventory>" in line and "Location[" in line:
-            loc_match = re.search(r"Location\[(.*?)\]", line)
-            if loc_match:
-                raw_loc = loc_match.group(1)
-                clean_loc = clean_location_name(raw_loc)
-                if data_store["current_location"] != clean_loc:
-                    data_store["current_location"] = clean_loc
-                    print(f"📍 {T('location_update', 'log')}: {clean_loc}")
-        
-        # 1B. FALLBACK: Ship detection
-        if data_store["ship_name"] == "Waiting for Ship...":
-            ship_fallback = re.search(r"(ARGO_RAFT|CONSTELLATION|CATERPILLAR|C2_HERCULES|FREELANCER|HULL_[A-E]|DRAKE_CORSAIR)_\d+", line, re.IGNORECASE)
-            if ship_fallback:
-                ship_model = ship_fallback.group(1).replace('_', ' ').upper()
-                data_store["ship_name"] = ship_model
-                print(f"✓ {T('ship_detected', 'log')}: {ship_model}")
-
-        # 3. MISSION START (Contract Accepted)
-        # <SHUDEvent_OnNotification> Added notification "Contract Accepted: Title..." ... MissionId: [ID]
-        # EXCLUDE: SHUDEvent lines (handled by Block 1)
-        if PATTERNS["contract_accepted"] in line and PATTERNS["mission_id_tag"] in line and PATTERNS["notification_event"] not in line:
-            id_match = re.search(PATTERNS["mission_id_regex"], line)
-            title_match = re.search(PATTERNS["contract_accepted_regex"], line)
-            
-            if id_match:
-                m_id = id_match.group(1)
-                title = title_match.group(1).strip() if title_match else T('unknown_contract', 'ui', 'Unknown Contract')
-                
-                # IDEMPOTENCY CHECK: If mission is already in history/deleted, ignore it.
-                if m_id in data_store.get("processed_mission_ids", []):
-                    # print(f"♻️ {T('source_log_native', 'ui')}: Ignored known finished mission {m_id}")
-                    return False
-
-                if m_id not in data_store["missions"]:
-                    data_store["missions"][m_id] = {
-                        "id": m_id,
-                        "title": title,
-                        "items": {},
-                        "started": time.strftime("%H:%M:%S"),
-                        "source": "LOG (Native)",
-                        "status": "ACTIVE"
-                    }
-                    print(f"✅ {T('source_log_native', 'ui')}: {T('mission_accepted', 'log')} - {title} (ID: {m_id})")
-                    data_store["mission_status"] = "ACTIVE"
-                    save_state()
+        # 1. Add to Hangar (Always, as requested by user)
+        if "hangar" not in data_store: data_store["hangar"] = []
+        data_store["hangar"].append({
+            "loc": T('unknown_location', 'ui', 'Unknown Location (Edit)'),
+            "mat": T('salvage_material', 'ui', 'Salvage Material (Edit)'),
+            "qty": 0,
+            "added": time.strftime("%H:%M:%S")
+        })
+        STATE_JOURNAL.mark("hangar")
+        print(f"🏭 Added Salvage to Hangar: {title}")
+
+        # 2. Handle History
+        # Check if we have an active mission with this title or ID
+        found_active = False
+        if mission_id and mission_id in data_store["missions"]:
+             found_active = True
+             self.archive_specific_mission(mission_id)
+        else:
+             # Try title match
+             for mid, mdata in list(data_store["missions"].items()):
+                 if mdata["title"] == title:
+                     found_active = True
+                     self.archive_specific_mission(mid)
+                     break
+
+        if not found_active:
+            # Create synthetic history entry if not found active
+             hist_id = mission_id if mission_id else f"SALVAGE_{int(time.time())}"
+
+             # Idempotency Check
+             if not mission_processed(hist_id):
+                 hist_entry = {
+                    "id": hist_id,
+                    "title": title,
+                    "items": { "1": { "mat": "Salvage", "dest": "Hangar", "vol": 0, "status": "COMPLETED", "type": "SALVAGE" } },
+                    "started": self.clock(),
+                    "time": time.strftime("%H:%M:%S"),
+                    "status": "COMPLETED",
+                    "value": 0 # Unknown value until user inputs
+                 }
+                 if "finished_missions" not in data_store: data_store["finished_missions"] = []
+                 data_store["finished_missions"].insert(0, hist_entry)
+                 append_finish(hist_entry)
+
+                 if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = DedupeRegistry()
+                 data_store["processed_mission_ids"].append(hist_id)
+                 save_state()
+
+    def apply_objective_update(self, ev):
+        if ev.origin == "native":
+            return self.apply_native_objective(ev)
+        if ev.origin == "ui":
+            return self.apply_ui_objective(ev)
+        return self.apply_fallback_objective(ev)
+
+    def apply_native_objective(self, ev):
+        mission_id = ev.mission_id
+        # IDEMPOTENCY CHECK: Ignore updates for known finished missions
+        if mission_id and mission_id in HISTORY:
+            return True
+
+        # If we have a mission_id, ensure it exists
+        if mission_id and mission_id not in data_store["missions"]:
+             data_store["missions"][mission_id] = {
+                "id": mission_id,
+                "title": "Unknown Mission (Native)",
+                "items": {},
+                "started": self.clock(),
+                "source": "LOG (Native)",
+                "status": "ACTIVE"
+            }
+             mark_mission(mission_id)
 
-        # 4. MISSION OBJECTIVE (Cargo Details)
-        # "New Objective: Deliver 0/9 SCU of Silicon to HDPC-Farnesway: " ... MissionId: [ID]
-        if (
-            PATTERNS["new_objective"] in line or 
-            PATTERNS["objective_complete"] in line or
-            "Novo Objetivo" in line or
-            "Novo objetivo" in line or
-            "Objetivo Completo" in line or
-            "Objetivo completo" in line
-        ) and PATTERNS["mission_id_tag"] in line and PATTERNS["notification_event"] not in line:
-            id_match = re.search(PATTERNS["mission_id_regex"], line)
-            
-            # Regex for cargo details (English)
-            # Added '<' to terminator list to handle timestamped logs like "...Workcenter <2025..."
-            obj_match = re.search(
-                PATTERNS["scu_regex"], 
-                line, re.IGNORECASE
-            )
-            
-            if id_match and obj_match:
-                m_id = id_match.group(1)
-                
-                # IDEMPOTENCY CHECK
-                if m_id in data_store.get("processed_mission_ids", []):
-                    return False
+        if ev.action is None:
+            # Generic/Non-SCU objectives are not handled yet
+            print(f"⚠️ LOG (Native): Failed to parse Objective details: {ev.text}")
+            return
 
-                action = obj_match.group(1).upper()
-                val1 = int(obj_match.group(2))
-                val2 = obj_match.group(3)
-                
-                if val2:
-                    current = val1
-                    total = int(val2)
-                else:
-                    current = 0 
-                    total = val1
+        action, current, total = ev.action, ev.current, ev.total
+        material, location, type_str = ev.material, ev.location, ev.item_type
+        objective_id = ev.objective_id
 
-                material = obj_match.group(4).strip().upper()
-                location = clean_location_name(obj_match.group(5))
-                
-                is_pickup = action in ['COLLECT', 'PICKUP', 'RETRIEVE', 'COLETAR', 'PEGAR', 'ENTREGAR', 'DEIXAR', 'TRANSPORTAR']
-                type_str = "PICKUP" if is_pickup else "DELIVERY"
-
-                # Ensure mission exists (handle out-of-order logs)
-                if m_id not in data_store["missions"]:
-                     data_store["missions"][m_id] = {
-                        "id": m_id,
-                        "title": T('unknown_mission', 'ui', 'Unknown Mission'),
-                        "items": {},
-                        "started": time.strftime("%H:%M:%S"),
-                        "source": "LOG (Native)",
-                        "status": "ACTIVE"
-                    }
-                
-                # Unique key for this item step
-                item_key = f"{material}_{location}_{type_str}"
-                
-                # Check for MANUAL_ADD duplicates and remove them
-                keys_to_remove = []
-                if m_id in data_store["missions"]:
-                    for k, v in data_store["missions"][m_id]["items"].items():
-                        if v.get("action") == "MANUAL_ADD" and is_material_match(v.get("mat"), material) and v.get("dest") == location:
-                            keys_to_remove.append(k)
-                    
-                    for k in keys_to_remove:
-                        del data_store["missions"][m_id]["items"][k]
-                        print(f"♻️ LOG Replaced Manual Item: {material} -> {location}")
+        # Include total in key to distinguish different quantities to same destination (e.g. 29 SCU vs 31 SCU)
+        # Use Objective ID if available for absolute uniqueness
+        if objective_id:
+             item_key = f"{material}_{location}_{type_str}_{total}_{objective_id}"
+        else:
+             item_key = f"{material}_{location}_{type_str}_{total}"
 
-                # Check explicit completion event
-                is_complete_event = PATTERNS["objective_complete"] in line
-                
-                # Logic: If it is "Objective Complete", FORCE status=COMPLETED
-                status_val = "COMPLETED" if (is_complete_event or (current >= total and total > 0)) else "PENDING"
-
-                data_store["missions"][m_id]["items"][item_key] = {
-                    "mat": material,
-                    "dest": location,
-                    "vol": total,
-                    "delivered": current,
-                    "status": status_val,
-                    "type": type_str,
-                    "action": action
-                }
-                print(f"📦 {T('source_log_native', 'ui')}: {T('item_log', 'log')} {action} {current}/{total} {material} -> {location}")
-                save_state()
+        status_val = "COMPLETED" if (ev.complete or (current >= total and total > 0)) else "PENDING"
+
+        # GLOBAL SEARCH FALLBACK (Smart Match)
+        # If Mission ID is missing (Split Log), find matching item in ANY active mission
+        target_mission_id = mission_id
+
+        # Helper for fuzzy matching location
+        def is_loc_match(loc1, loc2):
+            l1, l2 = loc1.lower(), loc2.lower()
+            return l1 == l2 or l1 in l2 or l2 in l1
+
+        if not target_mission_id:
+            # 1. Search for EXACT match
+            for m_id, m_data in data_store["missions"].items():
+                if item_key in m_data["items"]:
+                    target_mission_id = m_id
+                    print(f"🔍 Smart Match (Exact): Found item in mission {m_id}")
+                    break
+
+            # 2. Search for FUZZY match if not found
+            if not target_mission_id:
+                # First pass: Look for PENDING items (Prioritize uncompleted items)
+                for m_id, m_data in data_store["missions"].items():
+                    for k, v in m_data["items"].items():
+                        # Check volume match to avoid merging distinct items (e.g. 29 vs 31 SCU)
+                        if v["mat"] == material and is_loc_match(v["dest"], location) and v.get("status") != "COMPLETED" and v.get("vol") == total:
+                            if objective_id and objective_id not in k: continue
+                            target_mission_id = m_id
+                            item_key = k # ADOPT EXISTING KEY
+                            print(f"🔍 Smart Match (Fuzzy - Pending): Found item {k} in {m_id}")
+                            break
+                    if target_mission_id: break
+
+                # Second pass: Look for ANY items (Fallback if all are completed)
+                if not target_mission_id:
+                    for m_id, m_data in data_store["missions"].items():
+                        for k, v in m_data["items"].items():
+                            if v["mat"] == material and is_loc_match(v["dest"], location) and v.get("vol") == total:
+                                if objective_id and objective_id not in k: continue
+                                target_mission_id = m_id
+                                item_key = k
+                                print(f"🔍 Smart Match (Fuzzy - Any): Found item {k} in {m_id}")
+                                break
+                        if target_mission_id: break
+
+        if not target_mission_id:
+            # No Mission ID and No Smart Match -> left to the UI fallback (UpdateNotificationItem)
+            print(f"⚠️ LOG (Native): Orphan Objective (No ID): {material} -> {location}")
+            return
+
+        # Check if we need to resolve item_key locally (if mission was known but key mismatch)
+        # e.g. "Everus Harbor" vs "Everus Harbor Harbor"
+        if item_key not in data_store["missions"][target_mission_id]["items"]:
+            for k, v in data_store["missions"][target_mission_id]["items"].items():
+                if v["mat"] == material and is_loc_match(v["dest"], location) and v.get("vol") == total:
+                    # NEW: If we have a specific Objective ID, ensure the existing key matches it
+                    # This prevents merging distinct items (e.g. 0/4 Waste #1 vs 0/4 Waste #2)
+                    if objective_id and objective_id not in k:
+                         continue
+
+                    print(f"♻️ Key Correction: {item_key} -> {k}")
+                    item_key = k # Adopt existing key to update it
+                    break
+
+        # Check Blacklist (Native)
+        temp_sig_item = { "mat": material, "dest": location, "vol": total, "type": type_str }
+        sig = get_item_signature(temp_sig_item)
+
+        if "ignored_signatures" in data_store and sig in data_store["ignored_signatures"]:
+            if item_key not in data_store["missions"][target_mission_id]["items"]:
+                print(f"🚫 Ignored Deleted Item (Native): {material} -> {location}")
+                return
+
+        target_items = data_store["missions"][target_mission_id]["items"]
+        target_items[item_key] = {
+            "mat": material,
+            "dest": location,
+            "vol": total,
+            "delivered": current,
+            "status": status_val,
+            "type": type_str,
+            "action": action
+        }
+        mark_mission(target_mission_id)
+        print(f"📦 LOG (Native): Item {action} {current}/{total} {material} -> {location} [{status_val}]")
+        save_state()
+
+        # Check for duplicates via item match
+        # Only check for duplicates if the mission was NOT explicitly accepted (i.e. it's likely a restored mission)
+        if not data_store["missions"][target_mission_id].get("explicitly_accepted", False):
+            self.detect_and_merge_duplicate(target_mission_id, target_items[item_key])
+
+    def apply_ui_objective(self, ev):
+        # Use the last accepted mission ID, or create a catch-all if none exists
+        m_id = self.last_notification_mission_id
+        if not m_id:
+            m_id = "ui_unknown_mission"
+            self.last_notification_mission_id = m_id
+
+        # IDEMPOTENCY CHECK
+        if mission_processed(m_id):
+            return True
+
+        if m_id not in data_store["missions"]:
+             data_store["missions"][m_id] = {
+                "id": m_id,
+                "title": T('unknown_mission_ui', 'ui', 'Unknown Mission (UI)'),
+                "items": {},
+                "started": self.clock(),
+                "source": "LOG (UI)",
+                "status": "ACTIVE"
+            }
+             mark_mission(m_id)
+
+        action, current, total = ev.action, ev.current, ev.total
+        material, location, type_str = ev.material, ev.location, ev.item_type
+        item_key = f"{material}_{location}_{type_str}"
+
+        # Logic: If it is "Objective Complete", FORCE status=COMPLETED
+        status_val = "COMPLETED" if (ev.complete or (current >= total and total > 0)) else "PENDING"
+
+        # Check Blacklist (UI)
+        temp_sig_item = { "mat": material, "dest": location, "vol": total, "type": type_str }
+        sig = get_item_signature(temp_sig_item)
+        if "ignored_signatures" in data_store and sig in data_store["ignored_signatures"]:
+            if item_key not in data_store["missions"][m_id]["items"]:
+                print(f"🚫 Ignored Deleted Item (UI): {material} -> {location}")
+                return
+
+        data_store["missions"][m_id]["items"][item_key] = {
+            "mat": material,
+            "dest": location,
+            "vol": total,
+            "delivered": current,
+            "status": status_val,
+            "type": type_str,
+            "action": action
+        }
+        mark_mission(m_id)
+        print(f"📦 {T('source_log_ui', 'ui')}: {T('item_log', 'log')} {action} {current}/{total} {material} -> {location} [{status_val}]")
+        save_state()
+
+        # Check for duplicates via item match
+        if m_id in data_store["missions"] and item_key in data_store["missions"][m_id]["items"]:
+            # Only check for duplicates if the mission was NOT explicitly accepted (i.e. it's likely a restored mission)
+            if not data_store["missions"][m_id].get("explicitly_accepted", False):
+                self.detect_and_merge_duplicate(m_id, data_store["missions"][m_id]["items"][item_key])
+
+    def apply_fallback_objective(self, ev):
+        # "New Objective: Deliver 0/9 SCU of Silicon to HDPC-Farnesway: " ... MissionId: [ID]
+        m_id = ev.mission_id
+
+        # IDEMPOTENCY CHECK
+        if mission_processed(m_id):
+            return True
+
+        action, current, total = ev.action, ev.current, ev.total
+        material, location, type_str = ev.material, ev.location, ev.item_type
+
+        # Ensure mission exists (handle out-of-order logs)
+        if m_id not in data_store["missions"]:
+             data_store["missions"][m_id] = {
+                "id": m_id,
+                "title": T('unknown_mission', 'ui', 'Unknown Mission'),
+                "items": {},
+                "started": self.clock(),
+                "source": "LOG (Native)",
+                "status": "ACTIVE"
+            }
+
+        # Unique key for this item step
+        item_key = f"{material}_{location}_{type_str}"
+
+        # Check for MANUAL_ADD duplicates and remove them
+        items = data_store["missions"][m_id]["items"]
+        for k in [k for k, v in items.items() if v.get("action") == "MANUAL_ADD" and is_material_match(v.get("mat"), material) and v.get("dest") == location]:
+            del items[k]
+            print(f"♻️ LOG Replaced Manual Item: {material} -> {location}")
+
+        # Logic: If it is "Objective Complete", FORCE status=COMPLETED
+        status_val = "COMPLETED" if (ev.complete or (current >= total and total > 0)) else "PENDING"
+
+        items[item_key] = {
+            "mat": material,
+            "dest": location,
+            "vol": total,
+            "delivered": current,
+            "status": status_val,
+            "type": type_str,
+            "action": action
+        }
+        mark_mission(m_id)
+        print(f"📦 {T('source_log_native', 'ui')}: {T('item_log', 'log')} {action} {current}/{total} {material} -> {location}")
+        save_state()
+
+    def apply_inventory_count(self, ev):
+        # --- INVENTORY / ELEVATOR ACTIVITY (Debug/Status) ---
+        print(f"🏗️ LOG (Native): Cargo Elevator detected {ev.count} items on grid.")
+        if ev.count != 0:
+            return
+        cur_loc = data_store.get("current_location", "")
+        def is_loc_match(loc1, loc2):
+            l1, l2 = loc1.lower(), loc2.lower()
+            return l1 == l2 or l1 in l2 or l2 in l1
+        changed = False
+        for m_id, m_data in list(data_store["missions"].items()):
+            for k, v in m_data.get("items", {}).items():
+                if v.get("type") != "PICKUP" and v.get("status") != "COMPLETED":
+                    if cur_loc and is_loc_match(v.get("dest",""), cur_loc):
+                        v["delivered"] = v.get("vol", 0)
+                        v["status"] = "COMPLETED"
+                        mark_mission(m_id)
+                        changed = True
+        if changed:
+            save_state()
 
+    def apply_notification_mapped(self, ev):
+        # Remember Notification -> Mission for reward attribution
+        notif_map = data_store["notif_mission_map"]
+        notif_map[ev.notif_id] = ev.mission_id
+        STATE_JOURNAL.mark("notif_mission_map", ev.notif_id)
+        if len(notif_map) > NOTIF_MAP_MAX:
+            oldest = next(iter(notif_map))
+            del notif_map[oldest]
+            STATE_JOURNAL.mark("notif_mission_map", oldest)
+
+    def apply_identity(self, ev):
+        # 1. IDENTITY DETECTION
+        if data_store["ship_name"] != ev.ship or data_store["player_name"] != ev.player:
+            data_store["ship_name"] = ev.ship
+            data_store["player_name"] = ev.player
+            print(f"✓ {T('identity', 'log')}: {ev.player} on {ev.ship}")
+
+    def apply_location(self, ev):
+        # 1A. LOCATION DETECTION (Inventory Request)
+        if data_store["current_location"] != ev.location:
+            data_store["current_location"] = ev.location
+            print(f"📍 {T('location_update', 'log')}: {ev.location}")
+
+    def apply_ship(self, ev):
+        # 1B. FALLBACK: Ship detection
+        if data_store["ship_name"] == "Waiting for Ship...":
+            data_store["ship_name"] = ev.ship
+            print(f"✓ {T('ship_detected', 'log')}: {ev.ship}")
+
+    def apply_mission_ended(self, ev):
         # 5. MISSION END (Abandon/Success/Fail)
         # <EndMission> Ending mission for player. MissionId[...] CompletionType[Abandon] Reason[...]
-        # Also handle "MissionEnded" push message
-        if ("<EndMission>" in line and "MissionId" in line) or ("<MissionEnded>" in line and "mission_id" in line):
-            
-            # Pattern A: <EndMission>
-            id_match_a = re.search(r"MissionId\[([a-f0-9\-]+)\]", line)
-            type_match_a = re.search(r"CompletionType\[(.+?)\]", line)
-            
-            # Pattern B: <MissionEnded> push message
-            id_match_b = re.search(r"mission_id ([a-f0-9\-]+)", line)
-            state_match_b = re.search(r"mission_state MISSION_STATE_([A-Z]+)", line)
-            
-            m_id = None
-            comp_type = "UNKNOWN"
-
-            if id_match_a:
-                m_id = id_match_a.group(1)
-                comp_type = type_match_a.group(1).upper() if type_match_a else "UNKNOWN"
-            elif id_match_b:
-                m_id = id_match_b.group(1)
-                raw_state = state_match_b.group(1) if state_match_b else "UNKNOWN"
-                if raw_state == "COMPLETED": comp_type = "SUCCESS"
-                elif raw_state == "ABANDONED": comp_type = "ABANDON"
-                elif raw_state == "FAILED": comp_type = "FAIL"
-                else: comp_type = raw_state
-                
-            if m_id and m_id in data_store["missions"]:
-                # Normalizar SUCCESS/COMPLETE
-                if comp_type in ["COMPLETE", "COMPLETED"]:
-                    comp_type = "SUCCESS"
+        m_id, comp_type = ev.mission_id, ev.completion
+        if m_id not in data_store["missions"]:
+            return
 
-                print(f"🏁 {T('source_log', 'ui')}: {T('mission_finished', 'log')} - {comp_type} ({T('mission', 'ui')}: {m_id})")
-                
-                if comp_type == "SUCCESS":
-                        # Archive to history
-                        mission_data = data_store["missions"][m_id]
-                        finished_entry = {
-                            "id": m_id,
-                            "title": mission_data.get("title", T('unknown_mission', 'ui', 'Unknown Mission')),
-                            "items": mission_data.get("items", {}).copy(),
-                            "value": 0, # Placeholder, will be updated by "Awarded" log
-                            "started": mission_data.get("started", "?"),
-                            "time": time.strftime("%H:%M:%S"),
-                            "source": "LOG",
-                            "status": "COMPLETED"
-                        }
-                        # Persist to finish file ONLY
-                        append_finish(finished_entry)
-                        
-                        del data_store["missions"][m_id]
-                        
-                        # Mark as processed
-                        if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = []
-                        if m_id not in data_store["processed_mission_ids"]:
-                            data_store["processed_mission_ids"].append(m_id)
-                            
-                        save_state()
-                        data_store["last_completed_mission_id"] = m_id
-                        data_store["last_completed_ts"] = datetime.now()
-                        
-                elif comp_type in ["ABANDON", "FAIL", "ABANDONED", "FAILED"]:
-                    # Archive to history as CANCELLED/FAILED
-                    mission_data = data_store["missions"][m_id]
-                    status_label = "CANCELLED" if comp_type in ["ABANDON", "ABANDONED"] else "FAILED"
-                    
-                    # Persist to finish file ONLY
-                    append_finish({
-                        "id": m_id,
-                        "title": mission_data.get("title", T('unknown_mission', 'ui', 'Unknown Mission')),
-                        "items": mission_data.get("items", {}).copy(),
-                        "value": 0, 
-                        "started": mission_data.get("started", "?"),
-                        "time": time.strftime("%H:%M:%S"),
-                        "source": "LOG",
-                        "status": status_label
-                    })
+        print(f"🏁 {T('source_log', 'ui')}: {T('mission_finished', 'log')} - {comp_type} ({T('mission', 'ui')}: {m_id})")
+
+        if comp_type == "SUCCESS":
+                # Archive to history
+                mission_data = data_store["missions"][m_id]
+                finished_entry = {
+                    "id": m_id,
+                    "title": mission_data.get("title", T('unknown_mission', 'ui', 'Unknown Mission')),
+                    "items": mission_data.get("items", {}).copy(),
+                    "value": 0, # Placeholder, will be updated by "Awarded" log
+                    "started": mission_data.get("started", "?"),
+                    "time": time.strftime("%H:%M:%S"),
+                    "source": "LOG",
+                    "status": "COMPLETED"
+                }
+                # Persist to finish file ONLY
+                append_finish(finished_entry)
 
-                    # Remove active mission
-                    del data_store["missions"][m_id]
-                    
-                    # Mark as processed
-                    if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = []
-                    if m_id not in data_store["processed_mission_ids"]:
-                        data_store["processed_mission_ids"].append(m_id)
+                del data_store["missions"][m_id]
+                mark_mission(m_id)
 
-                    if not data_store["missions"]:
-                        data_store["mission_status"] = "CANCELLED"
-                    save_state()
+                # Mark as processed
+                if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = DedupeRegistry()
+                if m_id not in data_store["processed_mission_ids"]:
+                    data_store["processed_mission_ids"].append(m_id)
+
+                save_state()
+                data_store["last_completed_mission_id"] = m_id
+                data_store["last_completed_ts"] = datetime.now()
+
+        elif comp_type in ["ABANDON", "FAIL", "ABANDONED", "FAILED"]:
+            # Archive to history as CANCELLED/FAILED
+            mission_data = data_store["missions"][m_id]
+            status_label = "CANCELLED" if comp_type in ["ABANDON", "ABANDONED"] else "FAILED"
+
+            # Persist to finish file ONLY
+            append_finish({
+                "id": m_id,
+                "title": mission_data.get("title", T('unknown_mission', 'ui', 'Unknown Mission')),
+                "items": mission_data.get("items", {}).copy(),
+                "value": 0,
+                "started": mission_data.get("started", "?"),
+                "time": time.strftime("%H:%M:%S"),
+                "source": "LOG",
+                "status": status_label
+            })
+
+            # Remove active mission
+            del data_store["missions"][m_id]
+            mark_mission(m_id)
+
+            # Mark as processed
+            if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = DedupeRegistry()
+            if m_id not in data_store["processed_mission_ids"]:
+                data_store["processed_mission_ids"].append(m_id)
+
+            if not data_store["missions"]:
+                data_store["mission_status"] = "CANCELLED"
+            save_state()
 
+    def apply_reward(self, ev):
         # 6. REWARD DETECTION
         # "Awarded 50250 aUEC: " [21]
-        if PATTERNS["notification_event"] in line:
-            nid_match = re.search(PATTERNS["notif_id_regex"], line)
-            mid_match = re.search(PATTERNS["mission_id_regex"], line)
-            if nid_match and mid_match:
-                nid = nid_match.group(1)
-                mid = mid_match.group(1)
-                data_store["notif_mission_map"][nid] = mid
-        
-        if "aUEC" in line:
-            # DEDUPLICATION: Check for Notification ID in the line (e.g. [15])
-            # This prevents double-counting when the log dumps the notification queue
-            notif_id_match = re.search(r'\[(\d+)\]', line)
-            if notif_id_match:
-                nid = notif_id_match.group(1)
-                if nid in self.processed_reward_ids:
-                    # print(f"🚫 Duplicate Reward Ignored (ID: {nid})")
-                    return False
-                self.processed_reward_ids.add(nid)
-
-            reward_match = re.search(PATTERNS["reward_regex"], line)
-            if reward_match:
-                amount = int(reward_match.group(1))
-                
-                # Update the most recent finished mission if it exists
-                # STRATEGY: Find the most recent mission with NO reward (value=0) and fill it.
-                # This handles batch completions (e.g. 4 missions finish, then 4 rewards come).
-                # Use persistent history to ensure we find it even after restart
-                history_source = data_store.get("finished_fixed", [])
-                
-                if history_source:
-                    assigned = False
-                    
-                    if PATTERNS["ui_notif_event"] in line:
-                        ui_match = re.search(PATTERNS["ui_notif_id_regex"], line)
-                        if ui_match:
-                            ui_id = ui_match.group(1)
-                            target_mid = data_store["notif_mission_map"].get(ui_id)
-                            if target_mid:
-                                for i in range(min(20, len(history_source))):
-                                    mission = history_source[i]
-                                    if mission.get("id") == target_mid and not mission.get("value"):
-                                        mission["value"] = amount
-                                        update_finish_value(target_mid, amount)
-                                        print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC -> {mission['title']} ({target_mid})")
-                                        assigned = True
-                                        break
-                    
-                    if not assigned and data_store.get("last_completed_mission_id"):
-                        last_id = data_store["last_completed_mission_id"]
-                        last_ts = data_store.get("last_completed_ts")
-                        
-                        # Fix: Ensure last_ts is datetime
-                        if isinstance(last_ts, str):
-                            try:
-                                last_ts = datetime.fromisoformat(last_ts)
-                            except ValueError:
-                                last_ts = None
-                                
-                        if last_ts and (datetime.now() - last_ts) <= timedelta(seconds=30):
-                            for i in range(min(20, len(history_source))):
-                                mission = history_source[i]
-                                if mission.get("id") == last_id and not mission.get("value"):
-                                    mission["value"] = amount
-                                    update_finish_value(last_id, amount)
-                                    print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC -> {mission['title']} ({last_id})")
-                                    assigned = True
-                                    break
-                    # Check the last 10 finished missions
-                    for i in range(min(10, len(history_source))):
-                        mission = history_source[i]
-                        # If mission has no value or value is 0, assign it
-                        if not mission.get("value"):
-                            # HEURISTIC: Prevent assigning massive rewards to small/starter missions
-                            # This prevents a 1M+ reward (likely a balance glitch or untracked mission) 
-                            # from being assigned to a "Junior Rank" mission.
-                            title_upper = mission.get('title', '').upper()
-                            if amount > 500000 and ("JUNIOR" in title_upper or "SMALL" in title_upper or "LOCAL" in title_upper):
-                                 print(f"⚠️ {T('source_log', 'ui')}: {T('reward_skip', 'log', 'Skipping assignment of large reward')} ({amount}) {T('to_small_mission', 'log', 'to small mission')}: {mission['title']}")
-                                 continue
-
-                            mission["value"] = amount
-                            print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC -> {mission['title']} ({mission['id']})")
-                            update_finish_value(mission.get("id"), mission["value"])
-                            assigned = True
-                            break
-                    
-                    if not assigned:
-                        # If all recent missions have rewards, check for duplicates.
-                        # If amount matches the most recent one, assume duplicate log and ignore.
-                        # If amount is different, maybe it's a bonus? Add to the most recent one.
-                        last_mission = history_source[0]
-                        if last_mission.get("value") == amount:
-                             print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC (Duplicate/Ignored)")
-                        
-                        # Only merge as bonus if the new amount is SMALL (likely a bonus)
-                        # If new amount is larger than existing, assume it's a separate untracked reward.
-                        elif amount < last_mission.get("value", 0) and amount < 500000:
-                             last_mission["value"] = last_mission.get("value", 0) + amount
-                             update_finish_value(last_mission.get("id"), last_mission["value"])
-                             print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: +{amount} aUEC -> {last_mission['title']} (Bonus)")
-                        
-                        else:
-                             # Create Orphan Reward Entry
-                             print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC (Orphan/New)")
-                             
-                             # Deterministic ID based on log line content (prevents duplicates on re-read)
-                             # Use MD5 of the line + amount to ensure uniqueness per event but consistency across restarts
-                             line_hash = hashlib.md5(line.encode('utf-8', 'ignore')).hexdigest()[:10]
-                             
-                             orphan_entry = {
-                                "id": f"REWARD_{line_hash}",
-                                "title": f"💰 {T('reward', 'ui', 'Reward')} ({amount} aUEC)",
-                                "items": {},
-                                "value": amount,
-                                "started": time.strftime("%H:%M:%S"),
-                                "time": time.strftime("%H:%M:%S"),
-                                "status": "COMPLETED",
-                                "source": "LOG (Reward)"
-                             }
-                             history_source.insert(0, orphan_entry)
-                             append_finish(orphan_entry)
-                             if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = []
-                             data_store["processed_mission_ids"].append(orphan_entry["id"])
-
-                    # Sync back to data_store to reflect changes in UI immediately
-                    data_store["finished_fixed"] = history_source
+        # DEDUPLICATION: Notification ID in the line (e.g. [15])
+        # This prevents double-counting when the log dumps the notification queue
+        if ev.notif_id is not None:
+            if ev.notif_id in self.processed_reward_ids:
+                # print(f"🚫 Duplicate Reward Ignored (ID: {nid})")
+                return
+            self.processed_reward_ids.add(ev.notif_id)
 
-                    save_state()
+        if ev.amount is None:
+            return
+        amount = ev.amount
+
+        # Update the most recent finished mission if it exists
+        # STRATEGY: Find the most recent mission with NO reward (value=0) and fill it.
+        # This handles batch completions (e.g. 4 missions finish, then 4 rewards come).
+        # HISTORY holds the persistent history, so it is found even after restart
+        if not len(HISTORY):
+            return
+
+        assigned = False
+
+        if ev.ui_notif_id is not None:
+            target_mid = data_store["notif_mission_map"].get(ev.ui_notif_id)
+            if target_mid:
+                mission = HISTORY.get(target_mid)
+                if mission is not None and not mission.get("value") and HISTORY.is_recent(target_mid, 20):
+                    update_finish_value(target_mid, amount)
+                    print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC -> {mission['title']} ({target_mid})")
+                    assigned = True
+
+        if not assigned and data_store.get("last_completed_mission_id"):
+            last_id = data_store["last_completed_mission_id"]
+            last_ts = data_store.get("last_completed_ts")
+
+            # Fix: Ensure last_ts is datetime
+            if isinstance(last_ts, str):
+                try:
+                    last_ts = datetime.fromisoformat(last_ts)
+                except ValueError:
+                    last_ts = None
+
+            if last_ts and (datetime.now() - last_ts) <= timedelta(seconds=30):
+                mission = HISTORY.get(last_id)
+                if mission is not None and not mission.get("value") and HISTORY.is_recent(last_id, 20):
+                    update_finish_value(last_id, amount)
+                    print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC -> {mission['title']} ({last_id})")
+                    assigned = True
+        # Check the last 10 finished missions (only if any entry still has no value)
+        for mission in (HISTORY.recent(10) if HISTORY.has_unvalued() else ()):
+            # If mission has no value or value is 0, assign it
+            if not mission.get("value"):
+                # HEURISTIC: Prevent assigning massive rewards to small/starter missions
+                # This prevents a 1M+ reward (likely a balance glitch or untracked mission)
+                # from being assigned to a "Junior Rank" mission.
+                title_upper = mission.get('title', '').upper()
+                if amount > 500000 and ("JUNIOR" in title_upper or "SMALL" in title_upper or "LOCAL" in title_upper):
+                     print(f"⚠️ {T('source_log', 'ui')}: {T('reward_skip', 'log', 'Skipping assignment of large reward')} ({amount}) {T('to_small_mission', 'log', 'to small mission')}: {mission['title']}")
+                     continue
+
+                print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC -> {mission['title']} ({mission['id']})")
+                update_finish_value(mission.get("id"), amount)
+                assigned = True
+                break
+
+        if not assigned:
+            # If all recent missions have rewards, check for duplicates.
+            # If amount matches the most recent one, assume duplicate log and ignore.
+            # If amount is different, maybe it's a bonus? Add to the most recent one.
+            last_mission = HISTORY.newest()
+            if last_mission.get("value") == amount:
+                 print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC (Duplicate/Ignored)")
+
+            # Only merge as bonus if the new amount is SMALL (likely a bonus)
+            # If new amount is larger than existing, assume it's a separate untracked reward.
+            elif amount < last_mission.get("value", 0) and amount < 500000:
+                 update_finish_value(last_mission.get("id"), last_mission.get("value", 0) + amount)
+                 print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: +{amount} aUEC -> {last_mission['title']} (Bonus)")
+
+            else:
+                 # Create Orphan Reward Entry
+                 print(f"💰 {T('source_log', 'ui')}: {T('reward_detected', 'log')}: {amount} aUEC (Orphan/New)")
+
+                 # Deterministic ID from the line hash (prevents duplicates on re-read)
+                 orphan_entry = {
+                    "id": f"REWARD_{ev.line_hash}",
+                    "title": f"💰 {T('reward', 'ui', 'Reward')} ({amount} aUEC)",
+                    "items": {},
+                    "value": amount,
+                    "started": time.strftime("%H:%M:%S"),
+                    "time": time.strftime("%H:%M:%S"),
+                    "status": "COMPLETED",
+                    "source": "LOG (Reward)"
+                 }
+                 append_finish(orphan_entry)
+                 if "processed_mission_ids" not in data_store: data_store["processed_mission_ids"] = DedupeRegistry()
+                 data_store["processed_mission_ids"].append(orphan_entry["id"])
+
+        save_state()
+
+class InotifyWatcher:
+    """Linux inotify watch on the log directory, filtered to the log file name"""
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, path):
+        import ctypes, ctypes.util
+        self.name = os.path.basename(path).encode()
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(os.path.abspath(path)).encode()
+        if libc.inotify_add_watch(self.fd, directory, self.WATCH_MASK) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    @classmethod
+    def create(cls, path):
+        """Returns a watcher, or None when inotify is not available (Windows, macOS, limits)"""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return cls(path)
+        except Exception as e:
+            print(f"⚠ inotify unavailable ({e}). Using polling.")
+            return None
+
+    def wait(self, timeout):
+        """Block until the log file changes. Returns False on timeout."""
+        import select, struct
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            # struct inotify_event { int wd; uint32 mask, cookie, len; char name[len]; }
+            pos = 0
+            while pos + 16 <= len(buf):
+                _, _, _, name_len = struct.unpack_from("iIII", buf, pos)
+                name = buf[pos + 16:pos + 16 + name_len].rstrip(b"\0")
+                pos += 16 + name_len
+                if name == self.name:
+                    return True
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class LogTailer:
+    """Follows Game.log and yields complete lines as soon as they are written.
 
+    Reads in large blocks and splits lines itself; a partial line at EOF is kept
+    until its newline arrives. Waits with inotify on Linux, otherwise polls with
+    os.stat at an interval that shrinks while the log is active and grows while idle.
+    A truncated or re-created file is re-opened from the start.
+    on_idle is called each time the reader has caught up with the end of the file.
+    """
+    BLOCK_SIZE = 256 * 1024
+    POLL_MIN = 0.02      # Active: sub-50ms latency
+    POLL_MAX = 1.0       # Idle (game closed)
+    ACTIVE_WINDOW = 5.0  # Seconds after the last write before polling backs off
+    WATCH_TIMEOUT = 5.0  # Safety re-check when inotify is in use
+
+    def __init__(self, path, offset=0, skip_partial=False, on_rotate=None, on_idle=None):
+        self.path = path
+        self.offset = offset          # Byte offset right after the last complete line
+        self.skip_partial = skip_partial and offset > 0
+        self.on_rotate = on_rotate
+        self.on_idle = on_idle
+        self.partial = b""
+        self.file = None
+        self.file_id = None
+        self.poll_interval = self.POLL_MIN
+        self.last_data_ts = time.monotonic()
+        self.stopped = False
+        self.watcher = InotifyWatcher.create(path)
+
+    def open(self):
+        self.close_file()
+        self.file = open(self.path, "rb")
+        st = os.fstat(self.file.fileno())
+        self.file_id = (st.st_dev, st.st_ino)
+        self.file.seek(self.offset)
+        self.partial = b""
+
+    def close_file(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def check_rotation(self):
+        """Re-open from the start if Game.log was truncated or replaced"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        if (st.st_dev, st.st_ino) != self.file_id or st.st_size < self.offset:
+            print(f"♻️ {T('log_rotated', 'log', 'Log file was recreated. Reading from start.')}")
+            self.offset = 0
+            self.skip_partial = False
+            self.open()
+            if self.on_rotate:
+                self.on_rotate()
+            return True
         return False
 
+    def read_lines(self):
+        """Read everything available now and return the complete lines"""
+        if self.file is None:
+            try:
+                self.open()
+            except OSError:
+                return []
+        lines = []
+        while True:
+            block = self.file.read(self.BLOCK_SIZE)
+            if not block:
+                break
+            data = self.partial + block
+            cut = data.rfind(b"\n")
+            if cut < 0:
+                self.partial = data
+                continue
+            self.partial = data[cut + 1:]
+            lines.extend(data[:cut].split(b"\n"))
+        self.offset = self.file.tell() - len(self.partial)
+        if self.skip_partial and lines:
+            # Started mid-file: the first line is a fragment
+            lines.pop(0)
+            self.skip_partial = False
+        return [l.decode("utf-8", "ignore").rstrip("\r") for l in lines]
+
+    def wait(self):
+        if self.watcher:
+            self.watcher.wait(self.WATCH_TIMEOUT)
+        else:
+            time.sleep(self.poll_interval)
+            if time.monotonic() - self.last_data_ts > self.ACTIVE_WINDOW:
+                self.poll_interval = min(self.POLL_MAX, self.poll_interval * 1.5)
+
+    def lines(self):
+        """Generator of lines; at EOF waits for new data instead of returning"""
+        try:
+            while not self.stopped:
+                batch = self.read_lines()
+                if batch:
+                    self.poll_interval = self.POLL_MIN
+                    self.last_data_ts = time.monotonic()
+                    yield from batch
+                    continue
+                if self.check_rotation():
+                    continue
+                if self.on_idle:
+                    self.on_idle()
+                self.wait()
+        finally:
+            self.close_file()
+            if self.watcher:
+                self.watcher.close()
+
+    def stop(self):
+        """Ask lines() to return (takes effect after the current wait)"""
+        self.stopped = True
+
+
+# --- INGEST CHECKPOINT ---
+# data_store["ingest_checkpoint"] records how far Game.log has been processed so a
+# restart resumes at that byte offset instead of replaying the backfill window.
+CHECKPOINT_INTERVAL = 10.0          # Seconds between checkpoint writes while the log is idle
+BACKFILL_HOURS = 24                 # Log lines older than this are not replayed at startup
+LOG_TS_REGEX = re.compile(rb'<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})')
+PROBE_MAX_LINES = 1000              # Untimestamped lines a probe skips before giving up
+
+def find_window_start(path, cutoff, lo=0, hi=None):
+    """Byte offset of the first line whose timestamp is >= cutoff ("YYYY-MM-DDTHH:MM:SS").
+
+    Game.log timestamps only move forward, so this bisects on byte offsets and reads
+    one timestamped line per probe. Fixed-width ISO strings compare like the dates
+    they hold, so nothing is parsed. lo must be 0 or the start of a line.
+    """
+    cutoff = cutoff.encode()
+    with open(path, 'rb') as f:
+        if hi is None:
+            f.seek(0, 2)
+            hi = f.tell()
+
+        def probe(pos):
+            """(start of the first line at/after pos, its timestamp or None)"""
+            if pos > 0:
+                f.seek(pos - 1)
+                f.readline()  # Finish the line pos landed in
+            else:
+                f.seek(0)
+            start = f.tell()
+            for _ in range(PROBE_MAX_LINES):
+                m = LOG_TS_REGEX.match(f.readline())
+                if m:
+                    return start, m.group(1)
+            return start, None
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, ts = probe(mid)
+            # No timestamp before EOF counts as "inside the window" (keeps the line)
+            if ts is None or ts >= cutoff:
+                hi = mid
+            else:
+                lo = mid + 1
+        return probe(lo)[0]
+
+def log_fingerprint(path):
+    """Hash of the first line of the log. Game.log is recreated on every game launch,
+    so a different header means the checkpoint belongs to an older file."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(4096)
+    except OSError:
+        return None
+    return hashlib.sha1(head.split(b"\n", 1)[0]).hexdigest()
+
+def resume_offset(path, checkpoint):
+    """Offset to resume from if the checkpoint still matches this file, else None"""
+    if not isinstance(checkpoint, dict) or checkpoint.get("path") != path:
+        return None
+    try:
+        size = os.path.getsize(path)
+        offset = int(checkpoint.get("offset", -1))
+        seen_size = int(checkpoint.get("size", 0))
+    except (OSError, TypeError, ValueError):
+        return None
+    # A log that shrank or lost its header was replaced since the checkpoint was taken
+    if offset < 0 or size < max(offset, seen_size):
+        return None
+    if checkpoint.get("header_hash") != log_fingerprint(path):
+        return None
+    return offset
+
+# --- PARALLEL BACKFILL ---
+# Large backfills are split into newline-aligned byte ranges. Worker processes run the
+# pure parse_line() over their range; the reader thread then applies the events in file
+# order, so smart-merge and reward attribution behave exactly as in a sequential read.
+PARALLEL_BACKFILL_MIN_MB = 32   # Smaller backfills are read sequentially by the tailer
+BACKFILL_CHUNK_MB = 8
+
+def init_backfill_worker(patterns):
+    """Pool initializer: compile the patterns of the parent (spawned workers start from defaults)"""
+    global PATTERN_SET
+    PATTERN_SET = compile_patterns(patterns)
+
+def scan_backfill_chunk(path, start, end, ship_known=False):
+    """Worker: parse [start, end) and return ([(line timestamp, events)] of the relevant lines,
+    last header timestamp, number of lines). ship_known skips the (costly, case-insensitive)
+    ship fallback search."""
+    ps = PATTERN_SET
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    parsed = []
+    last_ts = None
+    for raw in data.split(b"\n"):
+        line = raw.decode("utf-8", "ignore").strip()
+        if not line:
+            continue
+        header = ps.line_header_regex.match(line)
+        if header:
+            last_ts = header.group(1)
+        events = parse_header_line(line, header, ps, not ship_known)
+        if events:
+            parsed.append((last_ts, events))
+            # Once identity/ship is set, ship fallback lines can no longer apply
+            if not ship_known and any(type(e) in (IdentityDetected, ShipDetected) for e in events):
+                ship_known = True
+    return parsed, last_ts, data.count(b"\n")
+
+def backfill_chunks(path, start, end):
+    """Split [start, end) into byte ranges that begin and end on line boundaries"""
+    step = int(BACKFILL_CHUNK_MB * 1024 * 1024)
+    bounds = [start]
+    with open(path, 'rb') as f:
+        pos = start + step
+        while pos < end:
+            f.seek(pos - 1)
+            f.readline()
+            pos = f.tell()
+            if pos >= end:
+                break
+            bounds.append(pos)
+            pos += step
+    bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def parallel_backfill(monitor, path, start, size):
+    """Replay [start, size) of the log with a process pool. Returns the offset reached
+    (end of the last complete line applied); the tailer continues from there."""
+    if size - start < PARALLEL_BACKFILL_MIN_MB * 1024 * 1024 or (os.cpu_count() or 1) < 2:
+        return start
+    # Stop at the last complete line; a partial one is left for the tailer
+    with open(path, 'rb') as f:
+        tail = min(size - start, 1024 * 1024)
+        f.seek(size - tail)
+        end = size - tail + f.read(tail).rfind(b"\n") + 1
+    if end <= start:
+        return start
+
+    chunks = backfill_chunks(path, start, end)
+    ship_known = data_store.get("ship_name", "Waiting for Ship...") != "Waiting for Ship..."
+    workers = min(os.cpu_count() or 1, len(chunks))
+    t0 = time.perf_counter()
+    applied_to = start
+    kept_total = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_backfill_worker, initargs=(dict(PATTERNS),)) as pool:
+            results = pool.map(scan_backfill_chunk, [path] * len(chunks), [c[0] for c in chunks], [c[1] for c in chunks], [ship_known] * len(chunks))
+            # map() yields in submission order: chunk N is applied while later chunks are still scanning
+            for (chunk_start, chunk_end), (parsed, last_ts, _) in zip(chunks, results):
+                for line_ts, events in parsed:
+                    monitor.last_log_ts = line_ts
+                    try:
+                        with STATE_LOCK:
+                            monitor.apply_all(events)
+                    except Exception:
+                        print(f"❌ ERROR applying events: {events}")
+                        traceback.print_exc()
+                if last_ts:
+                    monitor.last_log_ts = last_ts
+                kept_total += sum(len(events) for _, events in parsed)
+                applied_to = chunk_end
+    except Exception as e:
+        print(f"⚠ Parallel backfill unavailable ({e}). Reading sequentially.")
+        return applied_to
+
+    elapsed = time.perf_counter() - t0
+    print(f"⚡ {T('parallel_backfill', 'log', 'Parallel backfill')}: {(end - start) // (1024 * 1024)} MB, {len(chunks)} chunks, {workers} workers, {kept_total} events in {elapsed:.1f}s")
+    return applied_to
+
+# --- LOGBACKUPS IMPORT ---
+# python hauling_web_tst.py --import-backups [folder]
+# The game moves each finished Game.log into LIVE/logbackups. The import replays those
+# archives oldest first, each as a fresh session, through the same parser and appliers as
+# the live reader (chunks are parsed by the process pool, events applied here in order).
+# The missions they finish are merged into hauling_finish.json once, at the end;
+# hauling_state.json is never written.
+IMPORT_WINDOW = 2   # Chunks in flight per worker (bounds memory to a few chunks of events)
+
+def log_start_time(path):
+    """Timestamp of the first log line (file mtime as fallback), used to order archives"""
+    try:
+        with open(path, 'rb') as f:
+            for _ in range(PROBE_MAX_LINES):
+                m = LOG_TS_REGEX.match(f.readline())
+                if m:
+                    return m.group(1).decode()
+        return datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    except OSError:
+        return ""
+
+def log_local_time(log_ts):
+    """Log timestamp (UTC, "2025-01-24T18:23:12.345Z") -> local datetime, or None"""
+    try:
+        return datetime.fromisoformat(log_ts[:19]).replace(tzinfo=timezone.utc).astimezone()
+    except (TypeError, ValueError):
+        return None
+
+def import_log_backups(folder=None):
+    """Rebuild the finish history from every archived log. Returns the number of entries added."""
+    global data_store, PERSIST_TO_DISK
+    folder = folder or os.path.join(os.path.dirname(LOG_PATH), "logbackups")
+    if not os.path.isdir(folder):
+        print(f"⚠ {T('backups_not_found', 'log', 'Log backups folder not found')}: {folder}")
+        return 0
+    archives = sorted((os.path.join(folder, n) for n in os.listdir(folder) if n.lower().endswith(".log")), key=log_start_time)
+    if not archives:
+        print(f"⚠ {T('no_backups', 'log', 'No archived logs in')} {folder}")
+        return 0
+    print(f"📦 {T('importing_backups', 'log', 'Importing archived logs')}: {len(archives)} ({folder})")
+
+    imported = {}   # mission id -> finished entry, oldest first (a later archive replaces an earlier one)
+    workers = os.cpu_count() or 1
+    total_lines = errors = 0
+    quiet = open(os.devnull, 'w', encoding='utf-8')
+
+    def apply_chunk(monitor, result):
+        """Apply one scanned chunk in order; returns its line count"""
+        nonlocal errors
+        parsed, _, count = result
+        with contextlib.redirect_stdout(quiet):
+            for line_ts, events in parsed:
+                monitor.last_log_ts = line_ts
+                try:
+                    monitor.apply_all(events)
+                except Exception:
+                    errors += 1
+                # History entries carry the log's time, not the import's (missions: monitor.log_clock)
+                local = log_local_time(line_ts)
+                if local is None:
+                    continue
+                rekeyed = []
+                for entry in HISTORY.newest_first():
+                    if "date" in entry:
+                        break
+                    entry["time"] = local.strftime("%H:%M:%S")
+                    entry["date"] = local.strftime("%Y-%m-%d")
+                    # Salvage claims without a mission id are keyed by the clock: use the log's, so re-imports dedupe
+                    if str(entry.get("id", "")).startswith("SALVAGE_"):
+                        rekeyed.append(entry)
+                for entry in rekeyed:
+                    HISTORY.remove(entry["id"])
+                    entry["id"] = f"SALVAGE_{int(local.timestamp())}"
+                    HISTORY.add(entry)
+        return count
+
+    t0 = time.perf_counter()
+    PERSIST_TO_DISK = False
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_backfill_worker, initargs=(dict(PATTERNS),)) as pool:
+            for n, path in enumerate(archives, 1):
+                # Every archive is its own game session
+                HISTORY.reset(())
+                data_store = {
+                    "missions": {}, "hangar": [], "processed_mission_ids": DedupeRegistry(),
+                    "player_name": "Waiting for Login...", "ship_name": "Waiting for Ship...",
+                    "current_location": "Synchronizing...", "next_destination": "None",
+                    "fuel_estimate": 0, "mission_status": "READY", "session_start": datetime.now(),
+                    "notif_mission_map": {}, "last_completed_mission_id": None, "last_completed_ts": None
+                }
+                monitor = HaulingMonitor()
+                monitor.log_clock = True
+                lines = 0
+                archive_t0 = time.perf_counter()
+                pending = deque()
+                for start, end in backfill_chunks(path, 0, os.path.getsize(path)):
+                    pending.append(pool.submit(scan_backfill_chunk, path, start, end))
+                    if len(pending) >= workers * IMPORT_WINDOW:
+                        lines += apply_chunk(monitor, pending.popleft().result())
+                while pending:
+                    lines += apply_chunk(monitor, pending.popleft().result())
+
+                finished = HISTORY.items()
+                for entry in reversed(finished):
+                    imported.pop(entry.get("id"), None)
+                    imported[entry.get("id")] = entry
+                total_lines += lines
+                elapsed = time.perf_counter() - archive_t0
+                print(f"  [{n}/{len(archives)}] {os.path.basename(path)}: {lines} {T('lines', 'log', 'lines')}, {len(finished)} {T('finished', 'log', 'finished')} ({lines / elapsed if elapsed else 0:,.0f} {T('lines_per_sec', 'log', 'lines/s')})")
+    except Exception as e:
+        print(f"❌ {T('import_failed', 'log', 'Import failed, history left untouched')}: {e}")
+        return 0
+    finally:
+        PERSIST_TO_DISK = True
+        quiet.close()
+
+    # Merge: entries already in the history win (they may hold manual edits); new ones go after them, newest first
+    items = load_finishes()
+    known = {it.get("id") for it in items}
+    added = [entry for mid, entry in reversed(imported.items()) if mid not in known]
+    if added:
+        save_finishes(items + added)
+    elapsed = time.perf_counter() - t0
+    print(f"✓ {T('import_done', 'log', 'Import finished')}: {len(added)} {T('added', 'log', 'added')}, {len(imported) - len(added)} {T('already_known', 'log', 'already in history')}, {total_lines} {T('lines', 'log', 'lines')} ({total_lines / elapsed if elapsed else 0:,.0f} {T('lines_per_sec', 'log', 'lines/s')}){f', {errors} errors' if errors else ''}")
+    return len(added)
+
 def background_log_reader():
     monitor = HaulingMonitor()
     
@@ -1517,48 +3251,73 @@ def background_log_reader():
     
     print(f"📖 {T('monitoring', 'log')}: {LOG_PATH}")
     
-    with open(LOG_PATH, "r", encoding="utf-8", errors="ignore") as f:
-        # Ler os últimos 10MB para garantir leitura do dia todo
-        f.seek(0, 2)
-        size = f.tell()
-        start_pos = max(0, size - 10 * 1024 * 1024)
-        f.seek(start_pos)
-        print(f"✓ {T('reading_history', 'log')}")
-        
-        # Regex for timestamp: <2025-01-01T15:00:00.000Z>
-        ts_regex = re.compile(r'<(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})')
-        
-        # Calculate cutoff time (24 hours ago)
-        cutoff_time = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=24)
-
-        while True:
-            line = f.readline()
-            if not line:
-                # Fim do arquivo alcançado, entrar em modo de espera (live tail)
-                time.sleep(0.5)
-                continue
-            
-            # Timestamp Check for History Reading
-            ts_match = ts_regex.match(line)
-            if ts_match:
-                try:
-                    log_time = datetime.strptime(ts_match.group(1), "%Y-%m-%dT%H:%M:%S")
-                    if log_time < cutoff_time:
-                        continue # Skip old lines
-                except:
-                    pass
-
-            try:
+    size = os.path.getsize(LOG_PATH)
+    checkpoint = data_store.get("ingest_checkpoint")
+    resume_pos = resume_offset(LOG_PATH, checkpoint)
+
+    # Cutoff (24 hours ago) as a fixed-width ISO string, the format of the log timestamps
+    cutoff = (datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=BACKFILL_HOURS)).strftime("%Y-%m-%dT%H:%M:%S")
+
+    if resume_pos is not None:
+        # Same Game.log as last run: continue right after the last processed line
+        monitor.restore_checkpoint(checkpoint)
+        start_pos = find_window_start(LOG_PATH, cutoff, resume_pos, size)
+        print(f"⏩ {T('resuming_checkpoint', 'log', 'Resuming from checkpoint')} ({(size - start_pos) // 1024} KB {T('new_data', 'log', 'new')})")
+    else:
+        # Not the log of the last checkpoint: a new game session for the dedupe registries
+        start_dedupe_session()
+        # Seek straight to the first line of the last 24h (optionally capped by backfill_max_mb)
+        floor = max(0, size - int(BACKFILL_MAX_MB * 1024 * 1024)) if BACKFILL_MAX_MB > 0 else 0
+        if floor > 0:
+            with open(LOG_PATH, 'rb') as f:
+                f.seek(floor - 1)
+                f.readline()
+                floor = f.tell()
+        start_pos = find_window_start(LOG_PATH, cutoff, floor, size)
+        print(f"✓ {T('reading_history', 'log')} ({(size - start_pos) // 1024} KB)")
+
+    # Catch up on big backfills with all cores; the tailer reads whatever is left
+    start_pos = parallel_backfill(monitor, LOG_PATH, start_pos, size)
+    tailer = LogTailer(LOG_PATH, start_pos)
+
+    header_hash = log_fingerprint(LOG_PATH)
+    last_saved = {"offset": start_pos, "at": time.monotonic()}
+
+    def on_rotate():
+        nonlocal header_hash
+        header_hash = log_fingerprint(LOG_PATH)
+        with STATE_LOCK:
+            monitor.new_log()
+        start_dedupe_session()
+
+    def on_idle():
+        # Caught up with the file: every line before tailer.offset has been processed
+        if (data_store.get("ingest_checkpoint") or {}).get("offset") != tailer.offset:
+            with STATE_LOCK:
+                monitor.checkpoint(LOG_PATH, tailer.offset, header_hash)
+        now = time.monotonic()
+        if tailer.offset != last_saved["offset"] and now - last_saved["at"] >= CHECKPOINT_INTERVAL:
+            save_state(touch=False)
+            last_saved["offset"], last_saved["at"] = tailer.offset, now
+
+    tailer.on_rotate = on_rotate
+    tailer.on_idle = on_idle
+
+    # Everything from start_pos on is inside the window (timestamps are monotonic)
+    for line in tailer.lines():
+        try:
+            with STATE_LOCK:
                 monitor.process_line(line)
-            except Exception as e:
-                print(f"❌ ERROR processing line: {line.strip()}")
-                traceback.print_exc()
+        except Exception as e:
+            print(f"❌ ERROR processing line: {line.strip()}")
+            traceback.print_exc()
 
 
 
 
 
 @app.route('/manual_add_item', methods=['POST'])
+@state_writer
 def manual_add_item():
     m_id = request.form.get('mission_id')
     mats = request.form.getlist('material')
@@ -1620,6 +3379,7 @@ def manual_add_item():
                         "action": "MANUAL_ADD"
                     }
                     print(f"✏️ {T('manual_add', 'log')}: {vol} {mat} -> {dest} ({T('mission', 'ui')}: {m_id})")
+                    mark_mission(m_id)
                     save_state()
                 except ValueError:
                     pass 
@@ -1627,6 +3387,7 @@ def manual_add_item():
     return '<meta http-equiv="refresh" content="0;url=/">'
 
 @app.route('/force_complete_item', methods=['POST'])
+@state_writer
 def force_complete_item():
     mission_id = request.form.get('mission_id')
     item_key = request.form.get('item_key')
@@ -1636,6 +3397,7 @@ def force_complete_item():
     if mission_id in data_store["missions"] and item_key in data_store["missions"][mission_id]["items"]:
         item = data_store["missions"][mission_id]["items"][item_key]
         mission = data_store["missions"][mission_id]
+        mark_mission(mission_id)
         
         # Update Value if provided
         if new_value:
@@ -1690,23 +3452,21 @@ def force_complete_item():
     return '<meta http-equiv="refresh" content="0;url=/">'
 
 @app.route('/delete_history/<history_index>')
+@state_writer
 def delete_history(history_index):
     try:
         idx = int(history_index)
-        if 0 <= idx < len(data_store.get("finished_fixed", [])):
-            removed = data_store["finished_fixed"][idx]
+        removed = HISTORY.at(idx)
+        if removed is not None:
             
             # Ensure ID is in processed_mission_ids so it doesn't reappear from logs
             if "processed_mission_ids" not in data_store: 
-                data_store["processed_mission_ids"] = []
+                data_store["processed_mission_ids"] = DedupeRegistry()
             
             if "id" in removed and removed["id"] not in data_store["processed_mission_ids"]:
                 data_store["processed_mission_ids"].append(removed["id"])
                 
-            items = load_finishes()
-            items = [it for it in items if it.get("id") != removed.get("id")]
-            save_finishes(items)
-            data_store["finished_fixed"] = items
+            delete_finish(removed.get("id"))
             print(f"🗑️ {T('history_delete', 'log')}: {removed.get('title', 'Mission')}")
             save_state()
     except:
@@ -1714,16 +3474,18 @@ def delete_history(history_index):
     return '<meta http-equiv="refresh" content="0;url=/">'
 
 @app.route('/delete_mission/<mission_id>')
+@state_writer
 def delete_mission(mission_id):
     if mission_id in data_store["missions"]:
         # BLACKLIST ITEMS (Prevent Resurrection)
-        if "ignored_signatures" not in data_store: data_store["ignored_signatures"] = []
+        if "ignored_signatures" not in data_store: data_store["ignored_signatures"] = DedupeRegistry()
         for k, v in data_store["missions"][mission_id]["items"].items():
              sig = get_item_signature(v)
              if sig not in data_store["ignored_signatures"]:
                  data_store["ignored_signatures"].append(sig)
 
         del data_store["missions"][mission_id]
+        mark_mission(mission_id)
         print(f"🗑️ {T('manual_delete', 'log')}: {T('mission', 'ui')} {mission_id}")
         save_state()
     return '<meta http-equiv="refresh" content="0;url=/">'
@@ -1731,8 +3493,8 @@ def delete_mission(mission_id):
 
 
 @app.route('/add_hangar_item', methods=['POST'])
+@state_writer(reload=True)
 def add_hangar_item():
-    load_state() # Ensure we have latest
     loc = request.form.get('location')
     mat = request.form.get('material')
     qty = request.form.get('quantity')
@@ -1746,22 +3508,24 @@ def add_hangar_item():
                 "qty": int(qty),
                 "added": time.strftime("%H:%M:%S")
             })
+            STATE_JOURNAL.mark("hangar")
             save_state()
         except ValueError:
             pass
     return '<meta http-equiv="refresh" content="0;url=/hangar">'
 
 @app.route('/delete_hangar_item/<int:index>')
+@state_writer(reload=True)
 def delete_hangar_item(index):
-    load_state()
     if "hangar" in data_store and 0 <= index < len(data_store["hangar"]):
         data_store["hangar"].pop(index)
+        STATE_JOURNAL.mark("hangar")
         save_state()
     return '<meta http-equiv="refresh" content="0;url=/hangar">'
 
 @app.route('/update_hangar_item', methods=['POST'])
+@state_writer(reload=True)
 def update_hangar_item():
-    load_state()
     idx = request.form.get('index')
     action = request.form.get('action') # 'update' or 'sell'
     qty = request.form.get('quantity')
@@ -1805,15 +3569,15 @@ def update_hangar_item():
                 # Clean up if empty
                 if item['qty'] <= 0:
                     data_store["hangar"].pop(i)
-                    
+                STATE_JOURNAL.mark("hangar")
                 save_state()
         except ValueError:
             pass
     return '<meta http-equiv="refresh" content="0;url=/hangar">'
 
 @app.route('/create_manifest', methods=['POST'])
+@state_writer(reload=True)
 def create_manifest():
-    load_state()
     idx = request.form.get('index')
     dest = request.form.get('destination')
     qty_str = request.form.get('quantity')
@@ -1846,14 +3610,16 @@ def create_manifest():
                         "started": time.strftime("%H:%M:%S")
                     })
                     print(f"🚚 Route Created: {req_qty} SCU {item['mat']} from {item['loc']} to {dest}")
+                    STATE_JOURNAL.mark("hangar")
+                    STATE_JOURNAL.mark("private_manifests")
                     save_state()
         except ValueError:
             pass
     return '<meta http-equiv="refresh" content="0;url=/hangar">'
 
 @app.route('/complete_manifest', methods=['POST'])
+@state_writer(reload=True)
 def complete_manifest():
-    load_state()
     idx = request.form.get('index')
     profit = request.form.get('profit')
     
@@ -1882,14 +3648,15 @@ def complete_manifest():
                 data_store["finished_missions"].insert(0, entry)
                 append_finish(entry)
                 print(f"💰 Sold: {item['mat']} for {profit} aUEC")
+                STATE_JOURNAL.mark("private_manifests")
                 save_state()
         except ValueError:
             pass
     return '<meta http-equiv="refresh" content="0;url=/hangar">'
 
 @app.route('/delete_manifest/<int:index>')
+@state_writer(reload=True)
 def delete_manifest(index):
-    load_state()
     if "private_manifests" in data_store and 0 <= index < len(data_store["private_manifests"]):
         item = data_store["private_manifests"].pop(index)
         
@@ -1901,10 +3668,13 @@ def delete_manifest(index):
             "qty": item["qty"],
             "added": time.strftime("%H:%M:%S")
         })
+        STATE_JOURNAL.mark("private_manifests")
+        STATE_JOURNAL.mark("hangar")
         save_state()
     return '<meta http-equiv="refresh" content="0;url=/hangar">'
 
 @app.route('/finish_update', methods=['POST'])
+@state_writer
 def finish_update():
     mid = request.form.get('id')
     val = request.form.get('value')
@@ -1914,22 +3684,25 @@ def finish_update():
         v = None
     if mid and v is not None:
         update_finish_value(mid, v)
-        data_store["finished_fixed"] = load_finishes()
     return '<meta http-equiv="refresh" content="0;url=/">'
 
 @app.route('/finish_delete/<mid>')
+@state_writer
 def finish_delete(mid):
-    items = load_finishes()
-    items = [it for it in items if it.get("id") != mid]
-    save_finishes(items)
-    data_store["finished_fixed"] = items
+    delete_finish(mid)
     if "processed_mission_ids" not in data_store:
-        data_store["processed_mission_ids"] = []
+        data_store["processed_mission_ids"] = DedupeRegistry()
     if mid not in data_store["processed_mission_ids"]:
         data_store["processed_mission_ids"].append(mid)
     save_state()
     return '<meta http-equiv="refresh" content="0;url=/">'
+@app.route('/api/persistence')
+def persistence_stats():
+    """Write-behind counters: writes saved by coalescing and flush latency"""
+    return jsonify(STATE_PERSISTER.stats())
+
 @app.route('/reset_session', methods=['POST'])
+@state_writer
 def reset_session():
     global data_store
     
@@ -1939,7 +3712,12 @@ def reset_session():
         "finished_missions": [],
         "hangar": data_store.get("hangar", []),
         "private_manifests": data_store.get("private_manifests", []),
-        "processed_mission_ids": data_store.get("processed_mission_ids", []), # Keep the blocklist!
+        "processed_mission_ids": data_store.get("processed_mission_ids", DedupeRegistry()), # Keep the blocklist!
+        "ignored_signatures": data_store.get("ignored_signatures", DedupeRegistry()),
+        "notif_mission_map": {},
+        "ingest_checkpoint": data_store.get("ingest_checkpoint"), # Don't replay the log into the new session
+        "ingest_notification_ids": data_store.get("ingest_notification_ids", DedupeRegistry()),
+        "ingest_reward_ids": data_store.get("ingest_reward_ids", DedupeRegistry()),
         "player_name": data_store.get("player_name", "Waiting for Login..."), 
         "ship_name": data_store.get("ship_name", "Waiting for Ship..."),
         "current_location": data_store.get("current_location", "Synchronizing..."), 
@@ -1954,94 +3732,364 @@ def reset_session():
     print(f"♻️ {T('session_reset', 'log', 'Session Reset by User')}")
     return "OK"
 
-@app.route('/hangar')
-def hangar_page():
-    """Separate Hangar / Local Cargo Page (Served on same port)"""
-    # Reload state to get latest from disk (in case Dashboard updated it)
-    load_state()
-    
-    # --- RENDER HANGAR ITEMS ---
-    hangar_html = ""
-    if "hangar" in data_store and data_store["hangar"]:
-        hangar_html += "<table style='width:100%; border-collapse:collapse; font-size:0.9rem; color:#ccc;'>"
-        hangar_html += f"<tr style='background:#222; text-align:left;'><th style='padding:5px;'>{T('location')}</th><th style='padding:5px;'>{T('material')}</th><th style='padding:5px;'>{T('quantity')}</th><th style='padding:5px;'>{T('actions', 'ui', 'Actions')}</th></tr>"
-        for i, item in enumerate(data_store["hangar"]):
-            hangar_html += f"<tr style='border-bottom:1px solid #333;'>"
-            hangar_html += f"<td style='padding:5px;'>{item['loc']}</td>"
-            hangar_html += f"<td style='padding:5px;'>{item['mat']}</td>"
-            hangar_html += f"<td style='padding:5px;'>{item['qty']} SCU</td>"
-            hangar_html += f"<td style='padding:5px; text-align:right; display:flex; gap:5px; justify-content:flex-end;'>"
-            hangar_html += f"<button onclick=\"editHangarItem('{i}', '{item['loc']}', '{item['mat']}', '{item['qty']}')\" style='background:#ffcc00; color:#000; border:none; padding:2px 5px; cursor:pointer; font-size:0.8rem; border-radius:3px;' title='{T('edit_manage', 'ui', 'Edit / Sell')}'>✏️</button>"
-            hangar_html += f"<button onclick=\"openTransport('{i}', '{item['loc']}', '{item['mat']}', '{item['qty']}')\" style='background:#00f2ff; color:#000; border:none; padding:2px 5px; cursor:pointer; font-size:0.8rem; border-radius:3px;'>🚚 {T('transport', 'ui', 'Route')}</button>"
-            hangar_html += f"<a href='/delete_hangar_item/{i}' style='color:#ff5555; text-decoration:none; padding:2px 5px; border:1px solid #ff5555; border-radius:3px; font-size:0.8rem;'>🗑️</a>"
-            hangar_html += f"</td>"
-            hangar_html += "</tr>"
-        hangar_html += "</table>"
-    else:
-        hangar_html += f"<div style='color:#666; font-style:italic; padding:10px 0;'>{T('no_hangar_items', 'ui', 'No items in hangar.')}</div>"
-
-    # --- RENDER ACTIVE TRANSPORTS (PRIVATE ROUTES) ---
-    transports_html = ""
-    if "private_manifests" in data_store and data_store["private_manifests"]:
-        transports_html += "<div style='margin-top:20px;'><b>🚛 {0}</b><hr style='border-color:#21262d; margin:5px 0;'>".format(T('active_routes', 'ui', 'Active Routes'))
-        for i, m in enumerate(data_store["private_manifests"]):
-            transports_html += f"<div style='background:#1a1a1a; padding:10px; border-radius:5px; border:1px solid #333; margin-bottom:10px;'>"
-            transports_html += f"<div style='display:flex; justify-content:space-between; margin-bottom:5px;'>"
-            transports_html += f"<span style='color:#00f2ff; font-weight:bold;'>{m['origin']} ➔ {m['destination']}</span>"
-            transports_html += f"<span style='color:#aaa;'>{m['qty']} SCU {m['mat']}</span>"
-            transports_html += f"</div>"
-            
-            # Action: Complete (Sell)
-            transports_html += f"<form action='/complete_manifest' method='post' style='display:flex; gap:5px; align-items:center; margin-top:5px;'>"
-            transports_html += f"<input type='hidden' name='index' value='{i}'>"
-            transports_html += f"<input type='number' name='profit' placeholder='{T('profit', 'ui', 'Profit (aUEC)')}' style='background:#222; border:1px solid #444; color:#fff; padding:3px; width:100px;' required>"
-            transports_html += f"<button type='submit' style='background:#00ff88; color:#000; border:none; padding:3px 10px; cursor:pointer; font-weight:bold; border-radius:3px;'>💰 {T('sell_finish', 'ui', 'Sell/Finish')}</button>"
-            transports_html += f"<a href='/delete_manifest/{i}' style='color:#ff5555; text-decoration:none; margin-left:10px; font-size:0.9rem;'>🗑️ {T('cancel', 'ui', 'Cancel')}</a>"
-            transports_html += f"</form>"
-            transports_html += f"</div>"
-        transports_html += "</div>"
+# --- STATIC ASSETS ---
+# The pages' CSS and JavaScript are served from /assets/<name>?v=<hash of the content> with a
+# one-year Cache-Control, so a poll only carries the HTML. The hash follows the content (the
+# language, the refresh interval), so a change gives the browser a new URL, never a stale copy.
+ASSET_TYPES = {".css": "text/css", ".js": "application/javascript"}
+ASSET_MAX_AGE = 365 * 24 * 3600
+ASSET_CACHE = {}  # name -> ((language, refresh interval), body bytes, version)
+
+DASHBOARD_CSS = (
+    "body{background:#0b0e14;color:#a1c4d4;font-family:sans-serif;padding:20px;margin:0;}"
+    ".header{border-bottom:2px solid #00f2ff44; padding-bottom:15px; margin-bottom:20px; display:flex; justify-content:space-between; align-items:flex-start;}"
+    ".header-left{flex:1;}"
+    ".header-right{margin-left:20px;}"
+    ".status-row{display:flex; gap:15px; margin-top:10px; flex-wrap:wrap;}"
+    ".status-badge{background:#161b22; border:1px solid #30363d; padding:8px 15px; border-radius:5px; font-size:0.9rem;}"
+    ".loc-box{color:#00f2ff; font-size:1.3rem; font-weight:bold;}"
+    ".mission-status{border-left:3px solid #ffcc00; padding-left:10px;}"
+    ".card-loc{background:#161b22; border:1px solid #30363d; padding:15px; border-radius:5px; margin-bottom:15px; border-left: 5px solid #00f2ff;}"
+    ".scu-box{padding:3px 10px; border-radius:4px; font-weight:bold; font-family:monospace; font-size:0.9rem; margin-left: 5px;}"
+    ".pickup-tag{background:#ff00ff22; color:#ff00ff; border:1px solid #ff00ff44;}"
+    ".deliver-tag{background:#00f2ff22; color:#00f2ff; border:1px solid #00f2ff44;}"
+    ".COMPLETED{background:#00ff8822; color:#00ff88; border: 1px solid #00ff88; text-decoration: line-through; opacity: 0.6;}"
+    ".footer{background:#0d1117; border:1px solid #21262d; padding:15px; margin-top:30px; border-radius:5px; font-family:monospace; font-size:0.8rem;}"
+    ".info-grid{display:flex; justify-content:space-between; align-items:center; margin-top:10px; flex-wrap:wrap; gap:10px;}"
+    ".history-item{border-bottom:1px solid #21262d; padding:8px 0; display:flex; justify-content:space-between;}"
+    ".empty-state{text-align:center; padding:40px; color:#666; font-style:italic;}"
+    ".pause-btn{background:#333; color:#fff; border:1px solid #555; padding:8px 15px; cursor:pointer; border-radius:5px; font-weight:bold; font-size:0.9rem;}"
+    ".pause-btn.paused{background:#ffcc00; color:#000; border:1px solid #ffcc00; animation: pulse 2s infinite;}"
+    ".reset-btn{background:#d93025; color:#fff; border:1px solid #a61c14; padding:5px 10px; cursor:pointer; border-radius:3px; font-size:0.8rem; margin-left:10px;}"
+    "@keyframes pulse { 0% { opacity: 1; } 50% { opacity: 0.8; } 100% { opacity: 1; } }"
+)
+
+# Dashboard script: pause handling, partial page updates, /events; the refresh interval
+# placeholder is filled in by its builder below
+DASHBOARD_JS = """
+    var manualPause = false;
+    var editingPause = false;
+    var typingPause = false;
+    var lastDomUpdateTs = Date.now();
+    var pageEtag = null;  // ETag of the content on screen (the server answers 304 while it is current)
+    var pushLive = false;  // /events stream connected: polling is not needed
+    var pendingEtag = null;  // Announced by /events, not on screen yet (e.g. while paused)
 
-    # --- MAIN HTML ---
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="{LANGUAGE}">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Hangar & Local Cargo</title>
-        <style>
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #0d1117; color: #c9d1d9; margin: 0; padding: 20px; font-size: 14px; }}
-            .card {{ background-color: #161b22; border: 1px solid #30363d; border-radius: 6px; padding: 15px; margin-bottom: 15px; box-shadow: 0 3px 6px rgba(0,0,0,0.2); }}
-            .btn {{ display: inline-block; padding: 5px 10px; background: #238636; color: white; text-decoration: none; border-radius: 4px; font-weight: bold; border: none; cursor: pointer; }}
-            input, select {{ background-color: #0d1117; border: 1px solid #30363d; color: #c9d1d9; padding: 5px; border-radius: 4px; }}
-            .nav-header {{ display: flex; gap: 10px; margin-bottom: 20px; border-bottom: 1px solid #30363d; padding-bottom: 10px; }}
-            .nav-link {{ color: #58a6ff; text-decoration: none; padding: 5px 10px; border-radius: 4px; }}
-            .nav-link:hover {{ background: #30363d; }}
-            .nav-active {{ background: #30363d; font-weight: bold; color: #fff; }}
-        </style>
-        <script>
-        function openTransport(index, loc, mat, qty) {{
-            document.getElementById('trans_origin').value = loc;
-            document.getElementById('trans_mat').value = mat;
-            
-            const qtyInput = document.getElementById('trans_qty');
-            qtyInput.value = qty;
-            qtyInput.max = qty;
-            
-            document.getElementById('trans_index').value = index;
-            document.getElementById('transport_modal').style.display = 'block';
-        }}
+    function updatePauseUI() {
+        const btn = document.getElementById('pauseBtn');
+        if (!btn) return;
+        
+        if (manualPause) {
+            btn.classList.add('paused');
+            btn.textContent = '▶ RESUME';
+        } else if (editingPause) {
+             btn.classList.add('paused');
+             btn.textContent = '⏸ EDITING...';
+        } else if (typingPause) {
+             btn.classList.add('paused');
+             btn.textContent = '⏸ TYPING...';
+        } else {
+            btn.classList.remove('paused');
+            btn.textContent = '⏸ PAUSE';
+        }
+    }
 
-        function editHangarItem(index, loc, mat, qty) {{
-            document.getElementById('edit_index').value = index;
-            document.getElementById('edit_loc').textContent = loc;
-            document.getElementById('edit_mat').textContent = mat;
-            
-            // Default to update mode
-            document.getElementById('edit_qty_update').value = qty;
-            document.getElementById('edit_qty_sell').value = 0;
-            
-            // Reset to Update mode
+    function togglePauseManual() {
+        manualPause = !manualPause;
+        updatePauseUI();
+    }
+    
+    // Helper to pause when editing starts
+    function openEdit(el) {
+        if (!el) return;
+        editingPause = true;
+        updatePauseUI();
+        el.style.display = 'block';
+        
+        // Auto-focus first input if available
+        const input = el.querySelector('input');
+        if (input) input.focus();
+    }
+
+    // Helper to resume when editing ends
+    function closeEdit(btn, el) {
+        // If btn provided, find the container
+        if (btn) {
+            el = btn.closest('div[id^=item_edit], div[id^=edit_]');
+        }
+        
+        if (el) {
+            el.style.display = 'none';
+        }
+        
+        // Check if any other edit forms are visible
+        const anyVisible = document.querySelectorAll('div[id^=item_edit][style*="display: block"], div[id^=edit_][style*="display: block"]').length > 0;
+        if (!anyVisible) {
+            editingPause = false;
+        }
+        updatePauseUI();
+    }
+
+    // Override toggle functions
+    function toggleItemEdit(id) {
+        const el = document.getElementById('item_edit_' + id);
+        if (el) {
+            if (el.style.display === 'none' || el.style.display === '') {
+                openEdit(el);
+            } else {
+                closeEdit(null, el);
+            }
+        }
+    }
+
+    function toggleEdit(id) {
+        const el = document.getElementById('edit_' + id);
+        if (el) {
+            if (el.style.display === 'none' || el.style.display === '') {
+                openEdit(el);
+            } else {
+                closeEdit(null, el);
+            }
+        }
+    }
+    
+    function addRow(containerId) {
+        // Adding a row implies editing
+        editingPause = true; 
+        updatePauseUI();
+        
+        const container = document.getElementById(containerId);
+        const div = document.createElement('div');
+        div.style.cssText = "display:flex; gap:5px; margin-bottom:5px;";
+        div.innerHTML = `
+            <input type="text" name="material" placeholder="{T('material')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
+            <input type="number" name="quantity" placeholder="{T('quantity')}" style="width:60px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
+            <input type="text" name="origin" placeholder="{T('origin_ph', 'ui', 'Origin (Opt)')}" style="width:100px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;">
+            <input type="text" name="destination" placeholder="{T('destination_ph')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
+            <button type="button" onclick="this.parentElement.remove()" style="background:#442222; color:#ff5555; border:none; padding:0 8px; cursor:pointer;">x</button>
+        `;
+        container.appendChild(div);
+        
+        // Focus the new input
+        div.querySelector('input').focus();
+    }
+    
+    function resetSession() {
+        if(confirm("{T('reset_confirm', 'ui', 'Are you sure you want to reset the session? This will clear all current missions.')}")) {
+            fetch('/reset_session', { method: 'POST' })
+            .then(r => window.location.reload());
+        }
+    }
+
+    // Focus/Blur handling for temporary typing pause
+    document.addEventListener('focus', function(e) {
+        if(e.target && (e.target.tagName === 'INPUT' || e.target.tagName === 'BUTTON' || e.target.tagName === 'SELECT' || e.target.tagName === 'TEXTAREA')) {
+            if (e.target.id === 'pauseBtn') return;
+            typingPause = true;
+            updatePauseUI();
+        }
+    }, true);
+
+    document.addEventListener('blur', function(e) {
+        if(e.target && (e.target.tagName === 'INPUT' || e.target.tagName === 'BUTTON' || e.target.tagName === 'SELECT' || e.target.tagName === 'TEXTAREA')) {
+            setTimeout(() => {
+                // Check if we moved to another input
+                const active = document.activeElement;
+                if (!active || active.tagName === 'BODY' || active.tagName === 'HTML') {
+                    typingPause = false;
+                    updatePauseUI();
+                }
+            }, 200);
+        }
+    }, true);
+
+    async function updateContent() {
+        if (manualPause || editingPause || typingPause) {
+            return;
+        }
+
+        try {
+            const controller = new AbortController();
+            const to = setTimeout(() => controller.abort(), 5000);
+            const response = await fetch('/?ts=' + Date.now(), {
+                cache: 'no-store', signal: controller.signal,
+                headers: pageEtag ? { 'If-None-Match': pageEtag } : {}
+            });
+            if (response.status === 304) {
+                // Nothing changed on the server
+                clearTimeout(to);
+                lastDomUpdateTs = Date.now();
+                pendingEtag = null;
+                return;
+            }
+            const text = await response.text();
+            clearTimeout(to);
+            
+            // Double check pause after fetch
+             if (manualPause || editingPause || typingPause) {
+                return;
+            }
+            
+            const parser = new DOMParser();
+            const doc = parser.parseFromString(text, 'text/html');
+            
+            // Selective Update
+            const headerLeft = document.querySelector('.header-left');
+            if (headerLeft && doc.querySelector('.header-left')) {
+                headerLeft.innerHTML = doc.querySelector('.header-left').innerHTML;
+            }
+            
+            const infoGrid = document.querySelector('.info-grid');
+            if (infoGrid && doc.querySelector('.info-grid')) {
+                infoGrid.innerHTML = doc.querySelector('.info-grid').innerHTML;
+            }
+            
+            const missionList = document.getElementById('mission-list');
+            if (missionList && doc.getElementById('mission-list')) {
+                missionList.innerHTML = doc.getElementById('mission-list').innerHTML;
+            }
+            
+            const newMissionsList = document.getElementById('new-missions-list');
+            if (newMissionsList && doc.getElementById('new-missions-list')) {
+                newMissionsList.innerHTML = doc.getElementById('new-missions-list').innerHTML;
+            }
+            
+            const footerContent = document.getElementById('footer-content');
+            if (footerContent && doc.getElementById('footer-content')) {
+                footerContent.innerHTML = doc.getElementById('footer-content').innerHTML;
+            }
+            
+            lastDomUpdateTs = Date.now();
+            pageEtag = response.headers.get('ETag');
+            pendingEtag = null;
+
+        } catch (e) {
+            console.error("Update failed", e);
+        }
+    }
+
+    // Live updates pushed by the server; polling only runs while the stream is down
+    function connectEvents() {
+        if (!window.EventSource) return;
+        const source = new EventSource('/events');
+        source.onopen = function() { pushLive = true; };
+        source.addEventListener('state', function(e) {
+            const msg = JSON.parse(e.data);
+            lastDomUpdateTs = Date.now();
+            if (msg.etag !== pageEtag) {
+                pendingEtag = msg.etag;
+                updateContent();
+            }
+        });
+        source.addEventListener('ping', function() {
+            lastDomUpdateTs = Date.now();
+        });
+        source.onerror = function() {
+            // The browser reconnects by itself (sending Last-Event-ID); poll meanwhile
+            pushLive = false;
+            if (source.readyState === EventSource.CLOSED) {
+                setTimeout(connectEvents, 5000);
+            }
+        };
+    }
+    connectEvents();
+
+    setInterval(function() {
+        if (!pushLive || (pendingEtag && pendingEtag !== pageEtag)) {
+            updateContent();
+        }
+    }, {{ REFRESH_INTERVAL_MS }});
+    
+    setInterval(function() {
+        if (!manualPause && !editingPause && !typingPause) {
+            var delta = Date.now() - lastDomUpdateTs;
+            if (delta > 20000) {
+                window.location.reload();
+            }
+        }
+    }, 5000);
+    
+    document.addEventListener('visibilitychange', function() {
+        if (!document.hidden) {
+            updateContent();
+        }
+    });
+"""
+
+def missions_js():
+    """Editing helpers included while missions are active (translated placeholders)"""
+    return f"""
+        function addRow(containerId) {{
+            isPaused = true; 
+            updatePauseUI();
+            const container = document.getElementById(containerId);
+            const div = document.createElement('div');
+            div.style.cssText = "display:flex; gap:5px; margin-bottom:5px;";
+            div.innerHTML = `
+                <input type="text" name="material" placeholder="{T('material')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()" required>
+                <input type="number" name="quantity" placeholder="{T('quantity')}" style="width:60px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()" required>
+                <input type="text" name="origin" placeholder="{T('origin_ph', 'ui', 'Origin (Opt)')}" style="width:100px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()">
+                <input type="text" name="destination" placeholder="{T('destination_ph')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()" required>
+                <button type="button" onclick="this.parentElement.remove()" style="background:#442222; color:#ff5555; border:none; padding:0 8px; cursor:pointer;">x</button>
+            `;
+            container.appendChild(div);
+        }}
+        function toggleItemEdit(id) {{
+            setPaused();
+            const el = document.getElementById('item_edit_' + id);
+            if (el.style.display === 'none') el.style.display = 'block';
+            else el.style.display = 'none';
+        }}
+        function toggleEdit(id) {{
+            setPaused();
+            const el = document.getElementById('edit_' + id);
+            if (el.style.display === 'none') el.style.display = 'block';
+            else el.style.display = 'none';
+        }}
+        function resetSession() {{
+            if(confirm("{T('reset_confirm', 'ui', 'Are you sure you want to reset the session? This will clear all current missions.')}")) {{
+                fetch('/reset_session', {{ method: 'POST' }})
+                .then(r => window.location.reload());
+            }}
+        }}
+        """
+
+HANGAR_CSS = """
+            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #0d1117; color: #c9d1d9; margin: 0; padding: 20px; font-size: 14px; }
+            .card { background-color: #161b22; border: 1px solid #30363d; border-radius: 6px; padding: 15px; margin-bottom: 15px; box-shadow: 0 3px 6px rgba(0,0,0,0.2); }
+            .btn { display: inline-block; padding: 5px 10px; background: #238636; color: white; text-decoration: none; border-radius: 4px; font-weight: bold; border: none; cursor: pointer; }
+            input, select { background-color: #0d1117; border: 1px solid #30363d; color: #c9d1d9; padding: 5px; border-radius: 4px; }
+            .nav-header { display: flex; gap: 10px; margin-bottom: 20px; border-bottom: 1px solid #30363d; padding-bottom: 10px; }
+            .nav-link { color: #58a6ff; text-decoration: none; padding: 5px 10px; border-radius: 4px; }
+            .nav-link:hover { background: #30363d; }
+            .nav-active { background: #30363d; font-weight: bold; color: #fff; }
+        """
+
+def hangar_js():
+    """Hangar page script (the refresh interval comes from the config)"""
+    return f"""
+        function openTransport(index, loc, mat, qty) {{
+            document.getElementById('trans_origin').value = loc;
+            document.getElementById('trans_mat').value = mat;
+            
+            const qtyInput = document.getElementById('trans_qty');
+            qtyInput.value = qty;
+            qtyInput.max = qty;
+            
+            document.getElementById('trans_index').value = index;
+            document.getElementById('transport_modal').style.display = 'block';
+        }}
+
+        function editHangarItem(index, loc, mat, qty) {{
+            document.getElementById('edit_index').value = index;
+            document.getElementById('edit_loc').textContent = loc;
+            document.getElementById('edit_mat').textContent = mat;
+            
+            // Default to update mode
+            document.getElementById('edit_qty_update').value = qty;
+            document.getElementById('edit_qty_sell').value = 0;
+            
+            // Reset to Update mode
             const updateRadio = document.querySelector('input[name="action"][value="update"]');
             if(updateRadio) updateRadio.checked = true;
             toggleSaleFields(false);
@@ -2067,6 +4115,8 @@ def hangar_page():
             }}
         }}
 
+        var pageEtag = null;  // ETag of the lists on screen
+
         async function updateContent() {{
             // Pause update if user is typing
             var active = document.activeElement;
@@ -2075,7 +4125,12 @@ def hangar_page():
             }}
             
             try {{
-                const response = await fetch(window.location.href);
+                const response = await fetch(window.location.href, {{
+                    cache: 'no-store',
+                    headers: pageEtag ? {{ 'If-None-Match': pageEtag }} : {{}}
+                }});
+                if (response.status === 304) return; // Nothing changed on the server
+                pageEtag = response.headers.get('ETag');
                 const text = await response.text();
                 const parser = new DOMParser();
                 const doc = parser.parseFromString(text, 'text/html');
@@ -2097,8 +4152,147 @@ def hangar_page():
             }} catch (e) {{ console.error("Update failed", e); }}
         }}
 
-        setInterval(updateContent, {REFRESH_INTERVAL_MS});
-        </script>
+        setInterval(updateContent, {REFRESH_INTERVAL_MS});
+        """
+
+ASSET_BUILDERS = {
+    "dashboard.css": lambda: DASHBOARD_CSS,
+    "dashboard.js": lambda: DASHBOARD_JS.replace("{{ REFRESH_INTERVAL_MS }}", str(REFRESH_INTERVAL_MS)),
+    "missions.js": missions_js,
+    "hangar.css": lambda: HANGAR_CSS,
+    "hangar.js": hangar_js,
+}
+
+def asset(name):
+    """(body bytes, version) of an asset, rebuilt when the language or refresh interval changes"""
+    inputs = (LANGUAGE, REFRESH_INTERVAL_MS)
+    cached = ASSET_CACHE.get(name)
+    if cached is None or cached[0] != inputs:
+        body = ASSET_BUILDERS[name]().encode("utf-8")
+        cached = (inputs, body, hashlib.md5(body).hexdigest()[:12])
+        ASSET_CACHE[name] = cached
+    return cached[1], cached[2]
+
+def asset_url(name):
+    return f"/assets/{name}?v={asset(name)[1]}"
+
+@app.route('/assets/<name>')
+def static_asset(name):
+    if name not in ASSET_BUILDERS:
+        return "Not found", 404
+    body, version = asset(name)
+    if request.if_none_match.contains(version):
+        resp = not_modified(version)
+    else:
+        resp = make_response(body)
+        resp.mimetype = ASSET_TYPES[os.path.splitext(name)[1]]
+        resp.set_etag(version)
+    # Only the URL of the current content may be kept for good
+    if request.args.get("v") == version:
+        resp.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    else:
+        resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+# --- COMPRESSION ---
+# HTML, JSON, CSS and JS responses of GZIP_MIN_BYTES or more are gzipped for clients that
+# accept it. Bodies with an ETag (pages and /api/state: one per state version; assets: one
+# per content hash) are compressed once and kept in GZIP_CACHE for the other clients.
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+GZIP_TYPES = ("text/html", "application/json", "text/css", "application/javascript")
+GZIP_CACHE_MAX = 32
+GZIP_CACHE = OrderedDict()  # (path, etag, size) -> gzipped body, least recently used first
+GZIP_LOCK = threading.Lock()
+
+@app.after_request
+def compress_response(resp):
+    if (resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed
+            or resp.mimetype not in GZIP_TYPES or "Content-Encoding" in resp.headers):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return resp
+    data = resp.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return resp
+    etag = resp.get_etag()[0]
+    key = (request.path, etag, len(data)) if etag else None
+    with GZIP_LOCK:
+        body = GZIP_CACHE.get(key) if key else None
+        if body is not None:
+            GZIP_CACHE.move_to_end(key)
+    if body is None:
+        body = gzip.compress(data, GZIP_LEVEL, mtime=0)
+        if key:
+            with GZIP_LOCK:
+                GZIP_CACHE[key] = body
+                while len(GZIP_CACHE) > GZIP_CACHE_MAX:
+                    GZIP_CACHE.popitem(last=False)
+    resp.set_data(body)
+    resp.headers['Content-Encoding'] = 'gzip'
+    return resp
+
+@app.route('/hangar')
+def hangar_page():
+    """Separate Hangar / Local Cargo Page (Served on same port)"""
+    # Served from memory; the state file is only re-read if it was edited outside the app
+    sync_state_file()
+    if request.if_none_match.contains(state_etag()):
+        return not_modified(state_etag())
+    version, state = STATE.versioned_snapshot()
+    
+    # --- RENDER HANGAR ITEMS ---
+    hangar_html = ""
+    if "hangar" in state and state["hangar"]:
+        hangar_html += "<table style='width:100%; border-collapse:collapse; font-size:0.9rem; color:#ccc;'>"
+        hangar_html += f"<tr style='background:#222; text-align:left;'><th style='padding:5px;'>{T('location')}</th><th style='padding:5px;'>{T('material')}</th><th style='padding:5px;'>{T('quantity')}</th><th style='padding:5px;'>{T('actions', 'ui', 'Actions')}</th></tr>"
+        for i, item in enumerate(state["hangar"]):
+            hangar_html += f"<tr style='border-bottom:1px solid #333;'>"
+            hangar_html += f"<td style='padding:5px;'>{item['loc']}</td>"
+            hangar_html += f"<td style='padding:5px;'>{item['mat']}</td>"
+            hangar_html += f"<td style='padding:5px;'>{item['qty']} SCU</td>"
+            hangar_html += f"<td style='padding:5px; text-align:right; display:flex; gap:5px; justify-content:flex-end;'>"
+            hangar_html += f"<button onclick=\"editHangarItem('{i}', '{item['loc']}', '{item['mat']}', '{item['qty']}')\" style='background:#ffcc00; color:#000; border:none; padding:2px 5px; cursor:pointer; font-size:0.8rem; border-radius:3px;' title='{T('edit_manage', 'ui', 'Edit / Sell')}'>✏️</button>"
+            hangar_html += f"<button onclick=\"openTransport('{i}', '{item['loc']}', '{item['mat']}', '{item['qty']}')\" style='background:#00f2ff; color:#000; border:none; padding:2px 5px; cursor:pointer; font-size:0.8rem; border-radius:3px;'>🚚 {T('transport', 'ui', 'Route')}</button>"
+            hangar_html += f"<a href='/delete_hangar_item/{i}' style='color:#ff5555; text-decoration:none; padding:2px 5px; border:1px solid #ff5555; border-radius:3px; font-size:0.8rem;'>🗑️</a>"
+            hangar_html += f"</td>"
+            hangar_html += "</tr>"
+        hangar_html += "</table>"
+    else:
+        hangar_html += f"<div style='color:#666; font-style:italic; padding:10px 0;'>{T('no_hangar_items', 'ui', 'No items in hangar.')}</div>"
+
+    # --- RENDER ACTIVE TRANSPORTS (PRIVATE ROUTES) ---
+    transports_html = ""
+    if "private_manifests" in state and state["private_manifests"]:
+        transports_html += "<div style='margin-top:20px;'><b>🚛 {0}</b><hr style='border-color:#21262d; margin:5px 0;'>".format(T('active_routes', 'ui', 'Active Routes'))
+        for i, m in enumerate(state["private_manifests"]):
+            transports_html += f"<div style='background:#1a1a1a; padding:10px; border-radius:5px; border:1px solid #333; margin-bottom:10px;'>"
+            transports_html += f"<div style='display:flex; justify-content:space-between; margin-bottom:5px;'>"
+            transports_html += f"<span style='color:#00f2ff; font-weight:bold;'>{m['origin']} ➔ {m['destination']}</span>"
+            transports_html += f"<span style='color:#aaa;'>{m['qty']} SCU {m['mat']}</span>"
+            transports_html += f"</div>"
+            
+            # Action: Complete (Sell)
+            transports_html += f"<form action='/complete_manifest' method='post' style='display:flex; gap:5px; align-items:center; margin-top:5px;'>"
+            transports_html += f"<input type='hidden' name='index' value='{i}'>"
+            transports_html += f"<input type='number' name='profit' placeholder='{T('profit', 'ui', 'Profit (aUEC)')}' style='background:#222; border:1px solid #444; color:#fff; padding:3px; width:100px;' required>"
+            transports_html += f"<button type='submit' style='background:#00ff88; color:#000; border:none; padding:3px 10px; cursor:pointer; font-weight:bold; border-radius:3px;'>💰 {T('sell_finish', 'ui', 'Sell/Finish')}</button>"
+            transports_html += f"<a href='/delete_manifest/{i}' style='color:#ff5555; text-decoration:none; margin-left:10px; font-size:0.9rem;'>🗑️ {T('cancel', 'ui', 'Cancel')}</a>"
+            transports_html += f"</form>"
+            transports_html += f"</div>"
+        transports_html += "</div>"
+
+    # --- MAIN HTML ---
+    html = f"""
+    <!DOCTYPE html>
+    <html lang="{LANGUAGE}">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Hangar & Local Cargo</title>
+        <link rel="stylesheet" href="{asset_url('hangar.css')}">
+        <script src="{asset_url('hangar.js')}"></script>
     </head>
     <body>
         <div class="nav-header">
@@ -2194,9 +4388,13 @@ def hangar_page():
     </body>
     </html>
     """
-    return html
+    resp = make_response(html)
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.set_etag(state_etag(version))
+    return resp
 
 @app.route('/update_container_size', methods=['POST'])
+@state_writer
 def update_container_size():
     m_id = request.form.get('mission_id')
     size = request.form.get('max_size')
@@ -2217,12 +4415,14 @@ def update_container_size():
             for key, item in mission["items"].items():
                 if item.get("mat") == mat and item.get("dest") == dest:
                     item["max_container_size"] = new_size
+                    mark_mission(mid)
                     updated = True
                     print(f"🔧 {T('config_update', 'log', 'Config Update')}: {mat} -> {dest} [Max Size: {new_size}]")
 
     # 2. Fallback: Mission Level (Legacy/Catch-all)
     if not updated and m_id and m_id in data_store["missions"]:
         data_store["missions"][m_id]["max_container_size"] = new_size
+        mark_mission(m_id)
         updated = True
         print(f"🔧 {T('config_update', 'log', 'Config Update')}: Mission {m_id} [Max Size: {new_size}]")
         
@@ -2232,6 +4432,7 @@ def update_container_size():
     return '<meta http-equiv="refresh" content="0;url=/">'
 
 @app.route('/delete_item', methods=['POST'])
+@state_writer
 def delete_item():
     m_id = request.form.get('mission_id')
     i_key = request.form.get('item_key')
@@ -2241,11 +4442,12 @@ def delete_item():
             # BLACKLIST ITEM (Prevent Resurrection)
             item = data_store["missions"][m_id]["items"][i_key]
             sig = get_item_signature(item)
-            if "ignored_signatures" not in data_store: data_store["ignored_signatures"] = []
+            if "ignored_signatures" not in data_store: data_store["ignored_signatures"] = DedupeRegistry()
             if sig not in data_store["ignored_signatures"]:
                 data_store["ignored_signatures"].append(sig)
 
             del data_store["missions"][m_id]["items"][i_key]
+            mark_mission(m_id)
             print(f"🗑️ {T('manual_delete', 'log')}: Item {i_key} ({m_id})")
             
             # Clean up mission if empty
@@ -2257,11 +4459,23 @@ def delete_item():
             
     return '<meta http-equiv="refresh" content="0;url=/">'
 
-@app.route('/')
-def index():
-    # AGGREGATION LOGIC
+# --- DASHBOARD MODEL ---
+# Pages and /api/state carry an ETag made of the state version and the current minute (the
+# header shows the session clock). A poll that sends it back in If-None-Match gets a 304
+# before anything is copied or rendered.
+def state_etag(version=None):
+    return f"v{STATE.version if version is None else version}-{int(time.time() // 60)}"
+
+def not_modified(etag):
+    resp = make_response("", 304)
+    resp.set_etag(etag)
+    return resp
+
+MODEL_CACHE = (None, None)  # (etag, JSON body) of the last /api/state response
+
+def build_summary(missions):
+    """AGGREGATION LOGIC: missions -> {destination: {material: group}} as shown on the dashboard"""
     # Skip duplicate UI missions when a Native mission with same title exists
-    missions = data_store.get("missions", {})
     skip_missions = set()
     title_map = {}
     for mid, m_data in missions.items():
@@ -2337,192 +4551,663 @@ def index():
             else:
                 summary[d][m]["deliver_vol"] += v
                 summary[d][m]["delivered_delivery"] += delivered
-            
-            # Status check:
-            # 1. If it has deliveries (Destination), status depends on DELIVERY completion.
-            # 2. If it has NO deliveries (Origin), status depends on PICKUP completion.
-            
-            if summary[d][m]["deliver_vol"] > 0:
-                 if summary[d][m]["all_items_completed"]:
-                     summary[d][m]["status"] = "COMPLETED"
-                 elif summary[d][m]["delivered_delivery"] >= summary[d][m]["deliver_vol"]:
-                     summary[d][m]["status"] = "COMPLETED"
-            else:
-                 # Pickup Only Group (Origin)
-                 if summary[d][m]["all_pickups_completed"]:
-                      summary[d][m]["status"] = "COMPLETED"
-                 elif summary[d][m]["pickup_vol"] > 0 and summary[d][m]["delivered_pickup"] >= summary[d][m]["pickup_vol"]:
-                      summary[d][m]["status"] = "COMPLETED"
 
-    mission_icons = {
-        "READY": "⚪", "ACTIVE": "🟡", "COMPLETED": "✅", "CANCELLED": "🔴"
+    # Status of each group, once all of its items are in (a group is not done while any of them is pending)
+    for mats in summary.values():
+        for group in mats.values():
+            group["status"] = group_status(group)
+
+    return summary
+
+def group_status(group):
+    """Status check:
+    1. If it has deliveries (Destination), status depends on DELIVERY completion.
+    2. If it has NO deliveries (Origin), status depends on PICKUP completion."""
+    if group["deliver_vol"] > 0:
+        done = group["all_items_completed"] or group["delivered_delivery"] >= group["deliver_vol"]
+    else:
+        # Pickup Only Group (Origin)
+        done = group["all_pickups_completed"] or (group["pickup_vol"] > 0 and group["delivered_pickup"] >= group["pickup_vol"])
+    return "COMPLETED" if done else "PENDING"
+
+# --- SUMMARY INDEX ---
+# build_summary walks every mission and item. SUMMARY keeps the same groups up to date
+# instead: code that changes a mission (log appliers, manual routes) calls mark_mission(mid)
+# under the state lock, and the next snapshot (STATE.versioned_snapshot) only looks at the
+# marked missions again. A changed item is taken out of its group's totals and added back
+# with its new values, so a delivery costs the same with 3 or 30 contracts. Every item keeps
+# its place (mission order, then item order), so groups, items and max_size come out in the
+# same order as from build_summary.
+# Pages render the published groups outside the lock, so a group is never modified once
+# published: the groups a change touched get a new copy, the others are shared with the
+# previous snapshot. Replacing data_store["missions"] (state load, reload of the state file)
+# is noticed by identity and rebuilds the index, as do more than SUMMARY_DIRTY_MAX marks
+# between two snapshots (bulk imports).
+SUMMARY_DIRTY_MAX = 500
+
+class SummaryIndex:
+    def __init__(self):
+        self.live = None        # The data_store["missions"] dict being followed
+        self.dirty = set()      # Missions marked since the last refresh
+        self.full = True        # Next refresh rebuilds everything
+        self.meta = {}          # mid -> (title, source) as indexed
+        self.order = {}         # mid -> (position in data_store["missions"], the mission dict)
+        self.next_position = 0
+        self.titles = {}        # title -> {"native": set of mids, "ui": set of mids}
+        self.keys = {}          # mid -> {item key: (dest, mat)} of the indexed items
+        self.groups = {}        # (dest, mat) -> totals, members, published view and place of its first item
+        self.current = (None, {})  # (missions snapshot, summary) published by the last refresh
+        self.refreshes = 0
+        self.rebuilds = 0
+        self.reindexed = 0      # Missions looked at again
+
+    def mark(self, mid):
+        """A mission was added, changed or removed (call under the state lock)"""
+        if self.full:
+            return
+        self.dirty.add(mid)
+        if len(self.dirty) > SUMMARY_DIRTY_MAX:
+            self.reset()
+
+    def reset(self):
+        self.full = True
+        self.dirty = set()
+
+    def summary(self, missions):
+        """build_summary(missions), from the index when missions is the snapshot it follows"""
+        source, summary = self.current
+        if missions is source:
+            return summary
+        return build_summary(missions)
+
+    def refresh(self, live, missions):
+        """Bring the index up to date with `missions`, the snapshot copy of `live` (data_store
+        ["missions"]) just taken under the state lock, and publish its summary"""
+        self.refreshes += 1
+        try:
+            self.update(live, missions)
+        except Exception:
+            # Malformed mission (hand-edited state file): the dashboard falls back to build_summary
+            self.reset()
+            self.current = (None, {})
+
+    def update(self, live, missions):
+        if self.full or live is not self.live:
+            self.live = live
+            self.meta, self.titles, self.keys, self.groups, self.order = {}, {}, {}, {}, {}
+            dirty = set(missions)
+            self.rebuilds += 1
+        else:
+            dirty = self.dirty
+        self.dirty = set()
+        self.full = False
+        if not dirty:
+            self.current = (missions, self.current[1])
+            return
+        self.place(live, dirty)
+
+        # Duplicate rule: a UI mission is hidden while a Native mission has the same title, so
+        # the UI missions of every title a change touched are looked at again too
+        affected = set(dirty)
+        for mid in dirty:
+            old = self.meta.pop(mid, None)
+            if old is not None:
+                affected |= self.title_entry(old[0], mid, None)
+            mission = missions.get(mid)
+            if mission is not None:
+                title, source = mission.get("title"), mission.get("source", "")
+                self.meta[mid] = (title, source)
+                affected |= self.title_entry(title, mid, source)
+
+        changed = set()
+        for mid in affected:
+            mission = missions.get(mid)
+            self.index_mission(mid, None if mission is None or self.hidden(mid) else mission, changed)
+        self.reindexed += len(affected)
+
+        for gkey in changed:
+            group = self.groups.get(gkey)
+            if group is not None:
+                group["view"], group["first"] = self.view(group)
+        # Destinations, then materials, in the order of their first item
+        summary = {}
+        for (d, m), group in sorted(self.groups.items(), key=lambda kv: kv[1]["first"]):
+            summary.setdefault(d, {})[m] = group["view"]
+        self.current = (missions, summary)
+
+    def place(self, live, dirty):
+        """Positions of the marked missions. New ones (and ones deleted and added again) were
+        appended to data_store["missions"] after everything indexed, so they are found
+        walking it from the end."""
+        new = set()
+        for mid in dirty:
+            mission = live.get(mid)
+            if mission is None:
+                self.order.pop(mid, None)
+            elif mid not in self.order or self.order[mid][1] is not mission:
+                new.add(mid)
+        tail = []
+        for mid in reversed(live):
+            if not new:
+                break
+            if mid in new:
+                new.discard(mid)
+                tail.append(mid)
+        for mid in reversed(tail):
+            self.order[mid] = (self.next_position, live[mid])
+            self.next_position += 1
+
+    def title_entry(self, title, mid, source):
+        """File mid under its title by source (None = remove it); returns the UI missions of that title"""
+        if not title:
+            return set()
+        entry = self.titles.setdefault(title, {"native": set(), "ui": set()})
+        for kind in ("native", "ui"):
+            entry[kind].discard(mid)
+        if source is not None:
+            if "Native" in source:
+                entry["native"].add(mid)
+            if "UI" in source:
+                entry["ui"].add(mid)
+        ui = set(entry["ui"])
+        if not entry["native"] and not entry["ui"]:
+            del self.titles[title]
+        return ui
+
+    def hidden(self, mid):
+        title, source = self.meta[mid]
+        return bool(title) and "UI" in source and bool(self.titles[title]["native"])
+
+    def index_mission(self, mid, mission, changed):
+        """Replace the items of mid in the groups by those of `mission` (None = none)"""
+        old = self.keys.pop(mid, {})
+        new = {}
+        if mission is not None:
+            mission_max_size = mission.get("max_container_size", 32)
+            source = mission.get("source", "Unknown")
+            position = self.order[mid][0]
+            for i, (key, item) in enumerate(mission["items"].items()):
+                gkey = (item["dest"], item["mat"])
+                part = (item.get("type", "DELIVERY") == "PICKUP", item["vol"], item.get("delivered", 0),
+                        item["status"] == "COMPLETED", item.get("max_container_size", mission_max_size))
+                entry = {"mid": mid, "key": key, "data": item, "source": source}
+                new[key] = gkey
+                old_gkey = old.pop(key, None)
+                if old_gkey is not None and old_gkey != gkey:
+                    self.drop(old_gkey, (mid, key), changed)
+                self.put(gkey, (mid, key), (entry, part, (position, i)), changed)
+        for key, gkey in old.items():
+            self.drop(gkey, (mid, key), changed)
+        if new:
+            self.keys[mid] = new
+
+    def put(self, gkey, ikey, member, changed):
+        """member = (entry in items_list, part counted in the totals, place)"""
+        group = self.groups.get(gkey)
+        if group is None:
+            group = self.groups[gkey] = {
+                "pickup_vol": 0, "deliver_vol": 0, "delivered_pickup": 0, "delivered_delivery": 0,
+                "open_pickups": 0, "open_deliveries": 0, "members": {}, "missions": {}, "view": None, "first": None,
+            }
+        previous = group["members"].get(ikey)
+        if previous is not None:
+            if previous[1:] == member[1:] and previous[0] == member[0]:
+                return  # Same item as before: the published group stays as it is
+            self.count(group, previous[1], -1)
+        else:
+            group["missions"][ikey[0]] = group["missions"].get(ikey[0], 0) + 1
+        group["members"][ikey] = member
+        self.count(group, member[1], 1)
+        changed.add(gkey)
+
+    def drop(self, gkey, ikey, changed):
+        group = self.groups[gkey]
+        _, part, _ = group["members"].pop(ikey)
+        self.count(group, part, -1)
+        mid = ikey[0]
+        group["missions"][mid] -= 1
+        if not group["missions"][mid]:
+            del group["missions"][mid]
+        if not group["members"]:
+            del self.groups[gkey]
+        changed.add(gkey)
+
+    @staticmethod
+    def count(group, part, sign):
+        pickup, vol, delivered, done, _ = part
+        if pickup:
+            group["pickup_vol"] += sign * vol
+            group["delivered_pickup"] += sign * delivered
+            group["open_pickups"] += sign * (not done)
+        else:
+            group["deliver_vol"] += sign * vol
+            group["delivered_delivery"] += sign * delivered
+            group["open_deliveries"] += sign * (not done)
+
+    @staticmethod
+    def view(group):
+        """The group as build_summary has it, and the place of its first item"""
+        members = sorted(group["members"].values(), key=lambda member: member[2])
+        view = {
+            "pickup_vol": group["pickup_vol"],
+            "deliver_vol": group["deliver_vol"],
+            "status": "PENDING",
+            "delivered_pickup": group["delivered_pickup"],
+            "delivered_delivery": group["delivered_delivery"],
+            "mission_ids": set(group["missions"]),
+            "items_list": [entry for entry, _, _ in members],
+            "all_items_completed": not group["open_deliveries"],
+            "all_pickups_completed": not group["open_pickups"],
+            "max_size": members[0][1][4],  # Preference of the group's first item
+        }
+        view["status"] = group_status(view)
+        return view, members[0][2]
+
+SUMMARY = SummaryIndex()
+
+def format_duration(seconds):
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    return f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+
+def dashboard_model(state):
+    """JSON-ready dashboard: header info, summary by destination/material and the history page"""
+    summary = {
+        d: {m: dict(group, mission_ids=sorted(group["mission_ids"])) for m, group in groups.items()}
+        for d, groups in SUMMARY.summary(state.get("missions", {})).items()
+    }
+    total_earnings, total_mission_seconds = HISTORY.totals()
+    return {
+        "header": {
+            "player_name": state.get("player_name"),
+            "ship_name": state.get("ship_name"),
+            "current_location": state.get("current_location"),
+            "next_destination": state.get("next_destination"),
+            "mission_status": state.get("mission_status"),
+            "session_start": state.get("session_start"),
+            "session_time": format_duration((datetime.now() - state["session_start"]).total_seconds()),
+            "earnings": total_earnings,
+            "mission_time": format_duration(total_mission_seconds),
+        },
+        "summary": summary,
+        "missions": [
+            {"id": mid, "title": m.get("title"), "status": m.get("status"), "source": m.get("source"),
+             "started": m.get("started"), "items": len(m.get("items", {}))}
+            for mid, m in state.get("missions", {}).items()
+        ],
+        "history": HISTORY.recent(10),
     }
-    
-    # Calculate Totals (Earnings & Mission Time)
-    total_earnings = 0
-    total_mission_seconds = 0
-    
-    # Use persistent history for totals
-    history_source = data_store.get("finished_fixed", [])
-    
-    for f in history_source:
-        # Only count actual completed missions (not cancelled/failed)
-        # Default to COMPLETED for backward compatibility
-        if f.get("status", "COMPLETED") == "COMPLETED":
-            total_earnings += f.get("value", 0)
-            
-            start_str = f.get("started", "?")
-            end_str = f.get("time", "?")
-            
-            if start_str != "?" and end_str != "?":
-                try:
-                    t_start = datetime.strptime(start_str, "%H:%M:%S")
-                    t_end = datetime.strptime(end_str, "%H:%M:%S")
-                    
-                    # Handle crossing midnight
-                    if t_end < t_start:
-                        t_end += timedelta(days=1)
-                        
-                    total_mission_seconds += (t_end - t_start).total_seconds()
-                except ValueError:
-                    pass
 
-    earnings_str = f"{total_earnings:,} aUEC"
-    
-    m_hours = int(total_mission_seconds // 3600)
-    m_minutes = int((total_mission_seconds % 3600) // 60)
-    mission_time_str = f"{m_hours}h {m_minutes}m" if m_hours > 0 else f"{m_minutes}m"
-    
-    mission_icon = mission_icons.get(data_store["mission_status"], "⚪")
-    
-    duration = datetime.now() - data_store["session_start"]
-    hours = int(duration.total_seconds() // 3600)
-    minutes = int((duration.total_seconds() % 3600) // 60)
-    session_time = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
-    
-    html = (
-        "<!DOCTYPE html><html><head><meta charset='UTF-8'>"
-        f"<title>SC Hauling Monitor - {T('source_log', 'ui', 'LOG')} Mode</title>"
-        "<style>"
-        "body{background:#0b0e14;color:#a1c4d4;font-family:sans-serif;padding:20px;margin:0;}"
-        ".header{border-bottom:2px solid #00f2ff44; padding-bottom:15px; margin-bottom:20px; display:flex; justify-content:space-between; align-items:flex-start;}"
-        ".header-left{flex:1;}"
-        ".header-right{margin-left:20px;}"
-        ".status-row{display:flex; gap:15px; margin-top:10px; flex-wrap:wrap;}"
-        ".status-badge{background:#161b22; border:1px solid #30363d; padding:8px 15px; border-radius:5px; font-size:0.9rem;}"
-        ".loc-box{color:#00f2ff; font-size:1.3rem; font-weight:bold;}"
-        ".mission-status{border-left:3px solid #ffcc00; padding-left:10px;}"
-        ".card-loc{background:#161b22; border:1px solid #30363d; padding:15px; border-radius:5px; margin-bottom:15px; border-left: 5px solid #00f2ff;}"
-        ".scu-box{padding:3px 10px; border-radius:4px; font-weight:bold; font-family:monospace; font-size:0.9rem; margin-left: 5px;}"
-        ".pickup-tag{background:#ff00ff22; color:#ff00ff; border:1px solid #ff00ff44;}"
-        ".deliver-tag{background:#00f2ff22; color:#00f2ff; border:1px solid #00f2ff44;}"
-        ".COMPLETED{background:#00ff8822; color:#00ff88; border: 1px solid #00ff88; text-decoration: line-through; opacity: 0.6;}"
-        ".footer{background:#0d1117; border:1px solid #21262d; padding:15px; margin-top:30px; border-radius:5px; font-family:monospace; font-size:0.8rem;}"
-        ".info-grid{display:flex; justify-content:space-between; align-items:center; margin-top:10px; flex-wrap:wrap; gap:10px;}"
-        ".history-item{border-bottom:1px solid #21262d; padding:8px 0; display:flex; justify-content:space-between;}"
-        ".empty-state{text-align:center; padding:40px; color:#666; font-style:italic;}"
-        ".pause-btn{background:#333; color:#fff; border:1px solid #555; padding:8px 15px; cursor:pointer; border-radius:5px; font-weight:bold; font-size:0.9rem;}"
-        ".pause-btn.paused{background:#ffcc00; color:#000; border:1px solid #ffcc00; animation: pulse 2s infinite;}"
-        ".reset-btn{background:#d93025; color:#fff; border:1px solid #a61c14; padding:5px 10px; cursor:pointer; border-radius:3px; font-size:0.8rem; margin-left:10px;}"
-        "@keyframes pulse { 0% { opacity: 1; } 50% { opacity: 0.8; } 100% { opacity: 1; } }"
-        "</style></head><body>"
-        "<div class='header'>"
-        "<div class='header-left'>"
-        
-        # --- NAV HEADER ---
-        f"<div class='nav-header' style='display:flex; gap:10px; margin-bottom:10px;'>"
-        f"    <a href='/' style='color:#fff; text-decoration:none; background:#238636; padding:5px 10px; border-radius:4px; font-weight:bold;'>📊 {T('dashboard', 'ui', 'Dashboard')}</a>"
-        f"    <a href='/hangar' style='color:#58a6ff; text-decoration:none; padding:5px 10px;'>🏭 {T('hangar_local', 'ui', 'Hangar / Local Cargo')}</a>"
-        f"</div>"
+@app.route('/api/state')
+def api_state():
+    """Dashboard model as JSON (see dashboard_model), with ETag / If-None-Match support"""
+    global MODEL_CACHE
+    if request.if_none_match.contains(state_etag()):
+        return not_modified(state_etag())
+    version, state = STATE.versioned_snapshot()
+    etag = state_etag(version)
+    cached_etag, body = MODEL_CACHE
+    if cached_etag != etag:
+        body = json.dumps(dashboard_model(state), default=json_serial)
+        MODEL_CACHE = (etag, body)
+    resp = make_response(body)
+    resp.mimetype = "application/json"
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
 
-        f"<div class='loc-box'>📍 {T('current_location')}: {data_store['current_location']}</div>"
-        "<div class='status-row'>"
-        f"<div class='status-badge mission-status'>{mission_icon} {T('mission')}: {T(data_store['mission_status'].lower(), 'ui', data_store['mission_status'])}</div>"
-        "</div></div>"
-        "<div class='header-right'>"
-        f"<button id='pauseBtn' class='pause-btn' onclick='togglePauseManual()'>⏸ {T('pause')}</button>"
-        "</div>"
-        "</div>"
-        "<div class='info-grid'>"
-        f"<span>🚀 <b>{data_store['ship_name']}</b> | 👤 <b>{data_store['player_name']}</b></span>"
-        f"<span>💰 <b>{earnings_str}</b></span>"
-        f"<span>🏁 <b>{mission_time_str}</b></span>"
-        f"<span>⏱ {session_time}</span>"
-        "</div>"
-    )
+# --- CHANGE LOG (/api/changes) ---
+# Clients that keep their own copy of the state (tablets, phones on weak Wi-Fi) ask for
+# /api/changes?since=<version>&epoch=<epoch> and get only the entries changed since then:
+#   {"epoch": "...", "version": 42, "full": false, "changes": [
+#       {"type": "item", "id": ["<mid>", "<key>"], "value": {...}},
+#       {"type": "mission", "id": "<mid>", "deleted": true}, ...]}
+# Types: header (id = field), mission (without its items), item, hangar / manifest (id = row
+# index) and history (id = mission id). CHANGES keeps the latest change of each entry, oldest
+# first, up to CHANGE_LOG_MAX entries, so an answer walks back from the newest change and
+# stops at `since`. A client without `since`, from another epoch (the app restarted) or older
+# than the oldest dropped change gets "full": true: every current entry plus the newest
+# CHANGE_HISTORY_FULL history entries.
+CHANGE_LOG_MAX = 2000
+CHANGE_DIRTY_MAX = 500  # More marked missions than this between two scans: serialize them all
+CHANGE_HISTORY_FULL = 50
+CHANGE_HEADER_KEYS = ("player_name", "ship_name", "current_location", "next_destination",
+                      "mission_status", "session_start", "fuel_estimate")
+
+def change_record(kind, eid, value=None):
+    """One element of "changes" as JSON text; value is JSON text too (None = tombstone)"""
+    head = '{"type": %s, "id": %s' % (json.dumps(kind), json.dumps(list(eid) if isinstance(eid, tuple) else eid))
+    if value is None:
+        return head + ', "deleted": true}'
+    return head + ', "value": ' + value + '}'
+
+class ChangeLog:
+    """Bounded log of per-entry changes, filled once per state version. Missions are only
+    serialized again when marked (mark_mission); the header, hangar and manifest rows are
+    few and are diffed in full. History is not diffed (it can be long): HISTORY reports
+    the ids it changed."""
 
-    if summary:
-        html += "<div id='mission-list'>"
-        for d, mats in summary.items():
-            html += f"<div class='card-loc'><b>📦 {T('destination')}: {d}</b>"
-            for m, data in mats.items():
-                p_vol = data["pickup_vol"]
-                d_vol = data["deliver_vol"]
-                status = data["status"]
-                
-                # Build badges
-                badges = ""
-                
-                # Check completion first to apply style
-                is_completed = (status == "COMPLETED")
-                tag_class_extra = " COMPLETED" if is_completed else ""
-                
-                # Material Name Style (Strikethrough if fully done)
-                mat_style = "text-decoration: line-through; opacity: 0.5; color: #888;" if is_completed else ""
-                
-                if p_vol > 0:
-                    p_current = data["delivered_pickup"]
-                    p_done = (p_current >= p_vol) or is_completed
-                    
-                    prefix = "✅ " if p_done else "⬇️ "
-                    vol_display = f"{p_vol} SCU"
-                    if p_current >= 0 and p_current < p_vol and not p_done:
-                         vol_display = f"{p_current}/{p_vol} SCU"
-                    if p_done:
-                         vol_display = f"{p_vol} SCU"
-                         
-                    # Badge style based on partial completion
-                    p_style_class = tag_class_extra
-                    if p_done and not is_completed:
-                         p_style_class = " COMPLETED" # Re-use completed style for green border/text
-                    
-                    # Manual Update Form for Pickup
-                    pickup_items_list = [x for x in data["items_list"] if x["data"].get("type") == "PICKUP"]
-                    
-                    if pickup_items_list:
-                         # Create unique ID for this group modal
-                         group_id = f"pick_{hashlib.md5((d + m).encode()).hexdigest()[:8]}"
-                         
-                         badges += f"""
+    def __init__(self):
+        self.epoch = str(int(time.time() * 1000))  # Versions restart with the app
+        self.version = None       # STATE.version of the last scan
+        self.base = {}            # (type, id) -> value JSON at the last scan
+        self.fixed = set()        # Keys of base that are not missions or items
+        self.mission_keys = {}    # mid -> keys of base for the mission and its items
+        self.live = None          # The data_store["missions"] dict being followed
+        self.dirty = set()        # Missions marked since the last scan
+        self.stale = True         # Next scan serializes every mission
+        self.log = OrderedDict()  # (type, id) -> (version, record JSON), oldest change first
+        self.floor = 0            # Clients older than this need a full snapshot
+        self.history_resets = None
+        self.scans = 0
+
+    def mark(self, mid):
+        """A mission was added, changed or removed (call under the state lock)"""
+        if self.stale:
+            return
+        self.dirty.add(mid)
+        if len(self.dirty) > CHANGE_DIRTY_MAX:
+            self.stale = True
+            self.dirty = set()
+
+    def fixed_entities(self, state):
+        """(type, id) -> value JSON of the header, hangar and manifest entries"""
+        dumps = functools.partial(json.dumps, default=json_serial)
+        current = {("header", key): dumps(state.get(key)) for key in CHANGE_HEADER_KEYS}
+        earnings, seconds = HISTORY.totals()
+        current[("header", "earnings")] = dumps(earnings)
+        current[("header", "mission_seconds")] = dumps(seconds)
+        for kind, key in (("hangar", "hangar"), ("manifest", "private_manifests")):
+            for i, row in enumerate(state.get(key) or []):
+                current[(kind, i)] = dumps(row)
+        return current
+
+    def mission_entities(self, mid, mission):
+        """(type, id) -> value JSON of a mission (without its items) and of its items"""
+        dumps = functools.partial(json.dumps, default=json_serial)
+        current = {("mission", mid): dumps({k: v for k, v in mission.items() if k != "items"})}
+        for key, item in (mission.get("items") or {}).items():
+            current[("item", (mid, key))] = dumps(item)
+        return current
+
+    def scan(self):
+        """Bring the log up to date with data_store and HISTORY. Called under STATE_LOCK;
+        returns the version the log is now at."""
+        resets, touched = HISTORY.drain()
+        if touched and STATE.version == self.version:
+            STATE.touch()  # A history change nobody versioned: give it a version of its own
+        version = STATE.version
+        if version == self.version and resets == self.history_resets:
+            return version
+        missions = data_store.get("missions", {})
+        if self.version is None or resets != self.history_resets:
+            # First scan, or the history was replaced: nothing to diff against
+            self.rebase(missions)
+            self.log.clear()
+            self.floor = version
+        elif self.stale or missions is not self.live:
+            # Missions replaced (state load, reload of the state file) or too many marks
+            old = self.base
+            self.rebase(missions)
+            for key, value in self.base.items():
+                if old.get(key) != value:
+                    self.record(key, version, change_record(key[0], key[1], value))
+            for key in old.keys() - self.base.keys():
+                self.record(key, version, change_record(key[0], key[1]))
+        else:
+            current = self.fixed_entities(data_store)
+            self.fixed = self.diff(self.fixed, current, version)
+            for mid in self.dirty:
+                mission = missions.get(mid)
+                current = self.mission_entities(mid, mission) if mission is not None else {}
+                keys = self.diff(self.mission_keys.pop(mid, set()), current, version)
+                if keys:
+                    self.mission_keys[mid] = keys
+            with HISTORY.lock:
+                for mid in touched:
+                    entry = HISTORY.get(mid)
+                    value = json.dumps(entry, default=json_serial) if entry is not None else None
+                    self.record(("history", mid), version, change_record("history", mid, value))
+        self.dirty = set()
+        self.version = version
+        self.history_resets = resets
+        self.scans += 1
+        return version
+
+    def rebase(self, missions):
+        """Serialize everything again (no records)"""
+        self.base = self.fixed_entities(data_store)
+        self.fixed = set(self.base)
+        self.mission_keys = {}
+        for mid, mission in missions.items():
+            current = self.mission_entities(mid, mission)
+            self.base.update(current)
+            self.mission_keys[mid] = set(current)
+        self.live = missions
+        self.stale = False
+
+    def diff(self, keys, current, version):
+        """Record the entries of `current` that differ from base and the `keys` no longer in
+        it; returns the keys of `current`"""
+        for key, value in current.items():
+            if self.base.get(key) != value:
+                self.base[key] = value
+                self.record(key, version, change_record(key[0], key[1], value))
+        for key in keys - current.keys():
+            del self.base[key]
+            self.record(key, version, change_record(key[0], key[1]))
+        return set(current)
+
+    def record(self, key, version, text):
+        self.log.pop(key, None)
+        self.log[key] = (version, text)
+        while len(self.log) > CHANGE_LOG_MAX:
+            _, (dropped, _) = self.log.popitem(last=False)
+            self.floor = max(self.floor, dropped)
+
+    def since(self, version):
+        """Records changed after `version`, oldest first"""
+        out = []
+        for changed, text in reversed(self.log.values()):
+            if changed <= version:
+                break
+            out.append(text)
+        out.reverse()
+        return out
+
+    def full(self):
+        """Records of every current entry (history: the newest CHANGE_HISTORY_FULL, oldest first)"""
+        out = [change_record(key[0], key[1], value) for key, value in self.base.items()]
+        for entry in reversed(HISTORY.recent(CHANGE_HISTORY_FULL)):
+            out.append(change_record("history", entry.get("id"), json.dumps(entry, default=json_serial)))
+        return out
+
+CHANGES = ChangeLog()
+
+@app.route('/api/changes')
+def api_changes():
+    """Entries changed since ?since=<version> (see ChangeLog), or a full snapshot"""
+    try:
+        since = int(request.args.get("since", ""))
+    except ValueError:
+        since = None
+    with STATE.lock:
+        version = CHANGES.scan()
+        full = (since is None or request.args.get("epoch") != CHANGES.epoch
+                or since < CHANGES.floor or since > version)
+        changes = CHANGES.full() if full else CHANGES.since(since)
+    body = '{"epoch": %s, "version": %d, "full": %s, "changes": [%s]}' % (
+        json.dumps(CHANGES.epoch), version, "true" if full else "false", ", ".join(changes))
+    resp = make_response(body)
+    resp.mimetype = "application/json"
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+# --- PUSH UPDATES (/events) ---
+# Server-Sent Events: one "state" event per change (bursts within SSE_COALESCE_S are sent as
+# one), carrying the version as the event id and the page ETag. A "ping" event every
+# SSE_PING_S keeps proxies from closing the stream and lets the page know it is alive.
+# A browser that reconnects sends Last-Event-ID and gets an event right away if it missed one.
+SSE_PING_S = 10
+SSE_COALESCE_S = 0.25
+SSE_RETRY_MS = 3000
+SSE_STREAM_LIMIT = None  # Streams served at once (set by the pooled web server: each one holds a worker)
+SSE_STREAMS = 0
+SSE_LOCK = threading.Lock()
+
+def sse_message(event, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/events')
+def events():
+    try:
+        seen = int(request.headers.get("Last-Event-ID") or request.args.get("since", ""))
+    except ValueError:
+        seen = None  # New client: tell it the current version straight away
+    # No worker to spare: the page polls instead (and the browser retries the stream later)
+    if SSE_STREAM_LIMIT is not None and SSE_STREAMS >= SSE_STREAM_LIMIT:
+        resp = make_response("Too many event streams", 503)
+        resp.headers['Retry-After'] = '30'
+        return resp
+
+    def stream():
+        global SSE_STREAMS
+        with SSE_LOCK:
+            SSE_STREAMS += 1
+        try:
+            version = seen
+            etag = state_etag(seen) if seen is not None else None
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while not WEB_STOPPING.is_set():
+                # Wake on a change, for the ping, or when the minute (part of the ETag) rolls over
+                timeout = min(SSE_PING_S, 60 - time.time() % 60 + 0.05)
+                current = STATE.wait(version, timeout, stop=WEB_STOPPING)
+                if WEB_STOPPING.is_set():
+                    break  # Server shutting down: end the stream, the browser reconnects later
+                if current != version:
+                    time.sleep(SSE_COALESCE_S)  # Let the rest of the burst land
+                    current = STATE.version
+                if current != version or state_etag(current) != etag:
+                    version, etag = current, state_etag(current)
+                    yield sse_message("state", {"version": version, "etag": f'"{etag}"'}, version)
+                else:
+                    yield sse_message("ping", {"version": version})
+        finally:
+            with SSE_LOCK:
+                SSE_STREAMS -= 1
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# --- RENDER CACHE ---
+# The dashboard is rendered once per (state ETag, language): other polls of the same version
+# get PAGE_CACHE's copy. When the version moves on, destination cards whose inputs (language,
+# destination, material groups) hash as before come from CARD_CACHE, so only the cards that
+# changed are built again.
+CARD_CACHE_MAX = 256
+CARD_CACHE = OrderedDict()  # md5 of the card inputs -> HTML, least recently used first
+PAGE_CACHE = (None, None)   # ((etag, language), page HTML)
+RENDER_LOCK = threading.Lock()
+RENDER_STATS = {"pages": 0, "page_hits": 0, "cards": 0, "card_hits": 0}
+
+def destination_card(d, mats):
+    """render_destination_card, memoized by a hash of its inputs"""
+    key = hashlib.md5(json.dumps([LANGUAGE, d, mats], default=json_serial).encode()).hexdigest()
+    with RENDER_LOCK:
+        html = CARD_CACHE.get(key)
+        if html is not None:
+            CARD_CACHE.move_to_end(key)
+            RENDER_STATS["card_hits"] += 1
+            return html
+    html = render_destination_card(d, mats)
+    with RENDER_LOCK:
+        CARD_CACHE[key] = html
+        while len(CARD_CACHE) > CARD_CACHE_MAX:
+            CARD_CACHE.popitem(last=False)
+        RENDER_STATS["cards"] += 1
+    return html
+
+def fill_refresh_interval(html):
+    """render_template_string(html, REFRESH_INTERVAL_MS=...) without compiling the page as a
+    template each time: a plain substitution when the placeholder is its only Jinja markup"""
+    placeholder = "{{ REFRESH_INTERVAL_MS }}"
+    if html.count("{{") != html.count(placeholder) or "{%" in html or "{#" in html or html.endswith("\n"):
+        return render_template_string(html, REFRESH_INTERVAL_MS=REFRESH_INTERVAL_MS)
+    return html.replace(placeholder, str(REFRESH_INTERVAL_MS))
+
+def render_destination_card(d, mats):
+    """HTML of one destination card (materials, badges, item editors, mission buttons)"""
+    html = ""
+    html += f"<div class='card-loc'><b>📦 {T('destination')}: {d}</b>"
+    for m, data in mats.items():
+        p_vol = data["pickup_vol"]
+        d_vol = data["deliver_vol"]
+        status = data["status"]
+        
+        # Build badges
+        badges = ""
+        
+        # Check completion first to apply style
+        is_completed = (status == "COMPLETED")
+        tag_class_extra = " COMPLETED" if is_completed else ""
+        
+        # Material Name Style (Strikethrough if fully done)
+        mat_style = "text-decoration: line-through; opacity: 0.5; color: #888;" if is_completed else ""
+        
+        if p_vol > 0:
+            p_current = data["delivered_pickup"]
+            p_done = (p_current >= p_vol) or is_completed
+            
+            prefix = "✅ " if p_done else "⬇️ "
+            vol_display = f"{p_vol} SCU"
+            if p_current >= 0 and p_current < p_vol and not p_done:
+                 vol_display = f"{p_current}/{p_vol} SCU"
+            if p_done:
+                 vol_display = f"{p_vol} SCU"
+                 
+            # Badge style based on partial completion
+            p_style_class = tag_class_extra
+            if p_done and not is_completed:
+                 p_style_class = " COMPLETED" # Re-use completed style for green border/text
+            
+            # Manual Update Form for Pickup
+            pickup_items_list = [x for x in data["items_list"] if x["data"].get("type") == "PICKUP"]
+            
+            if pickup_items_list:
+                 # Create unique ID for this group modal
+                 group_id = f"pick_{hashlib.md5((d + m).encode()).hexdigest()[:8]}"
+                 
+                 badges += f"""
                          <span class='scu-box pickup-tag{p_style_class}' style='cursor:pointer; {mat_style}' onclick="toggleItemEdit('{group_id}')" title="{T('click_to_edit', 'ui', 'Click to edit quantity')}">
                               {prefix}{T('pickup')}: {vol_display} <small>✏️</small>
                          </span>
                          <div id="item_edit_{group_id}" style="display:none; position:absolute; background:#111; border:1px solid #444; padding:10px; z-index:100; min-width:250px; box-shadow: 0 4px 8px rgba(0,0,0,0.5);">
                               <div style="margin-bottom:10px; font-weight:bold; border-bottom:1px solid #333; padding-bottom:5px; font-size:0.9rem;">{T('manage_items', 'ui', 'Manage Items')} ({m})</div>
                          """
-                         
-                         for item_entry in pickup_items_list:
-                             imid = item_entry["mid"]
-                             ikey = item_entry["key"]
-                             idata = item_entry["data"]
-                             isrc = item_entry["source"]
-                             icurr = idata.get("delivered", 0)
-                             ivol = idata.get("vol", 0)
-                             istatus = idata.get("status", "PENDING")
-                             status_icon = "✅" if istatus == "COMPLETED" else "⏳"
-                             
-                              # Only show delete button for MANUAL items
-                             del_btn_html = ""
-                             if idata.get("action") == "MANUAL_ADD":
-                                 del_btn_html = f"""
+                 
+                 for item_entry in pickup_items_list:
+                     imid = item_entry["mid"]
+                     ikey = item_entry["key"]
+                     idata = item_entry["data"]
+                     isrc = item_entry["source"]
+                     icurr = idata.get("delivered", 0)
+                     ivol = idata.get("vol", 0)
+                     istatus = idata.get("status", "PENDING")
+                     status_icon = "✅" if istatus == "COMPLETED" else "⏳"
+                     
+                      # Only show delete button for MANUAL items
+                     del_btn_html = ""
+                     if idata.get("action") == "MANUAL_ADD":
+                         del_btn_html = f"""
                                      <form action="/delete_item" method="post" onsubmit="return confirm('{T('delete_item_confirm')}')" style="display:inline;">
                                          <input type="hidden" name="mission_id" value="{imid}">
                                          <input type="hidden" name="item_key" value="{ikey}">
                                          <button type="submit" style="background:none; border:none; color:#ff5555; cursor:pointer; font-size:0.7rem; padding:0;">🗑️ {T('delete', 'ui', 'Delete')}</button>
                                      </form>
                                  """
-                             
-                             badges += f"""
+                     
+                     badges += f"""
                              <div style="margin-bottom:8px; background:#1a1a0a; padding:5px; border:1px solid #333; border-radius:3px;">
                                  <div style="font-size:0.7rem; color:#666; display:flex; justify-content:space-between; margin-bottom:4px;">
                                      <span>{status_icon} {isrc}</span>
@@ -2537,71 +5222,71 @@ def index():
                                  </form>
                              </div>
                              """
-                             
-                         badges += f"""
+                     
+                 badges += f"""
                               <div style="text-align:right; margin-top:5px;">
                                   <button type="button" onclick="closeEdit(this)" style="background:#333; color:#fff; border:none; cursor:pointer; padding:3px 10px; border-radius:3px;">{T('close', 'ui', 'Close')}</button>
                               </div>
                          </div>
                          """
-                    else:
-                         badges += f"<span class='scu-box pickup-tag{p_style_class}' style='{mat_style}'>{prefix}{T('pickup')}: {vol_display}</span>"
-                    
-                if d_vol > 0:
-                    d_current = data["delivered_delivery"]
-                    d_done = (d_current >= d_vol) or is_completed
-                    
-                    prefix = "✅ " if d_done else "⬆️ "
-                    label = T('delivered') if d_done else T('deliver')
-                    
-                    vol_display = f"{d_vol} SCU"
-                    if d_current >= 0 and not d_done: # Always show X/Y format if not done
-                         vol_display = f"{d_current}/{d_vol} SCU"
-                    if d_done:
-                         vol_display = f"{d_vol} SCU"
-
-                    # Badge style based on partial completion
-                    d_style_class = tag_class_extra
-                    if d_done and not is_completed:
-                         d_style_class = " COMPLETED"
-
-                    # Manual Update Form for Delivery
-                    delivery_items = [x for x in data["items_list"] if x["data"].get("type") != "PICKUP"]
-                    
-                    if delivery_items:
-                         # Create unique ID for this group modal
-                         group_id = f"del_{hashlib.md5((d + m).encode()).hexdigest()[:8]}"
-                         
-                         badges += f"""
+            else:
+                 badges += f"<span class='scu-box pickup-tag{p_style_class}' style='{mat_style}'>{prefix}{T('pickup')}: {vol_display}</span>"
+            
+        if d_vol > 0:
+            d_current = data["delivered_delivery"]
+            d_done = (d_current >= d_vol) or is_completed
+            
+            prefix = "✅ " if d_done else "⬆️ "
+            label = T('delivered') if d_done else T('deliver')
+            
+            vol_display = f"{d_vol} SCU"
+            if d_current >= 0 and not d_done: # Always show X/Y format if not done
+                 vol_display = f"{d_current}/{d_vol} SCU"
+            if d_done:
+                 vol_display = f"{d_vol} SCU"
+
+            # Badge style based on partial completion
+            d_style_class = tag_class_extra
+            if d_done and not is_completed:
+                 d_style_class = " COMPLETED"
+
+            # Manual Update Form for Delivery
+            delivery_items = [x for x in data["items_list"] if x["data"].get("type") != "PICKUP"]
+            
+            if delivery_items:
+                 # Create unique ID for this group modal
+                 group_id = f"del_{hashlib.md5((d + m).encode()).hexdigest()[:8]}"
+                 
+                 badges += f"""
                          <span class='scu-box deliver-tag{d_style_class}' style='cursor:pointer; {mat_style}' onclick="toggleItemEdit('{group_id}')" title="{T('click_to_edit', 'ui', 'Click to edit quantity')}">
                               {prefix}{label}: {vol_display} <small>✏️</small>
                          </span>
                          <div id="item_edit_{group_id}" style="display:none; position:absolute; background:#111; border:1px solid #444; padding:10px; z-index:100; min-width:250px; box-shadow: 0 4px 8px rgba(0,0,0,0.5);">
                               <div style="margin-bottom:10px; font-weight:bold; border-bottom:1px solid #333; padding-bottom:5px; font-size:0.9rem;">{T('manage_items', 'ui', 'Manage Items')} ({m})</div>
                          """
-                         
-                         for item_entry in delivery_items:
-                             imid = item_entry["mid"]
-                             ikey = item_entry["key"]
-                             idata = item_entry["data"]
-                             isrc = item_entry["source"]
-                             icurr = idata.get("delivered", 0)
-                             ivol = idata.get("vol", 0)
-                             istatus = idata.get("status", "PENDING")
-                             status_icon = "✅" if istatus == "COMPLETED" else "⏳"
-                             
-                              # Only show delete button for MANUAL items
-                             del_btn_html = ""
-                             if idata.get("action") == "MANUAL_ADD":
-                                 del_btn_html = f"""
+                 
+                 for item_entry in delivery_items:
+                     imid = item_entry["mid"]
+                     ikey = item_entry["key"]
+                     idata = item_entry["data"]
+                     isrc = item_entry["source"]
+                     icurr = idata.get("delivered", 0)
+                     ivol = idata.get("vol", 0)
+                     istatus = idata.get("status", "PENDING")
+                     status_icon = "✅" if istatus == "COMPLETED" else "⏳"
+                     
+                      # Only show delete button for MANUAL items
+                     del_btn_html = ""
+                     if idata.get("action") == "MANUAL_ADD":
+                         del_btn_html = f"""
                                      <form action="/delete_item" method="post" onsubmit="return confirm('{T('delete_item_confirm')}')" style="display:inline;">
                                          <input type="hidden" name="mission_id" value="{imid}">
                                          <input type="hidden" name="item_key" value="{ikey}">
                                          <button type="submit" style="background:none; border:none; color:#ff5555; cursor:pointer; font-size:0.7rem; padding:0;">🗑️ {T('delete', 'ui', 'Delete')}</button>
                                      </form>
                                  """
-                             
-                             badges += f"""
+                     
+                     badges += f"""
                              <div style="margin-bottom:8px; background:#1a1a0a; padding:5px; border:1px solid #333; border-radius:3px;">
                                  <div style="font-size:0.7rem; color:#666; display:flex; justify-content:space-between; margin-bottom:4px;">
                                      <span>{status_icon} {isrc}</span>
@@ -2618,43 +5303,43 @@ def index():
                                  </form>
                              </div>
                              """
-                             
-                         badges += f"""
+                     
+                 badges += f"""
                               <div style="text-align:right; margin-top:5px;">
                                   <button type="button" onclick="closeEdit(this)" style="background:#333; color:#fff; border:none; cursor:pointer; padding:4px 10px; border-radius:3px; font-size:0.8rem;">{T('close', 'ui', 'Close')}</button>
                               </div>
                          </div>
                          """
-                    else:
-                         badges += f"<span class='scu-box deliver-tag{d_style_class}' style='{mat_style}'>{prefix}{label}: {vol_display}</span>"
-                
-                if p_vol == 0 and d_vol == 0:
-                    badges += f"<span class='scu-box' style='color:#ffcc00; border:1px solid #ffcc0044;'>⏳ {T('waiting_cargo')}</span>"
+            else:
+                 badges += f"<span class='scu-box deliver-tag{d_style_class}' style='{mat_style}'>{prefix}{label}: {vol_display}</span>"
+        
+        if p_vol == 0 and d_vol == 0:
+            badges += f"<span class='scu-box' style='color:#ffcc00; border:1px solid #ffcc0044;'>⏳ {T('waiting_cargo')}</span>"
 
-                # Calculate Container Breakdown (for total volume)
-                # We prioritize delivery volume if present, otherwise pickup volume
-                target_vol = d_vol if d_vol > 0 else p_vol
-                container_html = ""
-                
-                # Retrieve max_size from aggregated data
-                max_size_pref = data.get("max_size", 32)
-                
-                if target_vol > 0:
-                     c_breakdown = get_container_breakdown(target_vol, max_size_pref)
-                     c_style = "opacity:0.3; filter:grayscale(100%); text-decoration:line-through;" if is_completed else "opacity:0.8;"
-                     
-                     # Container Size Selector (Dropdown)
-                     # We use the first mission ID found in the aggregation for the update action
-                     first_mid = next(iter(data["mission_ids"])) if data.get("mission_ids") else ""
-                     
-                     size_selector = ""
-                     if first_mid:
-                         size_options = ""
-                         for s in [32, 16, 8, 4]:
-                             sel = "selected" if s == max_size_pref else ""
-                             size_options += f"<option value='{s}' {sel}>{s}</option>"
-                         
-                         size_selector = f"""
+        # Calculate Container Breakdown (for total volume)
+        # We prioritize delivery volume if present, otherwise pickup volume
+        target_vol = d_vol if d_vol > 0 else p_vol
+        container_html = ""
+        
+        # Retrieve max_size from aggregated data
+        max_size_pref = data.get("max_size", 32)
+        
+        if target_vol > 0:
+             c_breakdown = get_container_breakdown(target_vol, max_size_pref)
+             c_style = "opacity:0.3; filter:grayscale(100%); text-decoration:line-through;" if is_completed else "opacity:0.8;"
+             
+             # Container Size Selector (Dropdown)
+             # We use the first mission ID found in the aggregation for the update action
+             first_mid = next(iter(data["mission_ids"])) if data.get("mission_ids") else ""
+             
+             size_selector = ""
+             if first_mid:
+                 size_options = ""
+                 for s in [32, 16, 8, 4]:
+                     sel = "selected" if s == max_size_pref else ""
+                     size_options += f"<option value='{s}' {sel}>{s}</option>"
+                 
+                 size_selector = f"""
                          <form action="/update_container_size" method="post" style="display:inline-block; margin-left:5px;">
                             <input type="hidden" name="mission_id" value="{first_mid}">
                             <input type="hidden" name="material" value="{m}">
@@ -2665,43 +5350,43 @@ def index():
                          </form>
                          """
 
-                     container_html = f"<div style='display:inline-flex; align-items:center; margin-left:10px; {c_style}'>{c_breakdown}{size_selector}</div>"
+             container_html = f"<div style='display:inline-flex; align-items:center; margin-left:10px; {c_style}'>{c_breakdown}{size_selector}</div>"
 
-                html += f"<div style='display:flex; justify-content:space-between; align-items:center; margin:8px 0; padding:5px 0; border-bottom:1px solid #21262d33;'>"
-                html += f"<span style='{mat_style}'>▪ {m} {container_html}</span><div style='display:flex; align-items:center; gap:10px;'>{badges}"
-                
-                # Render buttons for each linked mission
-                if "mission_ids" in data:
-                    html += "<div style='display:flex; gap:10px; margin-left:10px;'>"
-                    for mid in data["mission_ids"]:
-                         html += f"<button onclick='toggleEdit(\"{mid}\")' style='background:none; border:1px solid #444; color:#00f2ff; cursor:pointer; padding:2px 8px; border-radius:3px; font-size:0.8rem;' title='{T('add_items_title')}'>➕</button>"
-                         
-                         # Find specific item info for this mission in this group to allow granular delete
-                         target_item = next((x for x in data["items_list"] if x["mid"] == mid), None)
-                         if target_item:
-                             ikey_del = target_item["key"]
-                             is_manual = target_item["data"].get("action") == "MANUAL_ADD"
-                             # Use delete_item route for safer deletion (only deletes mission if empty)
-                             html += f"""
+        html += f"<div style='display:flex; justify-content:space-between; align-items:center; margin:8px 0; padding:5px 0; border-bottom:1px solid #21262d33;'>"
+        html += f"<span style='{mat_style}'>▪ {m} {container_html}</span><div style='display:flex; align-items:center; gap:10px;'>{badges}"
+        
+        # Render buttons for each linked mission
+        if "mission_ids" in data:
+            html += "<div style='display:flex; gap:10px; margin-left:10px;'>"
+            for mid in data["mission_ids"]:
+                 html += f"<button onclick='toggleEdit(\"{mid}\")' style='background:none; border:1px solid #444; color:#00f2ff; cursor:pointer; padding:2px 8px; border-radius:3px; font-size:0.8rem;' title='{T('add_items_title')}'>➕</button>"
+                 
+                 # Find specific item info for this mission in this group to allow granular delete
+                 target_item = next((x for x in data["items_list"] if x["mid"] == mid), None)
+                 if target_item:
+                     ikey_del = target_item["key"]
+                     is_manual = target_item["data"].get("action") == "MANUAL_ADD"
+                     # Use delete_item route for safer deletion (only deletes mission if empty)
+                     html += f"""
                              <form action="/delete_item" method="post" onsubmit="return confirm('{T('delete_item_confirm') if is_manual else T('delete_confirm')}')" style="display:flex; align-items:center;">
                                 <input type="hidden" name="mission_id" value="{mid}">
                                 <input type="hidden" name="item_key" value="{ikey_del}">
                                 <button type="submit" style="background:none; border:1px solid #444; color:#666; cursor:pointer; padding:2px 8px; border-radius:3px; font-size:0.8rem; display:flex; align-items:center;" title="{T('delete', 'ui', 'Delete')}">🗑️</button>
                              </form>
                              """
-                         else:
-                             # Fallback (should not happen)
-                             html += f" <a href='/delete_mission/{mid}' onclick=\"return confirm('{T('delete_confirm')}')\" style='text-decoration:none; border:1px solid #444; color:#666; padding:2px 8px; border-radius:3px; font-size:0.8rem; display:flex; align-items:center;' title='Delete Mission'>🗑️</a>"
-                    html += "</div>"
-                
-                html += "</div></div>"
-                
-                # Hidden Edit Form for this mission
-                if "mission_ids" in data:
-                    for mid in data["mission_ids"]:
-                        form_id = f"form_edit_{mid}"
-                        container_id = f"container_edit_{mid}"
-                        html += f"""
+                 else:
+                     # Fallback (should not happen)
+                     html += f" <a href='/delete_mission/{mid}' onclick=\"return confirm('{T('delete_confirm')}')\" style='text-decoration:none; border:1px solid #444; color:#666; padding:2px 8px; border-radius:3px; font-size:0.8rem; display:flex; align-items:center;' title='Delete Mission'>🗑️</a>"
+            html += "</div>"
+        
+        html += "</div></div>"
+        
+        # Hidden Edit Form for this mission
+        if "mission_ids" in data:
+            for mid in data["mission_ids"]:
+                form_id = f"form_edit_{mid}"
+                container_id = f"container_edit_{mid}"
+                html += f"""
                         <div id="edit_{mid}" style="display:none; background:#111; padding:10px; margin-bottom:10px; border-radius:5px; border-left:3px solid #ffcc00;">
                             <form id="{form_id}" action="/manual_add_item" method="post">
                                 <input type="hidden" name="mission_id" value="{mid}">
@@ -2721,7 +5406,83 @@ def index():
                             </form>
                         </div>
                         """
-            html += "</div>"
+    html += "</div>"
+    return html
+
+@app.route('/')
+def index():
+    global PAGE_CACHE
+    # Unchanged since the client's copy: nothing to render
+    if request.if_none_match.contains(state_etag()):
+        return not_modified(state_etag())
+    # Render from a snapshot: the log reader keeps changing data_store meanwhile
+    version, state = STATE.versioned_snapshot()
+    etag = state_etag(version)
+    cached_key, page = PAGE_CACHE
+    if cached_key == (etag, LANGUAGE):
+        RENDER_STATS["page_hits"] += 1
+    else:
+        page = render_dashboard(state)
+        PAGE_CACHE = ((etag, LANGUAGE), page)
+        RENDER_STATS["pages"] += 1
+    resp = make_response(page)
+    resp.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+    resp.headers['Pragma'] = 'no-cache'
+    resp.set_etag(etag)
+    return resp
+
+def render_dashboard(state):
+    """The dashboard page for a state snapshot"""
+    summary = SUMMARY.summary(state.get("missions", {}))
+
+    mission_icons = {
+        "READY": "⚪", "ACTIVE": "🟡", "COMPLETED": "✅", "CANCELLED": "🔴"
+    }
+    
+    # Totals (Earnings & Mission Time) of the persistent history, kept up to date by HISTORY
+    total_earnings, total_mission_seconds = HISTORY.totals()
+
+    earnings_str = f"{total_earnings:,} aUEC"
+    mission_time_str = format_duration(total_mission_seconds)
+    
+    mission_icon = mission_icons.get(state["mission_status"], "⚪")
+    
+    session_time = format_duration((datetime.now() - state["session_start"]).total_seconds())
+    
+    html = (
+        "<!DOCTYPE html><html><head><meta charset='UTF-8'>"
+        f"<title>SC Hauling Monitor - {T('source_log', 'ui', 'LOG')} Mode</title>"
+        f"<link rel='stylesheet' href='{asset_url('dashboard.css')}'>"
+        "</head><body>"
+        "<div class='header'>"
+        "<div class='header-left'>"
+        
+        # --- NAV HEADER ---
+        f"<div class='nav-header' style='display:flex; gap:10px; margin-bottom:10px;'>"
+        f"    <a href='/' style='color:#fff; text-decoration:none; background:#238636; padding:5px 10px; border-radius:4px; font-weight:bold;'>📊 {T('dashboard', 'ui', 'Dashboard')}</a>"
+        f"    <a href='/hangar' style='color:#58a6ff; text-decoration:none; padding:5px 10px;'>🏭 {T('hangar_local', 'ui', 'Hangar / Local Cargo')}</a>"
+        f"</div>"
+
+        f"<div class='loc-box'>📍 {T('current_location')}: {state['current_location']}</div>"
+        "<div class='status-row'>"
+        f"<div class='status-badge mission-status'>{mission_icon} {T('mission')}: {T(state['mission_status'].lower(), 'ui', state['mission_status'])}</div>"
+        "</div></div>"
+        "<div class='header-right'>"
+        f"<button id='pauseBtn' class='pause-btn' onclick='togglePauseManual()'>⏸ {T('pause')}</button>"
+        "</div>"
+        "</div>"
+        "<div class='info-grid'>"
+        f"<span>🚀 <b>{state['ship_name']}</b> | 👤 <b>{state['player_name']}</b></span>"
+        f"<span>💰 <b>{earnings_str}</b></span>"
+        f"<span>🏁 <b>{mission_time_str}</b></span>"
+        f"<span>⏱ {session_time}</span>"
+        "</div>"
+    )
+
+    if summary:
+        html += "<div id='mission-list'>"
+        for d, mats in summary.items():
+            html += destination_card(d, mats)
         html += "</div>"
     else:
         html += "<div id='mission-list'></div>"
@@ -2731,7 +5492,7 @@ def index():
     # Missions without items are not in summary because summary is built from items.
     
     missions_with_items = set()
-    for m_data in data_store["missions"].values():
+    for m_data in state["missions"].values():
         if m_data["items"]:
             missions_with_items.add(m_data["id"])
 
@@ -2741,7 +5502,7 @@ def index():
     
     # --- 1. NEW MISSIONS (Waiting for Cargo) ---
     # Only show the full manual add form for missions that have NO items.
-    missions_needing_input = [m for m_id, m in data_store["missions"].items() if not m["items"]]
+    missions_needing_input = [m for m_id, m in state["missions"].items() if not m["items"]]
     
     html += "<div id='new-missions-list'>"
     if missions_needing_input:
@@ -2756,73 +5517,37 @@ def index():
             html += f"</div>"
             
             # Form with ID for JS targeting
-            form_id = f"form_{m['id']}"
-            container_id = f"container_{m['id']}"
-            
-            html += f"""
-            <form id="{form_id}" action="/manual_add_item" method="post">
-                <input type="hidden" name="mission_id" value="{m['id']}">
-                <div id="{container_id}">
-                    <div style="display:flex; gap:5px; margin-bottom:5px;">
-                        <input type="text" name="material" placeholder="{T('material')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
-                        <input type="number" name="quantity" placeholder="{T('quantity')}" style="width:60px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
-                        <input type="text" name="origin" placeholder="{T('origin_ph', 'ui', 'Origin (Opt)')}" style="width:100px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;">
-                        <input type="text" name="destination" placeholder="{T('destination_ph')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
-                    </div>
-                </div>
-                
-                <div style="margin-top:10px; display:flex; gap:10px;">
-                    <button type="button" onclick="addRow('{container_id}')" style="background:#333; color:#fff; border:1px solid #555; padding:5px 10px; cursor:pointer; border-radius:3px;">+ {T('add_row')}</button>
-                    <button type="submit" style="background:#00f2ff; color:#000; border:none; padding:5px 15px; font-weight:bold; cursor:pointer; border-radius:3px;">💾 {T('save')}</button>
-                </div>
-            </form>
-            </div>"""
-        html += "</div>"
-    html += "</div>"
-
-    # --- 2. ACTIVE MISSIONS (Edit Mode) ---
-    # Hidden by default, accessible via Main Cards
-    # We will inject a modal or hidden div structure for each active mission so user can add items later.
-    
-    active_missions_list = [m for m_id, m in data_store["missions"].items()]
-    if active_missions_list:
-        html += "<script>"
-        html += f"""
-        function addRow(containerId) {{
-            isPaused = true; 
-            updatePauseUI();
-            const container = document.getElementById(containerId);
-            const div = document.createElement('div');
-            div.style.cssText = "display:flex; gap:5px; margin-bottom:5px;";
-            div.innerHTML = `
-                <input type="text" name="material" placeholder="{T('material')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()" required>
-                <input type="number" name="quantity" placeholder="{T('quantity')}" style="width:60px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()" required>
-                <input type="text" name="origin" placeholder="{T('origin_ph', 'ui', 'Origin (Opt)')}" style="width:100px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()">
-                <input type="text" name="destination" placeholder="{T('destination_ph')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" onfocus="setPaused()" required>
-                <button type="button" onclick="this.parentElement.remove()" style="background:#442222; color:#ff5555; border:none; padding:0 8px; cursor:pointer;">x</button>
-            `;
-            container.appendChild(div);
-        }}
-        function toggleItemEdit(id) {{
-            setPaused();
-            const el = document.getElementById('item_edit_' + id);
-            if (el.style.display === 'none') el.style.display = 'block';
-            else el.style.display = 'none';
-        }}
-        function toggleEdit(id) {{
-            setPaused();
-            const el = document.getElementById('edit_' + id);
-            if (el.style.display === 'none') el.style.display = 'block';
-            else el.style.display = 'none';
-        }}
-        function resetSession() {{
-            if(confirm("{T('reset_confirm', 'ui', 'Are you sure you want to reset the session? This will clear all current missions.')}")) {{
-                fetch('/reset_session', {{ method: 'POST' }})
-                .then(r => window.location.reload());
-            }}
-        }}
-        """
-        html += "</script>"
+            form_id = f"form_{m['id']}"
+            container_id = f"container_{m['id']}"
+            
+            html += f"""
+            <form id="{form_id}" action="/manual_add_item" method="post">
+                <input type="hidden" name="mission_id" value="{m['id']}">
+                <div id="{container_id}">
+                    <div style="display:flex; gap:5px; margin-bottom:5px;">
+                        <input type="text" name="material" placeholder="{T('material')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
+                        <input type="number" name="quantity" placeholder="{T('quantity')}" style="width:60px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
+                        <input type="text" name="origin" placeholder="{T('origin_ph', 'ui', 'Origin (Opt)')}" style="width:100px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;">
+                        <input type="text" name="destination" placeholder="{T('destination_ph')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
+                    </div>
+                </div>
+                
+                <div style="margin-top:10px; display:flex; gap:10px;">
+                    <button type="button" onclick="addRow('{container_id}')" style="background:#333; color:#fff; border:1px solid #555; padding:5px 10px; cursor:pointer; border-radius:3px;">+ {T('add_row')}</button>
+                    <button type="submit" style="background:#00f2ff; color:#000; border:none; padding:5px 15px; font-weight:bold; cursor:pointer; border-radius:3px;">💾 {T('save')}</button>
+                </div>
+            </form>
+            </div>"""
+        html += "</div>"
+    html += "</div>"
+
+    # --- 2. ACTIVE MISSIONS (Edit Mode) ---
+    # Hidden by default, accessible via Main Cards
+    # We will inject a modal or hidden div structure for each active mission so user can add items later.
+    
+    active_missions_list = [m for m_id, m in state["missions"].items()]
+    if active_missions_list:
+        html += f"<script src='{asset_url('missions.js')}'></script>"
 
     if not summary and not missions_needing_input:
         html += f"<div class='empty-state'>⏳ {T('no_active_missions')}<br><small>{T('accept_contract_hint')}</small></div>"
@@ -2831,8 +5556,8 @@ def index():
     # REMOVED: Moved to separate app (Hauling_web_Hangar.py)
     
     html += f"<div class='footer' id='footer-content'><b>📋 {T('mission_history')}:</b><hr style='border-color:#21262d; margin:10px 0;'>"
-    if data_store.get("finished_fixed"):
-        for i, f in enumerate(data_store["finished_fixed"][:10]):
+    if len(HISTORY):
+        for i, f in enumerate(HISTORY.recent(10)):
             mission_short = f['id'][:8] if len(f['id']) > 8 else f['id']
             title = f.get('title', f"{T('mission')} {mission_short}")
             value = f.get('value', 0)
@@ -2891,239 +5616,240 @@ def index():
     
     html += "</div>"
     
-    html += """
-    <script>
-    var manualPause = false;
-    var editingPause = false;
-    var typingPause = false;
-    var lastDomUpdateTs = Date.now();
-
-    function updatePauseUI() {
-        const btn = document.getElementById('pauseBtn');
-        if (!btn) return;
-        
-        if (manualPause) {
-            btn.classList.add('paused');
-            btn.textContent = '▶ RESUME';
-        } else if (editingPause) {
-             btn.classList.add('paused');
-             btn.textContent = '⏸ EDITING...';
-        } else if (typingPause) {
-             btn.classList.add('paused');
-             btn.textContent = '⏸ TYPING...';
-        } else {
-            btn.classList.remove('paused');
-            btn.textContent = '⏸ PAUSE';
-        }
-    }
-
-    function togglePauseManual() {
-        manualPause = !manualPause;
-        updatePauseUI();
-    }
-    
-    // Helper to pause when editing starts
-    function openEdit(el) {
-        if (!el) return;
-        editingPause = true;
-        updatePauseUI();
-        el.style.display = 'block';
-        
-        // Auto-focus first input if available
-        const input = el.querySelector('input');
-        if (input) input.focus();
-    }
-
-    // Helper to resume when editing ends
-    function closeEdit(btn, el) {
-        // If btn provided, find the container
-        if (btn) {
-            el = btn.closest('div[id^=item_edit], div[id^=edit_]');
-        }
-        
-        if (el) {
-            el.style.display = 'none';
-        }
-        
-        // Check if any other edit forms are visible
-        const anyVisible = document.querySelectorAll('div[id^=item_edit][style*="display: block"], div[id^=edit_][style*="display: block"]').length > 0;
-        if (!anyVisible) {
-            editingPause = false;
-        }
-        updatePauseUI();
-    }
-
-    // Override toggle functions
-    function toggleItemEdit(id) {
-        const el = document.getElementById('item_edit_' + id);
-        if (el) {
-            if (el.style.display === 'none' || el.style.display === '') {
-                openEdit(el);
-            } else {
-                closeEdit(null, el);
-            }
-        }
-    }
-
-    function toggleEdit(id) {
-        const el = document.getElementById('edit_' + id);
-        if (el) {
-            if (el.style.display === 'none' || el.style.display === '') {
-                openEdit(el);
-            } else {
-                closeEdit(null, el);
-            }
-        }
-    }
-    
-    function addRow(containerId) {
-        // Adding a row implies editing
-        editingPause = true; 
-        updatePauseUI();
-        
-        const container = document.getElementById(containerId);
-        const div = document.createElement('div');
-        div.style.cssText = "display:flex; gap:5px; margin-bottom:5px;";
-        div.innerHTML = `
-            <input type="text" name="material" placeholder="{T('material')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
-            <input type="number" name="quantity" placeholder="{T('quantity')}" style="width:60px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
-            <input type="text" name="origin" placeholder="{T('origin_ph', 'ui', 'Origin (Opt)')}" style="width:100px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;">
-            <input type="text" name="destination" placeholder="{T('destination_ph')}" style="width:120px; background:#222; border:1px solid #444; color:#fff; padding:5px; border-radius:3px;" required>
-            <button type="button" onclick="this.parentElement.remove()" style="background:#442222; color:#ff5555; border:none; padding:0 8px; cursor:pointer;">x</button>
-        `;
-        container.appendChild(div);
-        
-        // Focus the new input
-        div.querySelector('input').focus();
-    }
-    
-    function resetSession() {
-        if(confirm("{T('reset_confirm', 'ui', 'Are you sure you want to reset the session? This will clear all current missions.')}")) {
-            fetch('/reset_session', { method: 'POST' })
-            .then(r => window.location.reload());
-        }
-    }
-
-    // Focus/Blur handling for temporary typing pause
-    document.addEventListener('focus', function(e) {
-        if(e.target && (e.target.tagName === 'INPUT' || e.target.tagName === 'BUTTON' || e.target.tagName === 'SELECT' || e.target.tagName === 'TEXTAREA')) {
-            if (e.target.id === 'pauseBtn') return;
-            typingPause = true;
-            updatePauseUI();
-        }
-    }, true);
-
-    document.addEventListener('blur', function(e) {
-        if(e.target && (e.target.tagName === 'INPUT' || e.target.tagName === 'BUTTON' || e.target.tagName === 'SELECT' || e.target.tagName === 'TEXTAREA')) {
-            setTimeout(() => {
-                // Check if we moved to another input
-                const active = document.activeElement;
-                if (!active || active.tagName === 'BODY' || active.tagName === 'HTML') {
-                    typingPause = false;
-                    updatePauseUI();
-                }
-            }, 200);
-        }
-    }, true);
-
-    async function updateContent() {
-        if (manualPause || editingPause || typingPause) {
-            return;
-        }
-
-        try {
-            const controller = new AbortController();
-            const to = setTimeout(() => controller.abort(), 5000);
-            const response = await fetch('/?ts=' + Date.now(), { cache: 'no-store', signal: controller.signal });
-            const text = await response.text();
-            clearTimeout(to);
-            
-            // Double check pause after fetch
-             if (manualPause || editingPause || typingPause) {
-                return;
-            }
-            
-            const parser = new DOMParser();
-            const doc = parser.parseFromString(text, 'text/html');
-            
-            // Selective Update
-            const headerLeft = document.querySelector('.header-left');
-            if (headerLeft && doc.querySelector('.header-left')) {
-                headerLeft.innerHTML = doc.querySelector('.header-left').innerHTML;
-            }
-            
-            const infoGrid = document.querySelector('.info-grid');
-            if (infoGrid && doc.querySelector('.info-grid')) {
-                infoGrid.innerHTML = doc.querySelector('.info-grid').innerHTML;
-            }
-            
-            const missionList = document.getElementById('mission-list');
-            if (missionList && doc.getElementById('mission-list')) {
-                missionList.innerHTML = doc.getElementById('mission-list').innerHTML;
-            }
-            
-            const newMissionsList = document.getElementById('new-missions-list');
-            if (newMissionsList && doc.getElementById('new-missions-list')) {
-                newMissionsList.innerHTML = doc.getElementById('new-missions-list').innerHTML;
-            }
-            
-            const footerContent = document.getElementById('footer-content');
-            if (footerContent && doc.getElementById('footer-content')) {
-                footerContent.innerHTML = doc.getElementById('footer-content').innerHTML;
-            }
-            
-            lastDomUpdateTs = Date.now();
-
-        } catch (e) {
-            console.error("Update failed", e);
-        }
-    }
-    
-    setInterval(updateContent, {{ REFRESH_INTERVAL_MS }});
-    
-    setInterval(function() {
-        if (!manualPause && !editingPause && !typingPause) {
-            var delta = Date.now() - lastDomUpdateTs;
-            if (delta > 20000) {
-                window.location.reload();
-            }
-        }
-    }, 5000);
-    
-    document.addEventListener('visibilitychange', function() {
-        if (!document.hidden) {
-            updateContent();
-        }
-    });
-    </script>
+    html += f"""
+    <script src='{asset_url('dashboard.js')}'></script>
     </div></body></html>"""
-    resp = make_response(render_template_string(html, REFRESH_INTERVAL_MS=REFRESH_INTERVAL_MS))
-    resp.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    resp.headers['Pragma'] = 'no-cache'
-    return resp
+    return fill_refresh_interval(html)
+
+# --- WEB SERVER ---
+# web_server = "pool" (default): WEB_THREADS workers take the accepted connections from a queue
+# of at most WEB_QUEUE; past that a client gets an immediate 503 instead of yet another thread.
+# Connections are kept alive (HTTP/1.1) and closed after WEB_KEEPALIVE_S idle, so a quiet
+# browser does not keep its worker. /events streams hold a worker while open: at most half
+# the workers serve them, the other pages poll. web_server = "dev" is Werkzeug's
+# thread-per-request server, what app.run() used to start.
+# stop_web_server() stops accepting, ends the /events streams and lets the requests in
+# flight finish (up to WEB_STOP_TIMEOUT_S) before the state is flushed and the app exits.
+WEB_STOP_TIMEOUT_S = 5
+WEB_SERVER = None
+WEB_SERVER_LOCK = threading.Lock()
+WEB_STOPPING = threading.Event()
+
+class PooledRequestHandler(WSGIRequestHandler):
+    """Werkzeug's handler with keep-alive. Werkzeug closes every connection (and discards what
+    arrives after a response), so run_wsgi is replaced: the request body is read up front and
+    the response is framed by its Content-Length, or chunked (/events), leaving the connection
+    ready for the next request."""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        self.timeout = WEB_KEEPALIVE_S  # Socket timeout: ends idle keep-alive connections
+        super().setup()
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        if WEB_STOPPING.is_set():
+            self.close_connection = True
+
+    def run_wsgi(self):
+        if self.headers.get("Transfer-Encoding") or self.headers.get("Expect"):
+            self.close_connection = True
+            return super().run_wsgi()  # Chunked uploads / 100-continue: Werkzeug's way (then close)
+        try:
+            length = max(0, int(self.headers.get("Content-Length") or 0))
+        except ValueError:
+            length = 0
+        environ = self.make_environ()
+        environ["wsgi.input"] = io.BytesIO(self.rfile.read(length) if length else b"")
+        response = []  # [status, headers] given to start_response
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response[:] = [status, headers]
+            return self.wfile.write
+
+        started = chunked = False
+        result = self.server.app(environ, start_response)
+        try:
+            for data in result:
+                if not started:
+                    chunked = self.send_head(*response)
+                    started = True
+                if data and chunked:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    self.wfile.flush()  # Streams go out as they come
+                elif data:
+                    self.wfile.write(data)
+            if not started:
+                chunked = self.send_head(*response)
+                started = True
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (ConnectionError, TimeoutError) as e:
+            self.close_connection = True
+            self.connection_dropped(e, environ)
+        except Exception:
+            self.close_connection = True
+            if not started:
+                self.send_error(500)
+            raise
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+    def send_head(self, status, headers):
+        """Status line and headers; returns True if the body has to be chunked"""
+        code, _, reason = status.partition(" ")
+        code = int(code)
+        self.send_response(code, reason)
+        names = set()
+        for key, value in headers:
+            self.send_header(key, value)
+            names.add(key.lower())
+        chunked = False
+        if "content-length" not in names and self.command != "HEAD" and not (100 <= code < 200 or code in (204, 304)):
+            if self.request_version == "HTTP/1.1":
+                chunked = True
+                self.send_header("Transfer-Encoding", "chunked")
+            else:
+                self.close_connection = True  # HTTP/1.0: the end of the body is the end of the connection
+        if self.close_connection or WEB_STOPPING.is_set():
+            self.close_connection = True
+            self.send_header("Connection", "close")
+        self.end_headers()
+        return chunked
+
+    def log_error(self, format, *args):
+        if format.startswith("Request timed out"):
+            return  # An idle keep-alive connection reaching WEB_KEEPALIVE_S, nothing to report
+        super().log_error(format, *args)
+
+class PooledWSGIServer(BaseWSGIServer):
+    multithread = True
+
+    def __init__(self, host, port, app, threads, queue_size):
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.rejected = 0
+        self.connections = set()  # Open in a worker (keep-alive ones mostly wait for the next request)
+        self.connections_lock = threading.Lock()
+        self.request_queue_size = max(queue_size, 16)  # Listen backlog
+        super().__init__(host, port, app, handler=PooledRequestHandler)
+        self.workers = [threading.Thread(target=self.work, name=f"web-{i}", daemon=True) for i in range(threads)]
+        for worker in self.workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        """Called by serve_forever for each accepted connection: queue it for a worker"""
+        try:
+            self.jobs.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejected += 1
+            try:
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n"
+                                b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            request, client_address = job
+            with self.connections_lock:
+                self.connections.add(request)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                with self.connections_lock:
+                    self.connections.discard(request)
+                self.shutdown_request(request)
+
+    def drain(self, timeout):
+        """After serve_forever: workers finish the queued connections, then exit.
+        Returns how many are still busy when the timeout runs out."""
+        deadline = time.monotonic() + timeout
+        with self.connections_lock:
+            for request in self.connections:
+                try:
+                    request.shutdown(socket.SHUT_RD)  # Idle keep-alive reads end now; responses still go out
+                except OSError:
+                    pass
+        try:
+            for _ in self.workers:
+                self.jobs.put(None, timeout=max(0.01, deadline - time.monotonic()))
+        except queue.Full:
+            pass  # Still busy with queued connections; the daemon workers end with the process
+        for worker in self.workers:
+            worker.join(max(0, deadline - time.monotonic()))
+        return sum(worker.is_alive() for worker in self.workers)
+
+def create_web_server(host=None, port=None):
+    """The configured server, bound to host:port (port 0 = any free port) but not serving yet"""
+    global WEB_SERVER, SSE_STREAM_LIMIT
+    host = WEB_HOST if host is None else host
+    port = WEB_PORT if port is None else port
+    WEB_STOPPING.clear()
+    if WEB_SERVER_MODE == "dev":
+        server = make_server(host, port, app, threaded=True)
+        SSE_STREAM_LIMIT = None
+        print("🌐 Web server: development (one thread per request)")
+    else:
+        server = PooledWSGIServer(host, port, app, WEB_THREADS, WEB_QUEUE)
+        SSE_STREAM_LIMIT = max(1, WEB_THREADS // 2)
+        print(f"🌐 Web server: {WEB_THREADS} threads, queue {WEB_QUEUE}, keep-alive {WEB_KEEPALIVE_S:g}s")
+    with WEB_SERVER_LOCK:
+        WEB_SERVER = server
+    return server
+
+def serve_web(server):
+    """Serve until stop_web_server() (blocking). Ctrl+C in console mode stops it gracefully too."""
+    try:
+        server.serve_forever()
+    finally:
+        stop_web_server()
+
+def stop_web_server(timeout=WEB_STOP_TIMEOUT_S):
+    """Graceful stop: no new connections, /events streams end, requests in flight finish"""
+    global WEB_SERVER
+    with WEB_SERVER_LOCK:
+        server, WEB_SERVER = WEB_SERVER, None
+    if server is None:
+        return
+    WEB_STOPPING.set()
+    STATE.notify()      # Wake the /events streams so they see WEB_STOPPING
+    server.shutdown()   # serve_forever returns (at once if it already has)
+    server.server_close()
+    busy = server.drain(timeout) if isinstance(server, PooledWSGIServer) else 0
+    print("🛑 Web server stopped" + (f" ({busy} requests still running)" if busy else ""))
 
 if __name__ == '__main__':
+    # Required for the backfill process pool in the frozen (PyInstaller) executable
+    multiprocessing.freeze_support()
+
     # Load saved config (if any) so calibration persists
     load_saved_config()
     
     # Load language data
     load_language_data()
     
+    # Bulk import of the archived logs: python hauling_web_tst.py --import-backups [folder]
+    if "--import-backups" in sys.argv:
+        arg_idx = sys.argv.index("--import-backups")
+        import_log_backups(sys.argv[arg_idx + 1] if len(sys.argv) > arg_idx + 1 else None)
+        sys.exit(0)
+
     # Load persisted state (history, active missions)
     load_state()
-    data_store["finished_fixed"] = load_finishes()
     
-    # SAFETY: Sync processed_mission_ids with finished_fixed to prevent duplication
-    # if state file was lost/wiped but history file remains.
-    if "processed_mission_ids" not in data_store:
-        data_store["processed_mission_ids"] = []
-        
-    for f in data_store["finished_fixed"]:
-        fid = f.get("id")
-        if fid and fid not in data_store["processed_mission_ids"]:
-             data_store["processed_mission_ids"].append(fid)
-             
-    print(f"✓ {T('sync_ids', 'log', 'Synced')} {len(data_store['processed_mission_ids'])} {T('processed_ids', 'log', 'processed IDs from history')}")
+    # SAFETY: History ids count as processed (mission_processed() checks HISTORY too), so a
+    # lost/wiped state file cannot bring finished missions back and nothing is copied here.
+    print(f"✓ {T('sync_ids', 'log', 'Synced')} {len(data_store['processed_mission_ids'])} {T('processed_ids', 'log', 'processed IDs')}, {len(HISTORY)} {T('history_entries', 'log', 'history entries')}")
     
     print("=" * 60)
     print("🚀 STAR CITIZEN HAULING MONITOR - HYBRID MODE")
@@ -3137,12 +5863,17 @@ if __name__ == '__main__':
     
     print("=" * 60)
     
+    # Coalesce state writes from here on; whatever is pending is written on exit
+    STATE_PERSISTER.start()
+    atexit.register(save_state_on_exit)
+
     # Start Log Reader in Background
     threading.Thread(target=background_log_reader, daemon=True).start()
     
-    # Function to run Flask
+    # Function to run Flask (see WEB SERVER for the serving modes)
+    web_server = create_web_server()
     def run_flask():
-        app.run(host=WEB_HOST, port=WEB_PORT, debug=False, use_reloader=False)
+        serve_web(web_server)
 
     if HAS_TRAY:
         # --- SYSTEM TRAY IMPLEMENTATION ---
@@ -3177,6 +5908,8 @@ if __name__ == '__main__':
 
         def on_restart(icon, item):
             icon.stop()
+            stop_web_server()
+            save_state_on_exit() # The new process resumes from the checkpoint instead of re-reading
             print("♻️ Reiniciando serviço...")
             if getattr(sys, 'frozen', False):
                 os.execl(sys.executable, sys.executable, *sys.argv[1:])
@@ -3185,6 +5918,8 @@ if __name__ == '__main__':
 
         def on_exit(icon, item):
             icon.stop()
+            stop_web_server()
+            save_state_on_exit()
             os._exit(0)
 
         # Create Icon
@@ -3202,6 +5937,8 @@ if __name__ == '__main__':
         def handle_sigint(sig, frame):
             print("\n🛑 Interrupção recebida (Ctrl+C). Parando...")
             icon.stop()
+            stop_web_server()
+            save_state_on_exit()
             os._exit(0)
         signal.signal(signal.SIGINT, handle_sigint)
         
@@ -0,0 +1,272 @@
+"""Load test: concurrent dashboard clients against the web server, on one host.
+
+Usage: python load_test.py [path/to/Game.log] [--clients 12] [--seconds 15] [--mode pool|dev]
+                           [--threads N] [--events] [--think-ms 0] [--changes 2] [--json [out.json]]
+
+The server runs in this process, on a free local port, with the state of the replayed log
+(or a few sample missions) and persistence in memory. Meanwhile the state changes --changes
+times per second, as the game log would make it, so pages are re-rendered for real.
+The clients run in a separate process (their own interpreter), one thread and one keep-alive
+connection each, and behave like an open dashboard: the first visit loads the page and its
+assets, then "/" is polled with If-None-Match (304 while nothing changed) plus /api/state
+every 10th request. --think-ms 0 polls back to back (sustained throughput); 2000 is what a
+real dashboard does. --events also keeps an /events stream open per client.
+"""
+import argparse
+import contextlib
+import gzip
+import http.client
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import socket
+import threading
+import time
+
+ASSET_LINK = re.compile(rb"(?:href|src)=['\"](/assets/[^'\"]+)['\"]")
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+# --- CLIENT PROCESS ---
+def dashboard_client(port, seconds, think_s, results):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    stats = {"requests": 0, "status": {}, "bytes": 0, "latencies": [], "errors": 0, "reconnects": 0}
+    headers = {"Accept-Encoding": "gzip"}
+
+    def get(path, extra=None):
+        nonlocal conn
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=dict(headers, **(extra or {})))
+            resp = conn.getresponse()
+            body = resp.read()
+        except (OSError, http.client.HTTPException):
+            stats["errors"] += 1
+            stats["reconnects"] += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            return None, b""
+        stats["latencies"].append(time.perf_counter() - t0)
+        stats["requests"] += 1
+        stats["status"][resp.status] = stats["status"].get(resp.status, 0) + 1
+        stats["bytes"] += len(body)
+        if resp.getheader("Connection", "").lower() == "close":
+            conn.close()
+            stats["reconnects"] += 1
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        return resp, body
+
+    # First visit: the page and its assets
+    resp, body = get("/")
+    etag = resp.getheader("ETag") if resp else None
+    if resp is not None and resp.getheader("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    for path in ASSET_LINK.findall(body):
+        get(path.decode())
+
+    deadline = time.monotonic() + seconds
+    n = 0
+    while time.monotonic() < deadline:
+        n += 1
+        if n % 10 == 0:
+            get("/api/state")
+        else:
+            resp, _ = get(f"/?ts={time.time()}", {"If-None-Match": etag} if etag else None)
+            if resp is not None and resp.status == 200:
+                etag = resp.getheader("ETag")
+        if think_s:
+            time.sleep(think_s)
+    conn.close()
+    results.put(stats)
+
+
+def event_client(port, seconds, results):
+    """Holds an /events stream open; counts the events it gets"""
+    stats = {"events": 0, "rejected": 0}
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=seconds + 15)
+        sock.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+        f = sock.makefile("rb")
+        status = f.readline().split()
+        if len(status) < 2 or status[1] != b"200":
+            stats["rejected"] += 1
+        else:
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                line = f.readline()
+                if not line:
+                    break
+                if line.startswith(b"event:"):
+                    stats["events"] += 1
+        sock.close()
+    except OSError:
+        stats["rejected"] += 1
+    results.put(stats)
+
+
+def client_process(port, clients, seconds, think_s, events, results):
+    threads = [threading.Thread(target=dashboard_client, args=(port, seconds, think_s, results))
+               for _ in range(clients)]
+    if events:
+        threads += [threading.Thread(target=event_client, args=(port, seconds, results)) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put(None)
+
+
+# --- SERVER (this process) ---
+def setup_server(args):
+    import hauling_web_tst as hw
+    with contextlib.redirect_stdout(io.StringIO()):
+        hw.load_saved_config()
+        hw.load_language_data()
+    hw.PERSIST_TO_DISK = False
+    hw.WEB_SERVER_MODE = args.mode
+    if args.threads:
+        hw.WEB_THREADS = args.threads
+    # Request lines on the console would be most of the work
+    import logging
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    path = args.log or hw.LOG_PATH
+    if os.path.exists(path):
+        monitor = hw.HaulingMonitor()
+        with open(path, "r", encoding="utf-8", errors="ignore") as f, contextlib.redirect_stdout(io.StringIO()):
+            for line in f:
+                try:
+                    monitor.process_line(line)
+                except Exception:
+                    pass
+        source = path
+    else:
+        for i in range(6):
+            hw.data_store["missions"][f"load-{i}"] = {
+                "id": f"load-{i}", "title": f"Sample mission {i}", "status": "ACTIVE", "source": "Native",
+                "started": "12:00:00",
+                "items": {f"k{j}": {"dest": f"Station {i % 3}", "mat": f"Material {j}", "vol": 16 * (j + 1),
+                                    "status": "PENDING", "delivered": 0, "type": "DELIVERY"} for j in range(3)},
+            }
+        source = "sample missions"
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = hw.create_web_server("127.0.0.1", 0)
+    threading.Thread(target=hw.serve_web, args=(server,), daemon=True).start()
+    return hw, server, source
+
+
+def state_changer(hw, per_second, stop):
+    """Stands in for the log reader: a new state version per_second times a second"""
+    i = 0
+    while not stop.wait(1 / per_second):
+        i += 1
+        with hw.STATE.write() as store:
+            store["current_location"] = f"Load test {i}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent dashboard clients against the web server")
+    parser.add_argument("log", nargs="?", help="Game.log to build the state from (default: log_path from the config)")
+    parser.add_argument("--clients", type=int, default=12, help="Concurrent dashboard clients")
+    parser.add_argument("--seconds", type=float, default=15, help="Test duration")
+    parser.add_argument("--mode", choices=("pool", "dev"), default="pool", help="Serving mode (web_server)")
+    parser.add_argument("--threads", type=int, help="Worker threads of the pooled server (default: config)")
+    parser.add_argument("--events", action="store_true", help="Also keep an /events stream open per client")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pause between a client's polls")
+    parser.add_argument("--changes", type=float, default=2, help="State changes per second")
+    parser.add_argument("--json", nargs="?", const="-", metavar="OUT", help="Emit JSON (to OUT, or stdout)")
+    args = parser.parse_args()
+
+    hw, server, source = setup_server(args)
+    stop = threading.Event()
+    if args.changes > 0:
+        threading.Thread(target=state_changer, args=(hw, args.changes, stop), daemon=True).start()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    before = dict(hw.RENDER_STATS)
+    proc = ctx.Process(target=client_process,
+                       args=(server.port, args.clients, args.seconds, args.think_ms / 1000, args.events, results))
+    t0 = time.perf_counter()
+    proc.start()
+    totals = {"requests": 0, "status": {}, "bytes": 0, "latencies": [], "errors": 0, "reconnects": 0,
+              "events": 0, "streams_rejected": 0}
+    while True:
+        stats = results.get()
+        if stats is None:
+            break
+        if "events" in stats:
+            totals["events"] += stats["events"]
+            totals["streams_rejected"] += stats["rejected"]
+            continue
+        for key in ("requests", "bytes", "errors", "reconnects"):
+            totals[key] += stats[key]
+        totals["latencies"] += stats["latencies"]
+        for status, count in stats["status"].items():
+            totals["status"][status] = totals["status"].get(status, 0) + count
+    elapsed = time.perf_counter() - t0
+    proc.join()
+    stop.set()
+    with contextlib.redirect_stdout(io.StringIO()):
+        hw.stop_web_server()
+
+    lat = totals.pop("latencies")
+    result = {
+        "mode": args.mode,
+        "threads": hw.WEB_THREADS if args.mode == "pool" else None,
+        "clients": args.clients,
+        "events": args.events,
+        "think_ms": args.think_ms,
+        "state": source,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "seconds": round(elapsed, 3),
+        "requests": totals["requests"],
+        "requests_per_sec": round(totals["requests"] / elapsed, 1) if elapsed else 0.0,
+        "status": {str(k): v for k, v in sorted(totals["status"].items())},
+        "errors": totals["errors"],
+        "reconnects": totals["reconnects"],
+        "bytes_per_request": round(totals["bytes"] / totals["requests"], 1) if totals["requests"] else 0.0,
+        "latency_ms": {p: round(percentile(lat, int(p[1:])) * 1000, 2) for p in ("p50", "p95", "p99")},
+        "events_received": totals["events"],
+        "streams_rejected": totals["streams_rejected"],
+        "page_renders": hw.RENDER_STATS["pages"] - before["pages"],
+        "page_cache_hits": hw.RENDER_STATS["page_hits"] - before["page_hits"],
+        "rejected_connections": getattr(server, "rejected", 0),
+    }
+
+    if args.json:
+        text = json.dumps(result, indent=2)
+        if args.json == "-":
+            print(text)
+            return
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    mode = f"pool, {result['threads']} threads" if args.mode == "pool" else "dev"
+    print(f"Server: {mode} | state: {source} | {os.cpu_count()} CPUs, Python {platform.python_version()}")
+    print(f"Clients: {args.clients}{' + /events streams' if args.events else ''}, think {args.think_ms:g} ms, "
+          f"{args.changes:g} state changes/s, {elapsed:.1f}s")
+    print(f"Requests:  {result['requests']} ({result['requests_per_sec']:,.0f} req/s), status {result['status']}, "
+          f"{result['errors']} errors, {result['reconnects']} reconnects")
+    print(f"Latency:   p50 {result['latency_ms']['p50']} ms, p95 {result['latency_ms']['p95']} ms, "
+          f"p99 {result['latency_ms']['p99']} ms")
+    print(f"Transfer:  {result['bytes_per_request']:,.0f} bytes/request (gzip)")
+    print(f"Rendering: {result['page_renders']} page renders, {result['page_cache_hits']} page cache hits")
+    if args.events:
+        print(f"Streams:   {result['events_received']} events received, {result['streams_rejected']} streams refused (503)")
+    if result["rejected_connections"]:
+        print(f"Queue:     {result['rejected_connections']} connections refused (503, queue full)")
+
+
+if __name__ == "__main__":
+    main()
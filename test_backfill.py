@@ -0,0 +1,49 @@
+"""Backfill check: the parallel backfill ends with the same missions and history as
+reading the same generated Game.log line by line.
+
+Usage: python -m pytest -q test_backfill.py
+
+The log generator and the in-memory setup (PERSIST_TO_DISK off, temporary files) come
+from test_replay.py.
+"""
+import contextlib
+import io
+import json
+import os
+
+from test_replay import fresh_session, generate_log, hw
+
+
+def session_result():
+    """Missions, history and header, without the wall-clock stamps of this run"""
+    clock = ("started", "time", "date")
+    missions = {mid: {k: v for k, v in m.items() if k not in clock} for mid, m in hw.data_store["missions"].items()}
+    history = [{k: v for k, v in e.items() if k not in clock} for e in hw.HISTORY.items()]
+    header = {k: hw.data_store.get(k) for k in ("player_name", "ship_name", "current_location", "next_destination")}
+    return json.loads(json.dumps({"missions": missions, "history": history, "header": header}, default=hw.json_serial))
+
+
+def test_parallel_backfill_matches_sequential_read(monkeypatch, tmp_path):
+    lines = generate_log(missions=120, seed=11)
+    path = tmp_path / "Game.log"
+    path.write_text("".join(lines), encoding="utf-8")
+
+    monitor = fresh_session()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for line in lines:
+            with hw.STATE_LOCK:
+                monitor.process_line(line)
+    sequential = session_result()
+    assert sequential["history"], "the generated log finishes missions"
+
+    # Small chunks, so the log is split across several workers
+    monkeypatch.setattr(hw, "PARALLEL_BACKFILL_MIN_MB", 0)
+    monkeypatch.setattr(hw, "BACKFILL_CHUNK_MB", 0.004)
+    monkeypatch.setattr(hw.os, "cpu_count", lambda: 2)
+    size = os.path.getsize(path)
+    assert len(hw.backfill_chunks(str(path), 0, size)) > 3
+    monitor = fresh_session()
+    with contextlib.redirect_stdout(io.StringIO()):
+        offset = hw.parallel_backfill(monitor, str(path), 0, size)
+    assert offset == size
+    assert session_result() == sequential
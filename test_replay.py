@@ -0,0 +1,142 @@
+"""Replay checks: a generated Game.log (plus dashboard edits) through HaulingMonitor.
+
+Usage: python -m pytest -q test_replay.py
+
+The summary index (SUMMARY) gives the same groups as build_summary after every line
+and every manual edit made from the dashboard.
+
+Persistence stays in memory (PERSIST_TO_DISK off) and the files point to a temporary
+folder, so nothing next to the app is touched.
+"""
+import contextlib
+import copy
+import io
+import os
+import random
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+import hauling_web_tst as hw
+
+with contextlib.redirect_stdout(io.StringIO()):
+    hw.load_saved_config()
+    hw.load_language_data()
+TMP = tempfile.TemporaryDirectory()
+hw.STATE_FILE = os.path.join(TMP.name, "hauling_state.json")
+hw.FINISH_FILE = os.path.join(TMP.name, "hauling_finish.json")
+hw.JOURNAL_FILE = os.path.join(TMP.name, "hauling_state.journal")
+hw.HISTORY_DB_FILE = os.path.join(TMP.name, "hauling_history.db")
+hw.HISTORY_BACKEND = "json"
+hw.PERSIST_TO_DISK = False
+INITIAL_STORE = copy.deepcopy(hw.data_store)
+
+MATERIALS = ["Waste", "Processed Food", "Quantum Fuel", "Silicon", "Stims", "Agricium"]
+LOCATIONS = ["HDPC-Cassillo", "HDPC-Farnesway", "Everus Harbor", "Port Tressler", "Baijini",
+             "Stanton2b_Outpost_Shelter", "Rr_Mic_Leo"]
+TITLES = ["Junior Rank - Medium Cargo Haul", "Experienced Rank - Direct Medium Cargo Haul",
+          "Local Delivery Small"]
+NOISE = [
+    "[Notice] <Actor Stall> Player [x] stalled for 0.02s",
+    "[Trace] <SubsumptionManager> Loaded mission module [Team_AI]",
+    "[Notice] <InvalidateAllItemsForLocation> location [x]",
+]
+
+
+def generate_log(missions=40, seed=7):
+    """Lines of a haul session: contracts accepted, objectives added and completed, missions
+    completed, abandoned or left open (several at once, some sharing a destination)"""
+    rng = random.Random(seed)
+    clock = [datetime(2026, 1, 20, 18, 0, 0)]
+    notification = [10]
+    lines = []
+
+    def add(text):
+        clock[0] += timedelta(milliseconds=rng.randint(50, 4000))
+        lines.append(f"<{clock[0].strftime('%Y-%m-%dT%H:%M:%S')}.{rng.randint(0, 999):03d}Z> {text}")
+
+    def notify(text, mid, objective=""):
+        notification[0] += 1
+        add(f'[Notice] <SHUDEvent_OnNotification> Added notification "{text}: " [{notification[0]}] to queue. '
+            f'New queue size: 1, MissionId: [{mid}], ObjectiveId: [{objective}] [Team_CoreGameplayFeatures][Missions][Comms]')
+
+    add("[Notice] <Channel Join> You have joined channel 'Drake Caterpillar : PilotOne'")
+    open_missions = []
+    for i in range(missions):
+        mid = str(uuid.UUID(int=rng.getrandbits(128)))
+        title = rng.choice(TITLES)
+        notify(f"Contract Accepted: {title}", mid)
+        objectives = []
+        for j in range(rng.randint(1, 3)):
+            material, location, total = rng.choice(MATERIALS), rng.choice(LOCATIONS), rng.randint(2, 60)
+            objectives.append((material, location, total, f"dropoff_{mid[:8]}_{j}"))
+            notify(f"New Objective: Deliver 0/{total} SCU of {material} to {location}", mid, objectives[-1][3])
+        for _ in range(rng.randint(0, 4)):
+            add(rng.choice(NOISE))
+        open_missions.append((mid, title, objectives))
+        # Finish an older contract now and then, so a few are always open at once
+        if len(open_missions) > 3 or (open_missions and rng.random() < 0.4):
+            mid, title, objectives = open_missions.pop(rng.randrange(len(open_missions)))
+            for material, location, total, objective in objectives:
+                if rng.random() < 0.8:
+                    notify(f"Objective Complete: Deliver {total}/{total} SCU of {material} to {location}", mid, objective)
+            outcome = rng.random()
+            if outcome < 0.6:
+                add(f"[Notice] <EndMission> Ending mission for player. MissionId[{mid}] Player[PilotOne] "
+                    f"PlayerId[2001] CompletionType[Complete] Reason[Success] [Team_Missions]")
+                notify(f"Awarded {rng.randint(5, 90) * 1000} aUEC", mid)
+            elif outcome < 0.8:
+                notify(f"Contract Abandoned: {title}", mid)
+                add(f"[Notice] <EndMission> Ending mission for player. MissionId[{mid}] Player[PilotOne] "
+                    f"PlayerId[2001] CompletionType[Abandon] Reason[x] [Team_Missions]")
+    return [line + "\n" for line in lines]
+
+
+def fresh_session():
+    hw.data_store = copy.deepcopy(INITIAL_STORE)
+    hw.HISTORY.reset(())
+    hw.STATE.touch()
+    return hw.HaulingMonitor()
+
+
+def edit_from_dashboard(client, rng, n):
+    """One manual change to a random open mission, as the dashboard makes them"""
+    mid = rng.choice(list(hw.data_store["missions"]))
+    items = hw.data_store["missions"][mid].get("items", {})
+    op = rng.randrange(5)
+    if op == 0:
+        client.post("/manual_add_item", data={"mission_id": mid, "material": "Gold", "quantity": "8",
+                                              "destination": rng.choice(LOCATIONS), "origin": rng.choice(["", "Area18"])})
+    elif op == 1 and items:
+        client.post("/force_complete_item", data={"mission_id": mid, "item_key": rng.choice(list(items)),
+                                                  "delivered_qty": rng.choice(["", "3", "100"])})
+    elif op == 2 and items:
+        client.post("/delete_item", data={"mission_id": mid, "item_key": rng.choice(list(items))})
+    elif op == 3 and items:
+        item = next(iter(items.values()))
+        client.post("/update_container_size", data={"mission_id": mid, "max_size": "8",
+                                                    "material": item.get("mat"), "destination": item.get("dest")})
+    elif op == 4 and n % 3 == 0:
+        client.get(f"/delete_mission/{mid}")
+
+
+def assert_summary_matches(where):
+    _, state = hw.STATE.versioned_snapshot()
+    missions = state["missions"]
+    assert hw.SUMMARY.summary(missions) == hw.build_summary(missions), where
+
+
+def test_summary_index_matches_build_summary():
+    monitor = fresh_session()
+    client = hw.app.test_client()
+    rng = random.Random(3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for n, line in enumerate(generate_log()):
+            with hw.STATE.write():
+                monitor.process_line(line)
+            assert_summary_matches(f"line {n}")
+            if hw.data_store["missions"] and rng.random() < 0.1:
+                edit_from_dashboard(client, rng, n)
+                assert_summary_matches(f"edit after line {n}")
+    assert hw.SUMMARY.rebuilds >= 1 and hw.SUMMARY.reindexed > 0
+